@@ -1,64 +1,27 @@
 """
 Replace limitation factors layer with given name by
 """
-from io import BytesIO
-import json
 import os
 from pathlib import Path
 import sys
+from typing import Iterator
 
 import click
 
+import numpy as np
+import pyogrio
 import requests
+import shapely
 
 if "USE_PYGEOS" not in os.environ:
     os.environ["USE_PYGEOS"] = "0"
 import geopandas as gpd  # pylint: disable=wrong-import-position
 
 
-@click.command("replace_lf")
-@click.option("--backend_address", "-b", default="http://localhost:8080", help="Backend host address")
-@click.option(
-    "--limitation_factor_type",
-    "-t",
-    help="Name (or id) of a limitation factor to replace layer",
-    show_default="(asked on launch)",
-)
-@click.option(
-    "--email",
-    "-e",
-    envvar="EMAIL",
-    help="User email to login",
-    prompt=True,
-    show_default="(asked on lunch)",
-    show_envvar=True,
-)
-@click.option(
-    "--password",
-    "-p",
-    envvar="PASSWORD",
-    help="User password to login",
-    prompt=True,
-    hide_input=True,
-    show_default="(asked on lunch)",
-    show_envvar=True,
-)
-@click.argument("new_limitation_factors", type=click.Path(exists=True, dir_okay=False, path_type=Path))
-def main(backend_address: str, limitation_factor_type: str, new_limitation_factors: Path, email: str, password: str):
+def _get_limitation_factor_id(backend_address: str, limitation_factor_type: str | None) -> int:
     """
-    Read given geojson file and use
+    Get limitation factor id by its name or id given as a string (asked if not given), exit if it is not found.
     """
-    try:
-        version = requests.get(f"{backend_address}/api/openapi", timeout=10).json()["info"]["version"]
-    except Exception as exc:  # pylint: disable=broad-except
-        print(f"Error on connection to API backend at '{backend_address}/api/openapi': {exc!r}")
-        sys.exit(1)
-    print(f"Using API at '{backend_address}' - version {version}")
-
-    gdf: gpd.GeoDataFrame = gpd.read_file(new_limitation_factors)
-    if gdf.crs != 4326:
-        gdf = gdf.to_crs(4326)
-
     limitation_factor_types: list[dict[str, int | str]] = requests.get(
         f"{backend_address}/api/listing/limitation_factors", timeout=10
     ).json()["values"]
@@ -71,82 +34,184 @@ def main(backend_address: str, limitation_factor_type: str, new_limitation_facto
     if limitation_factor_type is None:
         limitation_factor_type = input("Input limitation factor type to replace: ").strip()
 
-    lft_id: int
     if limitation_factor_type.isnumeric():
         lft_id = int(limitation_factor_type)
         if lft_id not in (lft["id"] for lft in limitation_factor_types):
             print(f"limitation factor id '{limitation_factor_type}' is not in the limitation factors")
             sys.exit(1)
-    else:
-        if limitation_factor_type not in (lft["name"] for lft in limitation_factor_types):
-            print(f"limitation factor name '{limitation_factor_type}' is not in the limitation factors")
-            sys.exit(1)
-        lft_id = next((lft["id"] for lft in limitation_factor_types if lft["name"] == limitation_factor_type))
+        return lft_id
+    if limitation_factor_type not in (lft["name"] for lft in limitation_factor_types):
+        print(f"limitation factor name '{limitation_factor_type}' is not in the limitation factors")
+        sys.exit(1)
+    return next((lft["id"] for lft in limitation_factor_types if lft["name"] == limitation_factor_type))
+
 
+def _login(backend_address: str, email: str, password: str) -> dict[str, str]:
+    """
+    Perform a login and return authorization headers, exit on failure.
+    """
+    response = None
     try:
         response = requests.post(
             f"{backend_address}/api/login?device=updater",
             data={"username": email, "password": password},
             timeout=60,
         )
-        access_token = "Bearer " + response.json()["access_token"]
+        return {"Authorization": "Bearer " + response.json()["access_token"]}
     except Exception as exc:  # pylint: disable=broad-except
         print(f"Could not perform a login: {exc!r}")
-        print(f"Response: {response.text}")
+        if response is not None:
+            print(f"Response: {response.text}")
         sys.exit(1)
-    headers = {"Authorization": access_token}
 
+
+def _start_upload(backend_address: str, lft_id: int, headers: dict[str, str]) -> dict:
+    """
+    Start a limitation factor layer upload and return its information, exit on failure.
+    """
     response = requests.post(
-        f"{backend_address}/api/update/limitation_factors/get_all/{lft_id}",
-        timeout=60,
+        f"{backend_address}/api/update/limitation_factors/uploads",
+        json={"limitation_factor_id": lft_id},
         headers=headers,
+        timeout=60,
     )
-    if response.status_code != 200:
-        print(f"Limitation factor polygons request failed: {response.text[:1000]}")
+    if response.status_code != 201:
+        print(f"Could not start limitation factor layer upload: {response.text[:1000]}")
         sys.exit(1)
-    ids = [feature["properties"]["id"] for feature in response.json()["features"]]
+    return response.json()
+
 
+def _iterate_geometries(path: Path, chunk_size: int) -> Iterator[np.ndarray]:
+    """
+    Iterate over the file geometries (in EPSG:4326) by chunks of a given size. The file is opened once and read
+    as a stream of Arrow batches.
+    """
+    with pyogrio.open_arrow(path, columns=[], batch_size=chunk_size, use_pyarrow=True) as (meta, reader):
+        geometry_column = meta["geometry_name"] or "wkb_geometry"
+        for batch in reader:
+            geometries = gpd.GeoSeries(
+                shapely.from_wkb(batch.column(geometry_column).to_numpy(zero_copy_only=False)), crs=meta["crs"]
+            )
+            if geometries.crs is not None and geometries.crs != 4326:
+                geometries = geometries.to_crs(4326)
+            yield geometries.dropna().values.to_numpy()
+
+
+def _upload_part(upload_url: str, part_number: int, geometries: np.ndarray, headers: dict[str, str]) -> dict:
+    """
+    Upload geometries as a NDJSON part and return the upload information. Connection errors and server errors (5xx)
+    are retried, the upload is aborted and the script exits if all of the attempts fail or the part is rejected (4xx).
+    """
+    data = "\n".join(shapely.to_geojson(geometries)).encode("utf-8")
+    for attempt in range(1, 4):
+        try:
+            response = requests.put(
+                f"{upload_url}/parts/{part_number}",
+                data=data,
+                headers=headers | {"Content-Type": "application/x-ndjson"},
+                timeout=300,
+            )
+        except requests.RequestException as exc:
+            print(f"Part {part_number} upload failed (attempt {attempt}): {exc!r}")
+            continue
+        if response.status_code == 200:
+            return response.json()
+        print(f"Part {part_number} upload failed (status={response.status_code}): {response.text[:1000]}")
+        if response.status_code < 500:
+            break
+    requests.delete(upload_url, headers=headers, timeout=60)
+    print("Could not upload limitation factor layer, the upload is aborted")
+    sys.exit(1)
+
+
+def _commit_upload(upload_url: str, upload: dict, lft_id: int, headers: dict[str, str]) -> None:
+    """
+    Ask for a confirmation and commit the upload replacing the limitation factor layer, or abort it.
+    """
     res = input(
-        f"Replace {len(ids)} limitation factor polygons of id={lft_id} with {gdf.shape[0]} given polygons? [y/n] "
+        f"Replace {upload['features_current']} limitation factor polygons of id={lft_id}"
+        f" with {upload['features_uploaded']} given polygons? [y/n] "
     )
     if res.lower() not in ("y", "1", "+"):
-        print(f"Got '{res}' choice, exiting")
+        requests.delete(upload_url, headers=headers, timeout=60)
+        print(f"Got '{res}' choice, the upload is aborted")
         sys.exit()
 
     try:
-        response = requests.delete(
-            f"{backend_address}/api/update/limitation_factors", json={"ids": ids}, headers=headers, timeout=60
-        )
+        response = requests.post(f"{upload_url}/commit", headers=headers, timeout=600)
         if response.status_code != 200:
-            print(f"Could not delete old limitation factors (status={response.status_code}): {response.text[:1000]}")
+            print(f"Could not replace limitation factors (status={response.status_code}): {response.text[:1000]}")
             sys.exit(1)
-
     except Exception as exc:  # pylint: disable=broad-except
-        print(f"Could not delete old limitation factors: {exc!r}")
+        print(f"Could not replace limitation factors: {exc!r}")
         sys.exit(1)
+    print(f"Limitation factor layer is replaced, it has {response.json()['features_current']} polygons now")
 
-    with BytesIO() as buffer:
-        gdf.to_file(buffer, driver="GeoJSON")  # GeoJSON in buffer to get geometries
-        data = json.loads(buffer.getvalue())  # json data as dict
-    try:
-        response = requests.post(
-            f"{backend_address}/api/update/limitation_factors",
-            json={
-                "limitation_factors": [
-                    {"geometry": feature["geometry"], "limitation_factor_id": lft_id} for feature in data["features"]
-                ]
-            },
-            headers=headers,
-            timeout=60,
-        )
-        if response.status_code != 201:
-            print(
-                f"WARNING! Deleted old limitation factors, but could not insert new (status={response.status_code}): {response.text[:1000]}"
-            )
-            sys.exit(1)
 
+@click.command("replace_lf")
+@click.option("--backend_address", "-b", default="http://localhost:8080", help="Backend host address")
+@click.option(
+    "--limitation_factor_type",
+    "-t",
+    help="Name (or id) of a limitation factor to replace layer",
+    show_default="(asked on launch)",
+)
+@click.option(
+    "--email",
+    "-e",
+    envvar="EMAIL",
+    help="User email to login",
+    prompt=True,
+    show_default="(asked on lunch)",
+    show_envvar=True,
+)
+@click.option(
+    "--password",
+    "-p",
+    envvar="PASSWORD",
+    help="User password to login",
+    prompt=True,
+    hide_input=True,
+    show_default="(asked on lunch)",
+    show_envvar=True,
+)
+@click.option(
+    "--chunk_size",
+    "-c",
+    type=int,
+    default=10000,
+    help="Number of polygons to upload in one request",
+    show_default=True,
+)
+@click.argument("new_limitation_factors", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+def main(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    backend_address: str,
+    limitation_factor_type: str,
+    new_limitation_factors: Path,
+    email: str,
+    password: str,
+    chunk_size: int,
+):
+    """
+    Read given geojson file by chunks and replace limitation factor layer with its polygons.
+    """
+    try:
+        version = requests.get(f"{backend_address}/api/openapi", timeout=10).json()["info"]["version"]
     except Exception as exc:  # pylint: disable=broad-except
-        print(f"WARNING! Deleted old limitation factors, but could not insert new: {exc!r}")
+        print(f"Error on connection to API backend at '{backend_address}/api/openapi': {exc!r}")
+        sys.exit(1)
+    print(f"Using API at '{backend_address}' - version {version}")
+
+    lft_id = _get_limitation_factor_id(backend_address, limitation_factor_type)
+    headers = _login(backend_address, email, password)
+
+    upload = _start_upload(backend_address, lft_id, headers)
+    upload_url = f"{backend_address}/api/update/limitation_factors/uploads/{upload['id']}"
+    for part_number, geometries in enumerate(_iterate_geometries(new_limitation_factors, chunk_size)):
+        upload = _upload_part(upload_url, part_number, geometries, headers)
+        print(f"Uploaded part {part_number}: {upload['features_uploaded']} polygons in total")
+
+    _commit_upload(upload_url, upload, lft_id, headers)
 
 
 if __name__ == "__main__":
@@ -10,6 +10,7 @@ import typing as tp
 
 import click
 import uvicorn
+from derevo.communities import COMMUNITIES_BACKENDS
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -20,7 +21,19 @@ from plants_api.config import AppSettings
 from plants_api.config.app_settings_global import app_settings
 from plants_api.db.connection.session import SessionManager
 from plants_api.endpoints import list_of_routes
+from plants_api.logic.cache_versions import CacheVersionsListener
+from plants_api.logic.compositions import get_global_territory
+from plants_api.logic.executor import COMPUTE_EXECUTOR_TYPES, ComputeExecutor
+from plants_api.logic.plants import (
+    get_compatibility_index,
+    get_genera_cohabitation,
+    get_plants_derevo,
+    get_plants_tolerance_matrix,
+)
+from plants_api.logic.snapshot import drop_snapshots
 from plants_api.utils.dotenv import try_load_envfile
+from plants_api.utils.profiling import ProfilingMiddleware
+from plants_api.utils.timing import TimingMiddleware
 
 
 LAST_UPDATE = "2023-07-04"
@@ -57,7 +70,10 @@ def get_app(prefix: str = "/api") -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Server-Timing", "X-Profile-Id"],
     )
+    application.add_middleware(ProfilingMiddleware)
+    application.add_middleware(TimingMiddleware)
 
     return application
 
@@ -103,17 +119,35 @@ async def internal_exception_handler(request: Request, exc: Exception) -> JSONRe
 @app.on_event("startup")
 async def startup_event():
     """
-    Function that runs on an application startup. Database connection pool is initialized here.
+    Function that runs on an application startup. Database connection pool, cache versions listener
+    and computations pool are initialized here, and cached data is preloaded (from local snapshots if they
+    are actual) before the pool creation, so process pool workers get it on initialization.
     """
     await SessionManager().refresh()
+    await CacheVersionsListener().start()
+    try:
+        async with SessionManager().engine.connect() as conn:
+            ComputeExecutor().set_state(
+                global_territory=await get_global_territory(conn),
+                tolerance_matrix=await get_plants_tolerance_matrix(conn),
+                compatibility_index=await get_compatibility_index(conn),
+                plants_available=await get_plants_derevo(conn),
+                cohabitation_attributes=await get_genera_cohabitation(conn),
+            )
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning("Could not preload cached data, it will be loaded on the first request: {!r}", exc)
+    ComputeExecutor().refresh()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """
-    Function that runs on an application shutdown. Database connection pool is destructed here.
+    Function that runs on an application shutdown. Database connection pool, cache versions listener
+    and computations pool are destructed here.
     """
     await SessionManager().shutdown()
+    await CacheVersionsListener().stop()
+    ComputeExecutor().shutdown()
 
 
 LogLevel = tp.Literal["TRACE", "DEBUG", "INFO", "WARNING", "ERROR"]
@@ -252,6 +286,112 @@ def logger_from_str(logger_text: str) -> list[tuple[LogLevel, str]]:
     show_envvar=True,
     help="Prefix to plants photos names from the database",
 )
+@click.option(
+    "--communities_backend",
+    envvar="COMMUNITIES_BACKEND",
+    type=click.Choice(COMMUNITIES_BACKENDS),
+    default="networkx",
+    show_default=True,
+    show_envvar=True,
+    help="Community detection algorithm used to split plants to compositions",
+)
+@click.option(
+    "--compute_executor",
+    envvar="COMPUTE_EXECUTOR",
+    type=click.Choice(COMPUTE_EXECUTOR_TYPES),
+    default="thread",
+    show_default=True,
+    show_envvar=True,
+    help="Pool type to run CPU-bound computations (territory, compositions and PDF generation) in",
+)
+@click.option(
+    "--compute_workers",
+    envvar="COMPUTE_WORKERS",
+    type=int,
+    default=4,
+    show_default=True,
+    show_envvar=True,
+    help="Number of computations pool workers",
+)
+@click.option(
+    "--compute_queue_size",
+    envvar="COMPUTE_QUEUE_SIZE",
+    type=int,
+    default=32,
+    show_default=True,
+    show_envvar=True,
+    help="Number of computations waiting for a free worker, requests above it get 503 Service Unavailable",
+)
+@click.option(
+    "--compositions_cache_size",
+    envvar="COMPOSITIONS_CACHE_SIZE",
+    type=int,
+    default=1024,
+    show_default=True,
+    show_envvar=True,
+    help="Maximum number of memoized compositions results (in each of the computations processes)",
+)
+@click.option(
+    "--pdf_cache_size",
+    envvar="PDF_CACHE_SIZE",
+    type=int,
+    default=64,
+    show_default=True,
+    show_envvar=True,
+    help="Maximum number of cached compositions PDF files",
+)
+@click.option(
+    "--tiles_cache_size",
+    envvar="TILES_CACHE_SIZE",
+    type=int,
+    default=4096,
+    show_default=True,
+    show_envvar=True,
+    help="Maximum number of cached vector tiles",
+)
+@click.option(
+    "--snapshot_dir",
+    envvar="SNAPSHOT_DIR",
+    type=str,
+    default="snapshots",
+    show_default=True,
+    show_envvar=True,
+    help="Directory to save local snapshots of the cached data to for a fast start (empty string to disable)",
+)
+@click.option(
+    "--drop_snapshots",
+    "drop_snapshots_",
+    envvar="DROP_SNAPSHOTS",
+    is_flag=True,
+    help="Remove local snapshots on start (use after database changes made without cache versions update)",
+)
+@click.option(
+    "--profiles_dir",
+    envvar="PROFILES_DIR",
+    type=str,
+    default="profiles",
+    show_default=True,
+    show_envvar=True,
+    help="Directory to save profiles of the slow profiled requests to (empty string to disable saving)",
+)
+@click.option(
+    "--profiles_max_count",
+    envvar="PROFILES_MAX_COUNT",
+    type=int,
+    default=32,
+    show_default=True,
+    show_envvar=True,
+    help="Maximum number of saved profiles, the oldest ones are removed",
+)
+@click.option(
+    "--profile_threshold_ms",
+    envvar="PROFILE_THRESHOLD_MS",
+    type=int,
+    default=1000,
+    show_default=True,
+    show_envvar=True,
+    help="Minimal duration of a profiled request in milliseconds to save its profile",
+)
 @click.option(
     "--debug",
     envvar="DEBUG",
@@ -271,6 +411,18 @@ def main(
     additional_loggers: list[tuple[LogLevel, str]],
     photos_dir: str,
     photos_prefix: str,
+    communities_backend: str,
+    compute_executor: str,
+    compute_workers: int,
+    compute_queue_size: int,
+    compositions_cache_size: int,
+    pdf_cache_size: int,
+    tiles_cache_size: int,
+    snapshot_dir: str,
+    drop_snapshots_: bool,
+    profiles_dir: str,
+    profiles_max_count: int,
+    profile_threshold_ms: int,
     debug: bool,
 ):
     """
@@ -289,9 +441,23 @@ def main(
         db_pool_size=db_pool_size,
         photos_dir=photos_dir,
         photos_prefix=photos_prefix,
+        communities_backend=communities_backend,
+        compute_executor=compute_executor,
+        compute_workers=compute_workers,
+        compute_queue_size=compute_queue_size,
+        compositions_cache_size=compositions_cache_size,
+        pdf_cache_size=pdf_cache_size,
+        tiles_cache_size=tiles_cache_size,
+        snapshot_dir=snapshot_dir,
+        drop_snapshots=drop_snapshots_,
+        profiles_dir=profiles_dir,
+        profiles_max_count=profiles_max_count,
+        profile_threshold_ms=profile_threshold_ms,
         debug=debug,
     )
     app_settings.update(settings)
+    if drop_snapshots_:
+        drop_snapshots()
     if __name__ == "__main__":
         if debug:
             uvicorn.run(
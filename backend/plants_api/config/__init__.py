@@ -29,6 +29,18 @@ class AppSettings:
     db_pool_size: int = 15
     photos_dir: str = "photos"
     photos_prefix: str = "localhost:6065/images/"
+    communities_backend: str = "networkx"
+    compute_executor: str = "thread"
+    compute_workers: int = 4
+    compute_queue_size: int = 32
+    compositions_cache_size: int = 1024
+    pdf_cache_size: int = 64
+    tiles_cache_size: int = 4096
+    snapshot_dir: str = "snapshots"
+    drop_snapshots: bool = False
+    profiles_dir: str = "profiles"
+    profiles_max_count: int = 32
+    profile_threshold_ms: int = 1000
     jwt_secret_key: str = (
         "this key will be used to sign JWTs, do not update it as all of the users current authorizations will fail"
     )
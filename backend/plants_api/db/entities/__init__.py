@@ -2,6 +2,7 @@
 Module to store all of the database tables.
 """
 
+from plants_api.db.entities.cache_versions import cache_versions
 from plants_api.db.entities.climate_zones import climate_zones
 from plants_api.db.entities.cohabitation import cohabitation
 from plants_api.db.entities.cohabitation_comments import cohabitation_comments
@@ -16,6 +17,10 @@ from plants_api.db.entities.factor_types import (
 from plants_api.db.entities.factor_types_parts import humidity_type_parts, light_type_parts, limitation_factor_parts
 from plants_api.db.entities.features import features
 from plants_api.db.entities.genera import genera
+from plants_api.db.entities.limitation_factors_uploads import (
+    limitation_factors_uploads,
+    limitation_factors_uploads_geometries,
+)
 from plants_api.db.entities.parks_data import districts, parks, plants_parks
 from plants_api.db.entities.plant_types import plant_types
 from plants_api.db.entities.plants import plants
@@ -0,0 +1,24 @@
+"""
+Cache versions table is defined here.
+"""
+from sqlalchemy import TIMESTAMP, BigInteger, Column, String, Table, func
+
+from plants_api.db import metadata
+
+
+cache_versions = Table(
+    "cache_versions",
+    metadata,
+    Column("name", String(64), primary_key=True),
+    Column("version", BigInteger, nullable=False, server_default="0"),
+    Column("updated_at", TIMESTAMP(timezone=True), nullable=False, server_default=func.now()),
+)
+"""
+Versions of the data cached by the application workers, each data-changing operation increases version of
+the affected data.
+
+Columns:
+- `name` - cached data name (plants, genera_cohabitation, global_territory), varchar(64)
+- `version` - current data version, bigint
+- `updated_at` - time of the last version change, timestamptz
+"""
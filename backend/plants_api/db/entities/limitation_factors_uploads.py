@@ -0,0 +1,50 @@
+"""
+Limitation factors layers chunked uploads tables are defined here.
+"""
+from sqlalchemy import TIMESTAMP, Column, ForeignKey, Index, Integer, LargeBinary, Table, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from plants_api.db import metadata
+
+
+limitation_factors_uploads = Table(
+    "limitation_factors_uploads",
+    metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("limitation_factor_id", ForeignKey("limitation_factors.id"), nullable=False),
+    Column("user_id", ForeignKey("users.users.id"), nullable=False),
+    Column("created_at", TIMESTAMP(timezone=True), nullable=False, server_default=func.now()),
+    Column("parts_uploaded", Integer, nullable=False, server_default="0"),
+    Column("features_uploaded", Integer, nullable=False, server_default="0"),
+    Column("committed_at", TIMESTAMP(timezone=True)),
+)
+"""
+Chunked uploads of a limitation factor layer replacement.
+
+Columns:
+- `id` - upload identifier, uuid
+- `limitation_factor_id` - identifier of a limitation factor which layer is replaced (limitation_factors.id), int
+- `user_id` - identifier of the user who has started the upload (users.users.id), int
+- `created_at` - upload start time, timestamptz
+- `parts_uploaded` - number of the uploaded parts, int
+- `features_uploaded` - number of the uploaded geometries, int
+- `committed_at` - time of the layer replacement, null until the upload is committed, timestamptz
+"""
+
+limitation_factors_uploads_geometries = Table(
+    "limitation_factors_uploads_geometries",
+    metadata,
+    Column("upload_id", ForeignKey("limitation_factors_uploads.id", ondelete="CASCADE"), nullable=False),
+    Column("part_number", Integer, nullable=False),
+    Column("geometry", LargeBinary, nullable=False),
+    Index("ix_limitation_factors_uploads_geometries_upload_id_part_number", "upload_id", "part_number"),
+    prefixes=["UNLOGGED"],
+)
+"""
+Staging table of the uploaded geometries, rows are removed when the upload is committed or aborted.
+
+Columns:
+- `upload_id` - identifier of the upload (limitation_factors_uploads.id), uuid
+- `part_number` - number of the upload part, int
+- `geometry` - geometry in WKB format in EPSG:4326, bytea
+"""
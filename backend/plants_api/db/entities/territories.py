@@ -18,7 +18,7 @@ territories = Table(
     Column("type_id", ForeignKey("soil_types.id"), nullable=False),
     Column("acidity_type_id", ForeignKey("soil_acidity_types.id"), nullable=False),
     Column("fertility_type_id", ForeignKey("soil_fertility_types.id"), nullable=False),
-    Column("geometry", Geometry(spatial_index=False, from_text="ST_GeomFromEWKT", name="geometry")),
+    Column("geometry", Geometry(from_text="ST_GeomFromEWKT", name="geometry")),
 )
 """
 Territories where soil share the same type, acidity type and fertility type.
@@ -0,0 +1,35 @@
+# pylint: disable=no-member,invalid-name,missing-function-docstring,too-many-statements
+"""add cache versions
+
+Revision ID: 0dd414bc9379
+Revises: 15d1762cc862
+Create Date: 2026-10-18 15:12:08.904316
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0dd414bc9379"
+down_revision = "15d1762cc862"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cache_versions = op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("version", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("name", name=op.f("cache_versions_pk")),
+    )
+    op.bulk_insert(
+        cache_versions,
+        [{"name": "plants"}, {"name": "genera_cohabitation"}, {"name": "global_territory"}],
+    )
+
+
+def downgrade():
+    op.drop_table("cache_versions")
@@ -0,0 +1,34 @@
+# pylint: disable=no-member,invalid-name,missing-function-docstring,too-many-statements
+"""add geometry gist indexes
+
+Revision ID: 15d1762cc862
+Revises: 4206d18209db
+Create Date: 2026-10-18 12:10:41.218507
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "15d1762cc862"
+down_revision = "4206d18209db"
+branch_labels = None
+depends_on = None
+
+
+_TABLES = ("limitation_factor_parts", "light_type_parts", "humidity_type_parts", "territories")
+# indexes on limitation_factor_parts and light_type_parts are created by geoalchemy2 in the init revision
+_NEW_INDEXES_TABLES = ("humidity_type_parts", "territories")
+
+
+def upgrade():
+    # index names follow geoalchemy2 convention, so indexes which could be created along with the tables are kept
+    for table in _TABLES:
+        op.execute(sa.text(f"CREATE INDEX IF NOT EXISTS idx_{table}_geometry ON {table} USING gist (geometry)"))
+        op.execute(sa.text(f"ANALYZE {table}"))
+
+
+def downgrade():
+    for table in reversed(_NEW_INDEXES_TABLES):
+        op.execute(sa.text(f"DROP INDEX IF EXISTS idx_{table}_geometry"))
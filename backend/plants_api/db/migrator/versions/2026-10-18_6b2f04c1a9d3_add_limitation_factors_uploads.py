@@ -0,0 +1,67 @@
+# pylint: disable=no-member,invalid-name,missing-function-docstring,too-many-statements
+"""add limitation factors uploads
+
+Revision ID: 6b2f04c1a9d3
+Revises: 0dd414bc9379
+Create Date: 2026-10-18 18:41:27.305819
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "6b2f04c1a9d3"
+down_revision = "0dd414bc9379"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "limitation_factors_uploads",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("limitation_factor_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("parts_uploaded", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("features_uploaded", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("committed_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["limitation_factor_id"],
+            ["limitation_factors.id"],
+            name=op.f("limitation_factors_uploads_fk_limitation_factor_id__limitation_factors"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.users.id"], name=op.f("limitation_factors_uploads_fk_user_id__users")
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("limitation_factors_uploads_pk")),
+    )
+    op.create_table(
+        "limitation_factors_uploads_geometries",
+        sa.Column("upload_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("part_number", sa.Integer(), nullable=False),
+        sa.Column("geometry", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["upload_id"],
+            ["limitation_factors_uploads.id"],
+            name=op.f("limitation_factors_uploads_geometries_fk_upload_id__limitation_factors_uploads"),
+            ondelete="CASCADE",
+        ),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index(
+        op.f("ix_limitation_factors_uploads_geometries_upload_id_part_number"),
+        "limitation_factors_uploads_geometries",
+        ["upload_id", "part_number"],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        op.f("ix_limitation_factors_uploads_geometries_upload_id_part_number"),
+        table_name="limitation_factors_uploads_geometries",
+    )
+    op.drop_table("limitation_factors_uploads_geometries")
+    op.drop_table("limitation_factors_uploads")
@@ -4,3 +4,4 @@ Data Transfer Objects (much like entities from database) are defined in this mod
 
 from plants_api.dto.listings import ListingDto
 from plants_api.dto.plants import PlantDto
+from plants_api.dto.profiles import ProfileDto, ProfileFunctionDto
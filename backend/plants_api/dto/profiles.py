@@ -0,0 +1,38 @@
+# pylint: disable=too-many-instance-attributes
+"""
+Request profile DTOs are defined here.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True)
+class ProfileFunctionDto:
+    """
+    Function statistics of a request profile.
+    """
+
+    function: str
+    calls: int
+    total_ms: float
+    cumulative_ms: float
+
+
+@dataclass(frozen=True)
+class ProfileDto:
+    """
+    Saved profile of a slow request.
+    """
+
+    id: str  # pylint: disable=invalid-name
+    created_at: datetime
+    method: str
+    path: str
+    query: str
+    status: int | None
+    duration_ms: float
+    user: str
+    stages: dict[str, float]
+    memory_peak_kb: float | None
+    top_functions: list[ProfileFunctionDto]
+    top_allocations: list[str]
@@ -2,3 +2,4 @@
 DTOs for database updating process are defined here.
 """
 from .limitation_factors import LimitationFactorGeometryDto
+from .limitation_factors_uploads import LimitationFactorsUploadDto
@@ -0,0 +1,21 @@
+"""
+Limitation factors layer upload DTO is defined here.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+
+@dataclass(frozen=True)
+class LimitationFactorsUploadDto:
+    """
+    Chunked upload of a limitation factor layer replacement with its progress.
+    """
+
+    id: UUID  # pylint: disable=invalid-name
+    limitation_factor_id: int
+    created_at: datetime
+    committed_at: datetime | None
+    parts_uploaded: int
+    features_uploaded: int
+    features_current: int
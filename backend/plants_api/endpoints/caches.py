@@ -6,8 +6,11 @@ from sqlalchemy.ext.asyncio import AsyncConnection
 from starlette import status
 
 from plants_api.db.connection.session import get_connection
+from plants_api.logic.cache_versions import CachedData, bump_cache_versions
 from plants_api.logic.compositions import get_global_territory
-from plants_api.logic.plants import get_genera_cohabitation, get_plants_derevo
+from plants_api.logic.executor import ComputeExecutor
+from plants_api.logic.pdf import clear_pdf_caches
+from plants_api.logic.plants import get_compatibility_index, get_genera_cohabitation, get_plants_tolerance_matrix
 from plants_api.schemas.basic_responses import OkResponse
 
 from .routers import system_router
@@ -20,10 +23,18 @@ from .routers import system_router
 )
 async def refresh_caches(connection: AsyncConnection = Depends(get_connection)):
     """
-    Refresh cached values for global territory, genera cohabitation and plants.
+    Refresh cached values for global territory, genera cohabitation and plants (with their tolerance matrix
+    and compatibility index), and drop memoized compositions and PDF files.
+
+    Cached data versions are increased, so other application workers reload their caches too.
     """
+    await bump_cache_versions(connection, *CachedData)
+    await connection.commit()
     await get_global_territory(connection, use_cached=False)
-    await get_plants_derevo(connection, use_cached=False)
+    await get_plants_tolerance_matrix(connection, use_cached=False)
     await get_genera_cohabitation(connection, use_cached=False)
+    await get_compatibility_index(connection, use_cached=False)
+    ComputeExecutor().clear_caches()
+    clear_pdf_caches()
 
     return OkResponse()
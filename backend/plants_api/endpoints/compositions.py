@@ -1,11 +1,10 @@
 """
 get_compositions endpoint is defined here.
 """
-from io import BytesIO
 from typing import Any
 
-from borb.pdf import PDF
 from derevo import Territory
+from derevo.timing import span
 from fastapi import Depends, Response
 from sqlalchemy.ext.asyncio import AsyncConnection
 from starlette import status
@@ -13,8 +12,15 @@ from starlette import status
 from plants_api.db.connection import get_connection
 from plants_api.dto.plants import PlantDto
 from plants_api.logic.compositions import get_global_territory, get_plants_compositions, get_territory
-from plants_api.logic.pdf import compositions_to_pdf
-from plants_api.logic.plants import get_genera_cohabitation, get_plants_by_ids, get_plants_derevo
+from plants_api.logic.executor import ComputeExecutor
+from plants_api.logic.pdf import cache_pdf, get_cached_pdf, get_pdf_key
+from plants_api.logic.plants import (
+    get_cached_plants_by_ids,
+    get_compatibility_index,
+    get_genera_cohabitation,
+    get_plants_derevo,
+    get_plants_tolerance_matrix,
+)
 from plants_api.schemas.compositions import CompositionsResponse
 from plants_api.schemas.geojson import Geometry
 from plants_api.schemas.plants import PlantsResponse
@@ -51,15 +57,17 @@ async def _get_territory_information(  # pylint: disable=too-many-arguments
     """
     Get territory information from the database combined with given data.
     """
-    global_territory = await get_global_territory(connection)
+    with span("data_loading"):
+        global_territory = await get_global_territory(connection)
 
-    light_type = await get_light_type_by_id(connection, light_type_id)
-    humidity_type = await get_humidity_type_by_id(connection, humidity_type_id)
-    soil_type = await get_soil_type_by_id(connection, soil_type_id)
-    soil_fertility_type = await get_soil_fertility_type_by_id(connection, soil_fertility_type_id)
-    soil_acidity_type = await get_soil_acidity_type_by_id(connection, soil_acidity_type_id)
+    with span("db_lookup"):
+        light_type = await get_light_type_by_id(connection, light_type_id)
+        humidity_type = await get_humidity_type_by_id(connection, humidity_type_id)
+        soil_type = await get_soil_type_by_id(connection, soil_type_id)
+        soil_fertility_type = await get_soil_fertility_type_by_id(connection, soil_fertility_type_id)
+        soil_acidity_type = await get_soil_acidity_type_by_id(connection, soil_acidity_type_id)
 
-    territory_cm = get_territory(territory.as_shapely_geometry(), global_territory)
+    territory_cm = await get_territory(territory.as_shapely_geometry(), global_territory)
 
     territory_cm.update(
         Territory(
@@ -78,14 +86,18 @@ async def _get_compositions(
     territory_cm: Territory,
     plants_present: list[int] | None = None,
 ) -> list[list[PlantDto]]:
-    plants_available_cm = await get_plants_derevo(connection)
-    genus_cohabitation = await get_genera_cohabitation(connection)
+    with span("data_loading"):
+        plants_available_cm = await get_plants_derevo(connection)
+        tolerance_matrix = await get_plants_tolerance_matrix(connection)
+        genus_cohabitation = await get_genera_cohabitation(connection)
+        compatibility_index = await get_compatibility_index(connection)
 
     if plants_present is not None:
-        plants_present_cm = await plant_dto_to_derevo_plant(
-            connection,
-            await get_plants_by_ids(connection, plants_present),
-        )
+        with span("db_lookup"):
+            plants_present_cm = await plant_dto_to_derevo_plant(
+                connection,
+                await get_cached_plants_by_ids(connection, plants_present),
+            )
     else:
         plants_present_cm = []
 
@@ -95,6 +107,8 @@ async def _get_compositions(
         territory_cm,
         genus_cohabitation,
         plants_present_cm,
+        tolerance_matrix,
+        compatibility_index,
     )
 
 
@@ -126,7 +140,8 @@ async def get_compositions(  # pylint: disable=too-many-arguments
         soil_acidity_type_id,
     )
     compositions = await _get_compositions(connection, territory_cm, plants_present)
-    return CompositionsResponse.from_dtos(compositions)
+    with span("response_hydration"):
+        return CompositionsResponse.from_dtos(compositions)
 
 
 @compositions_router.post(
@@ -156,7 +171,13 @@ async def get_compositions_pdf(  # pylint: disable=too-many-arguments
         soil_acidity_type_id,
     )
     compositions = await _get_compositions(connection, territory_cm, plants_present)
-    pdf = compositions_to_pdf(compositions, territory_cm)
-    with BytesIO() as buffer:
-        PDF.dumps(buffer, pdf)
-        return Response(buffer.getvalue(), headers={"Content-Disposition": 'attachment; filename="compositions.pdf"'})
+    pdf_key = get_pdf_key(compositions, territory_cm)
+    if (pdf := get_cached_pdf(pdf_key)) is None:
+        with span("pdf_rendering"):
+            pdf = await ComputeExecutor().compositions_to_pdf(compositions, territory_cm)
+        cache_pdf(pdf_key, pdf)
+    return Response(
+        pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": 'attachment; filename="compositions.pdf"'},
+    )
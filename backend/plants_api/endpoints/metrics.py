@@ -0,0 +1,21 @@
+"""
+metrics endpoint is defined here.
+"""
+from fastapi.responses import PlainTextResponse
+from starlette import status
+
+from plants_api.utils.metrics import metrics_registry
+
+from .routers import system_router
+
+
+@system_router.get(
+    "/system/metrics",
+    response_class=PlainTextResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_metrics() -> PlainTextResponse:
+    """
+    Return metrics of the current application worker process in Prometheus text format.
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,44 @@
+"""
+profiles endpoints are defined here.
+"""
+import asyncio
+
+from fastapi import Depends
+from fastapi.responses import FileResponse
+from starlette import status
+
+from plants_api.dto.users import User
+from plants_api.logic.profiles import get_profile_stats_path, list_profiles
+from plants_api.schemas.profiles import ProfilesResponse
+from plants_api.utils.dependencies import user_dependency
+
+from .routers import system_router
+
+
+@system_router.get(
+    "/system/profiles",
+    response_model=ProfilesResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_profiles(_user: User = Depends(user_dependency)) -> ProfilesResponse:
+    """
+    Get saved profiles of the slow requests, the newest first.
+
+    Request is profiled if it is sent by an authorized user with `X-Profile: 1` header or `profile=1` query
+    parameter, and its profile is saved if it takes more than the configured threshold time.
+    """
+    return ProfilesResponse.from_dtos(await asyncio.to_thread(list_profiles))
+
+
+@system_router.get(
+    "/system/profiles/{profile_id}",
+    response_class=FileResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_profile_stats(profile_id: str, _user: User = Depends(user_dependency)) -> FileResponse:
+    """
+    Get cProfile statistics file of the saved profile, it can be read with `pstats` or visualization tools.
+    """
+    return FileResponse(
+        get_profile_stats_path(profile_id), media_type="application/octet-stream", filename=f"{profile_id}.prof"
+    )
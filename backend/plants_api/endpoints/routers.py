@@ -19,12 +19,15 @@ plants_router = APIRouter(tags=["plants"], prefix="/plants")
 
 compositions_router = APIRouter(tags=["compositions"], prefix="/compositions")
 
+tiles_router = APIRouter(tags=["tiles"], prefix="/tiles")
+
 routers_list = [
     system_router,
     listing_router,
     plants_router,
     compositions_router,
     limitations_router,
+    tiles_router,
     update_router,
     user_data_router,
 ]
@@ -0,0 +1,31 @@
+"""
+Vector tiles endpoint is defined here.
+"""
+from fastapi import Depends, Response
+from sqlalchemy.ext.asyncio import AsyncConnection
+from starlette import status
+
+from plants_api.db.connection import get_connection
+from plants_api.logic.tiles import TileLayer
+from plants_api.logic.tiles import get_tile as get_tile_from_db
+
+from .routers import tiles_router
+
+
+@tiles_router.get(
+    "/{layer}/{z}/{x}/{y}.mvt",
+    response_class=Response,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": {"application/vnd.mapbox-vector-tile": {}}}},
+)
+async def get_tile(
+    layer: TileLayer,
+    z: int,  # pylint: disable=invalid-name
+    x: int,  # pylint: disable=invalid-name
+    y: int,  # pylint: disable=invalid-name
+    conn: AsyncConnection = Depends(get_connection),
+) -> Response:
+    """
+    Return Mapbox Vector Tile of the given layer with polygons identifiers and names.
+    """
+    return Response(await get_tile_from_db(conn, layer, z, x, y), media_type="application/vnd.mapbox-vector-tile")
@@ -1,22 +1,37 @@
 """
 update endpoint is defined here.
 """
-from typing import Any
+from uuid import UUID
 
-from fastapi import Depends
+from fastapi import Depends, Path, Request
+from fastapi.responses import StreamingResponse
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncConnection
 from starlette import status
 
 from plants_api.db.connection import get_connection
 from plants_api.dto.users import User
-from plants_api.logic.limitations import get_all_limitation_factors
-from plants_api.logic.update import delete_limitation_factors, insert_limitation_factors
+from plants_api.logic.limitations import stream_all_limitation_factors
+from plants_api.logic.update import (
+    abort_limitation_factors_upload,
+    commit_limitation_factors_upload,
+    delete_limitation_factors,
+    get_limitation_factors_upload,
+    get_upload_part_format,
+    insert_limitation_factors,
+    start_limitation_factors_upload,
+    upload_limitation_factors_part,
+)
+from plants_api.logic.update.limitation_factors_uploads import UPLOAD_PART_CONTENT_TYPES
 from plants_api.schemas.basic_requests import IdsRequest
 from plants_api.schemas.basic_responses import IdsResponse, OkResponse
 from plants_api.schemas.features.basic import IdOnly
 from plants_api.schemas.geojson import GeoJSONResponse
-from plants_api.schemas.update import LimitationFactorsGeometryInsertionRequest
+from plants_api.schemas.update import (
+    LimitationFactorsGeometryInsertionRequest,
+    LimitationFactorsUploadRequest,
+    LimitationFactorsUploadResponse,
+)
 from plants_api.utils.dependencies import user_dependency
 
 from .router import update_router
@@ -47,12 +62,15 @@ async def add_limitation_factors(
 async def get_limitation_factors_by_type(
     type_id: int,
     _user: User = Depends(user_dependency),
-    connection: AsyncConnection = Depends(get_connection),
-) -> GeoJSONResponse[IdOnly]:
+) -> StreamingResponse:
     """
     Get all limitation factor polygons of the given limitation factor from the database.
+
+    GeoJSON is encoded by the database and streamed as is.
     """
-    return await GeoJSONResponse[dict[str, Any]].from_list(await get_all_limitation_factors(connection, type_id))
+    return StreamingResponse(
+        GeoJSONResponse.stream(stream_all_limitation_factors(type_id)), media_type="application/json"
+    )
 
 
 @update_router.delete(
@@ -71,3 +89,103 @@ async def remove_limitation_factors(
     logger.info("Deleting {} limitation factors by user {}", len(limitation_factors_ids.ids), user)
     await delete_limitation_factors(connection, limitation_factors_ids.ids)
     return OkResponse()
+
+
+@update_router.post(
+    "/limitation_factors/uploads",
+    response_model=LimitationFactorsUploadResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def start_limitation_factors_layer_upload(
+    upload: LimitationFactorsUploadRequest,
+    user: User = Depends(user_dependency),
+    connection: AsyncConnection = Depends(get_connection),
+) -> LimitationFactorsUploadResponse:
+    """
+    Start a chunked upload which replaces the whole layer of the given limitation factor on commit.
+    """
+    logger.info("Starting limitation factor {} layer upload by user {}", upload.limitation_factor_id, user)
+    return LimitationFactorsUploadResponse.from_dto(
+        await start_limitation_factors_upload(connection, upload.limitation_factor_id, user.id)
+    )
+
+
+@update_router.get(
+    "/limitation_factors/uploads/{upload_id}",
+    response_model=LimitationFactorsUploadResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_limitation_factors_layer_upload(
+    upload_id: UUID,
+    _user: User = Depends(user_dependency),
+    connection: AsyncConnection = Depends(get_connection),
+) -> LimitationFactorsUploadResponse:
+    """
+    Get limitation factor layer upload progress.
+    """
+    return LimitationFactorsUploadResponse.from_dto(await get_limitation_factors_upload(connection, upload_id))
+
+
+@update_router.put(
+    "/limitation_factors/uploads/{upload_id}/parts/{part_number}",
+    response_model=LimitationFactorsUploadResponse,
+    status_code=status.HTTP_200_OK,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                content_type: {"schema": {"type": "string", "format": "binary"}}
+                for content_type in UPLOAD_PART_CONTENT_TYPES
+            },
+        }
+    },
+)
+async def upload_limitation_factors_layer_part(
+    upload_id: UUID,
+    request: Request,
+    part_number: int = Path(ge=0),
+    _user: User = Depends(user_dependency),
+    connection: AsyncConnection = Depends(get_connection),
+) -> LimitationFactorsUploadResponse:
+    """
+    Upload a part of the limitation factor layer: GeoJSON features or geometries (in EPSG:4326) on separate lines
+    as NDJSON, or a GeoParquet file. Sending a part with the same number again replaces its geometries.
+    """
+    part_format = get_upload_part_format(request.headers.get("content-type"))
+    return LimitationFactorsUploadResponse.from_dto(
+        await upload_limitation_factors_part(connection, upload_id, part_number, await request.body(), part_format)
+    )
+
+
+@update_router.post(
+    "/limitation_factors/uploads/{upload_id}/commit",
+    response_model=LimitationFactorsUploadResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def commit_limitation_factors_layer_upload(
+    upload_id: UUID,
+    user: User = Depends(user_dependency),
+    connection: AsyncConnection = Depends(get_connection),
+) -> LimitationFactorsUploadResponse:
+    """
+    Atomically replace all of the limitation factor polygons with the uploaded ones.
+    """
+    logger.info("Committing limitation factors layer upload {} by user {}", upload_id, user)
+    return LimitationFactorsUploadResponse.from_dto(await commit_limitation_factors_upload(connection, upload_id))
+
+
+@update_router.delete(
+    "/limitation_factors/uploads/{upload_id}",
+    response_model=OkResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def abort_limitation_factors_layer_upload(
+    upload_id: UUID,
+    _user: User = Depends(user_dependency),
+    connection: AsyncConnection = Depends(get_connection),
+) -> OkResponse:
+    """
+    Abort uncommitted limitation factor layer upload removing its uploaded geometries.
+    """
+    await abort_limitation_factors_upload(connection, upload_id)
+    return OkResponse()
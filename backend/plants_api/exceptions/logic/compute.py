@@ -0,0 +1,28 @@
+"""
+Exceptions connected with CPU-bound computations executor are defined here.
+"""
+from fastapi import status
+
+from plants_api.exceptions import PlantsApiError
+
+
+class ComputeQueueIsFull(PlantsApiError):
+    """
+    Exception to raise when the computations executor queue is full and the task cannot be accepted.
+    """
+
+    def __init__(self, queue_size: int):
+        """
+        Construct from the executor queue size.
+        """
+        self.queue_size = queue_size
+        super().__init__()
+
+    def __str__(self) -> str:
+        return f"Server is busy: all of the {self.queue_size} computation queue places are taken, try again later"
+
+    def get_status_code(self) -> int:
+        """
+        Return '503 Service Unavailable' status code.
+        """
+        return status.HTTP_503_SERVICE_UNAVAILABLE
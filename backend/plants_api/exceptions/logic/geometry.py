@@ -27,3 +27,27 @@ class TooLargeGeometryError(PlantsApiError):
         Return '400 Bad Request' status code.
         """
         return status.HTTP_400_BAD_REQUEST
+
+
+class TileOutOfBoundsError(PlantsApiError):
+    """
+    Exception to raise when the requested tile coordinates are out of the zoom level bounds.
+    """
+
+    def __init__(self, z: int, x: int, y: int):
+        """
+        Construct from the requested tile coordinates.
+        """
+        self.z = z  # pylint: disable=invalid-name
+        self.x = x  # pylint: disable=invalid-name
+        self.y = y  # pylint: disable=invalid-name
+        super().__init__()
+
+    def __str__(self) -> str:
+        return f"Tile {self.z}/{self.x}/{self.y} is out of bounds"
+
+    def get_status_code(self) -> int:
+        """
+        Return '404 Not found' status code.
+        """
+        return status.HTTP_404_NOT_FOUND
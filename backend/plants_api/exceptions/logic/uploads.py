@@ -0,0 +1,78 @@
+"""
+Exceptions connected with chunked layers uploads are defined here.
+"""
+from uuid import UUID
+
+from fastapi import status
+
+from plants_api.exceptions import PlantsApiError
+
+
+class UploadAlreadyCommittedError(PlantsApiError):
+    """
+    Exception to raise when the upload is modified after its data has already been applied.
+    """
+
+    def __init__(self, upload_id: UUID):
+        """
+        Construct from the upload identifier.
+        """
+        self.upload_id = upload_id
+        super().__init__()
+
+    def __str__(self) -> str:
+        return f"Upload {self.upload_id} is already committed"
+
+    def get_status_code(self) -> int:
+        """
+        Return '409 Conflict' status code.
+        """
+        return status.HTTP_409_CONFLICT
+
+
+class UnsupportedUploadPartFormatError(PlantsApiError):
+    """
+    Exception to raise when the upload part is given with an unknown content type.
+    """
+
+    def __init__(self, content_type: str | None, supported: list[str]):
+        """
+        Construct from the given and supported content types.
+        """
+        self.content_type = content_type
+        self.supported = supported
+        super().__init__()
+
+    def __str__(self) -> str:
+        return f"Unsupported upload part content type '{self.content_type}', use one of: {', '.join(self.supported)}"
+
+    def get_status_code(self) -> int:
+        """
+        Return '415 Unsupported Media Type' status code.
+        """
+        return status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+
+class UploadPartParseError(PlantsApiError):
+    """
+    Exception to raise when the upload part geometries cannot be read.
+    """
+
+    def __init__(self, upload_id: UUID, part_number: int):
+        """
+        Construct from the upload identifier and part number.
+        """
+        self.upload_id = upload_id
+        self.part_number = part_number
+        super().__init__()
+
+    def __str__(self) -> str:
+        return f"Part {self.part_number} of upload {self.upload_id} cannot be read" + (
+            f" (error was {self.__cause__!r})" if self.__cause__ is not None else ""
+        )
+
+    def get_status_code(self) -> int:
+        """
+        Return '400 Bad Request' status code.
+        """
+        return status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,202 @@
+"""
+Cached data versioning logic is defined here.
+
+Each data-changing operation increases version of the affected data in `cache_versions` table and notifies
+all of the application workers via Postgres NOTIFY. Workers keep versions of the data they have loaded and
+reload cached values lazily - on the next use after the version has changed.
+
+Latest versions are kept in memory by `CacheVersionsListener`, so checking cached data actuality does not query
+the database. While the listening connection is lost, the last known versions are served and changes made
+meanwhile are picked up after reconnection. The database is queried only if no versions were received at all.
+"""
+import asyncio
+from enum import Enum
+
+import asyncpg
+from loguru import logger
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from plants_api.config.app_settings_global import app_settings
+from plants_api.db.entities import cache_versions
+
+
+CACHE_VERSIONS_CHANNEL = "plants_api_cache_versions"
+_RECONNECT_MIN_DELAY = 1.0
+_RECONNECT_MAX_DELAY = 60.0
+
+
+class CachedData(str, Enum):
+    """
+    Application-cached data enumeration, values are names in `cache_versions` table.
+    """
+
+    PLANTS = "plants"
+    GENERA_COHABITATION = "genera_cohabitation"
+    GLOBAL_TERRITORY = "global_territory"
+
+
+_loaded_versions: dict[CachedData, int] = {}
+
+
+class CacheVersionsListener:
+    """
+    A class that listens to cache versions changes notifications on a separate database connection and keeps
+    the latest versions in memory.
+
+    When the listening connection is lost, the last known versions are kept and reconnection is performed in
+    background with exponential backoff. Versions are requested again after reconnecting as notifications
+    could be missed meanwhile.
+    """
+
+    def __init__(self) -> None:
+        """
+        Perform base initialization once in a application run.
+        """
+        if not hasattr(self, "initialized"):
+            self.initialized = False
+            self.connection: asyncpg.Connection | None = None
+            self.latest_versions: dict[CachedData, int] = {}
+            self._reconnect_task: asyncio.Task | None = None
+
+    def __new__(cls):
+        """
+        Every constructed entity will be one object.
+        """
+        if not hasattr(cls, "instance"):
+            cls.instance = super(CacheVersionsListener, cls).__new__(cls)
+        return cls.instance
+
+    @property
+    def is_listening(self) -> bool:
+        """
+        Check if notifications are received, so the latest versions are actual.
+        """
+        return self.connection is not None and not self.connection.is_closed()
+
+    def set_version(self, cached_data: CachedData, version: int) -> None:
+        """
+        Update the latest version of the given cached data, versions never decrease.
+        """
+        self.latest_versions[cached_data] = max(self.latest_versions.get(cached_data, 0), version)
+
+    def _on_notification(self, _connection: asyncpg.Connection, _pid: int, _channel: str, payload: str) -> None:
+        name, version = payload.rsplit(":", 1)
+        try:
+            cached_data = CachedData(name)
+        except ValueError:
+            logger.warning("Got version of unknown cached data: {}", payload)
+            return
+        logger.debug("Cached data {} version has changed to {}", name, version)
+        self.set_version(cached_data, int(version))
+
+    def _on_termination(self, connection: asyncpg.Connection) -> None:
+        if connection is not self.connection or not self.initialized:
+            return
+        logger.warning(
+            "Cache versions listening connection is closed, last known versions are used until reconnection"
+        )
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _connect(self) -> None:
+        """
+        Open a listening connection and get current versions.
+        """
+        connection = await asyncpg.connect(**app_settings.database_settings)
+        try:
+            connection.add_termination_listener(self._on_termination)
+            await connection.add_listener(CACHE_VERSIONS_CHANNEL, self._on_notification)
+            versions = await connection.fetch("SELECT name, version FROM cache_versions")
+        except Exception:
+            await connection.close()
+            raise
+        for name, version in versions:
+            try:
+                cached_data = CachedData(name)
+            except ValueError:
+                continue
+            self.set_version(cached_data, version)
+        self.connection = connection
+        logger.info("Listening to cache versions changes, current versions: {}", self.latest_versions)
+
+    async def _reconnect(self) -> None:
+        """
+        Reopen the listening connection, retrying with exponential backoff until it succeeds.
+        """
+        delay = _RECONNECT_MIN_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+                return
+            except Exception as exc:  # pylint: disable=broad-except
+                delay = min(delay * 2, _RECONNECT_MAX_DELAY)
+                logger.warning("Could not reconnect cache versions listener, retrying in {}s: {!r}", delay, exc)
+
+    async def start(self) -> None:
+        """
+        Open a listening connection and get current versions.
+        """
+        await self.stop()
+        await self._connect()
+        self.initialized = True
+
+    async def stop(self) -> None:
+        """
+        Stop reconnecting and close the listening connection.
+        """
+        self.initialized = False
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        connection, self.connection = self.connection, None
+        if connection is not None and not connection.is_closed():
+            await connection.close()
+
+
+async def get_cache_version(conn: AsyncConnection, cached_data: CachedData) -> int:
+    """
+    Get the latest version of the given cached data. The last known version is returned without querying
+    the database even if the listening connection is lost at the moment.
+    """
+    listener = CacheVersionsListener()
+    if cached_data in listener.latest_versions:
+        return listener.latest_versions[cached_data]
+    statement = select(cache_versions.c.version).where(cache_versions.c.name == cached_data.value)
+    return (await conn.execute(statement)).scalar_one_or_none() or 0
+
+
+async def is_cache_actual(conn: AsyncConnection, cached_data: CachedData) -> bool:
+    """
+    Check if the loaded version of the given cached data is the latest one.
+    """
+    if cached_data not in _loaded_versions:
+        return False
+    return _loaded_versions[cached_data] == await get_cache_version(conn, cached_data)
+
+
+def set_cache_loaded(cached_data: CachedData, version: int) -> None:
+    """
+    Set version of the loaded cached data. Version should be requested before the data loading.
+    """
+    _loaded_versions[cached_data] = version
+
+
+async def bump_cache_versions(conn: AsyncConnection, *cached_data: CachedData) -> None:
+    """
+    Increase versions of the given cached data and notify all of the workers. Changes are applied on transaction
+    commit, which is left to the caller.
+    """
+    statement = (
+        update(cache_versions)
+        .values(version=cache_versions.c.version + 1, updated_at=func.now())
+        .where(cache_versions.c.name.in_([data.value for data in cached_data]))
+        .returning(cache_versions.c.name, cache_versions.c.version)
+    )
+    for name, version in list(await conn.execute(statement)):
+        logger.debug("Increasing cached data {} version to {}", name, version)
+        await conn.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CACHE_VERSIONS_CHANNEL, "payload": f"{name}:{version}"},
+        )
@@ -1,17 +1,23 @@
 """
 Main compositioning method logic is defined here.
 """
+import asyncio
+from enum import Enum
+
 import geopandas as gpd
-from derevo import GeneraCohabitation, GlobalTerritory, Plant, Territory
+import numpy as np
+import pandas as pd
+import shapely
+from derevo import CompatibilityIndex, GeneraCohabitation, GlobalTerritory, Plant, Territory, ToleranceMatrix
 from derevo import enumerations as c_enum
-from derevo import get_compositions
-from derevo import get_territory as cm_get_territory
+from derevo.timing import span
+from geoalchemy2.functions import ST_AsEWKB
 from loguru import logger
 from shapely.geometry.base import BaseGeometry
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncConnection
-from sqlalchemy.util import greenlet_spawn
 
+from plants_api.db.connection.session import SessionManager
 from plants_api.db.entities import (
     humidity_type_parts,
     humidity_types,
@@ -25,7 +31,10 @@ from plants_api.db.entities import (
     territories,
 )
 from plants_api.dto import PlantDto
-from plants_api.logic.plants import get_plants_by_name_ru
+from plants_api.logic.cache_versions import CachedData, get_cache_version, is_cache_actual, set_cache_loaded
+from plants_api.logic.executor import ComputeExecutor
+from plants_api.logic.plants import get_cached_plants_by_name_ru
+from plants_api.logic.snapshot import load_global_territory_snapshot, save_global_territory_snapshot
 from plants_api.utils.adapters.derevo_enums import EnumAdapters
 
 
@@ -36,10 +45,11 @@ async def get_global_territory(conn: AsyncConnection, use_cached: bool = True) -
     """
     Collect polygons of different factors as a GlobalTerritory for the copositioner method.
 
-    Collects once and uses cached version unless `use_cache` is not set to False.
+    Collects once and uses cached version unless `use_cache` is not set to False or global territory data version
+    is changed. Local snapshot of the current data version is used instead of the database if present.
     """
     global _cached_global_territory  # pylint: disable=invalid-name,global-statement
-    if use_cached and _cached_global_territory is not None:
+    if use_cached and _cached_global_territory is not None and await is_cache_actual(conn, CachedData.GLOBAL_TERRITORY):
         logger.debug(
             "Using cached global territory with the next number of polygons: {} limitation factor,"
             " {} light type, {} humidity type,"
@@ -51,58 +61,81 @@ async def get_global_territory(conn: AsyncConnection, use_cached: bool = True) -
         )
         return _cached_global_territory
 
-    logger.debug("Getting global territory")
+    version = await get_cache_version(conn, CachedData.GLOBAL_TERRITORY)
     usda_zone = c_enum.UsdaZone.USDA5  # hard-coded for now
+    global_territory = await asyncio.to_thread(load_global_territory_snapshot, version, usda_zone)
+    if global_territory is None:
+        global_territory = await _get_global_territory_from_db(usda_zone)
+        await asyncio.to_thread(save_global_territory_snapshot, version, global_territory)
+    _cached_global_territory = global_territory
+    set_cache_loaded(CachedData.GLOBAL_TERRITORY, version)
+    return global_territory
+
 
-    lf_gdf = await greenlet_spawn(
-        lambda: gpd.read_postgis(
-            select(limitation_factors.c.name, limitation_factor_parts.c.geometry)
+def _names_to_enum(names: pd.Series, names_adapter: dict[str, Enum]) -> np.ndarray:
+    """
+    Map database names to enumeration members (None for unknown ones) through categorical codes, so the adapter
+    is used once for each of the unique names.
+    """
+    categorical = pd.Categorical(names)
+    members = np.array([names_adapter.get(name) for name in categorical.categories] + [None], dtype=object)
+    return members[categorical.codes]
+
+
+async def _get_layer(statement: Select, names_adapters: dict[str, dict[str, Enum]]) -> gpd.GeoDataFrame:
+    """
+    Get a GeoDataFrame of a statement with names columns and "geometry" column selected as EWKB on a separate
+    pooled connection. Geometries are decoded in bulk and names are mapped to enumeration members with the given
+    adapters by columns.
+    """
+    async with SessionManager().engine.connect() as conn:
+        result = await conn.execute(statement)
+        data = pd.DataFrame(result.all(), columns=list(result.keys()))
+    geometry = shapely.from_wkb(data["geometry"].to_numpy())
+    srid = shapely.get_srid(geometry[0]) if geometry.shape[0] != 0 else 0
+    return gpd.GeoDataFrame(
+        {column: _names_to_enum(data[column], names_adapter) for column, names_adapter in names_adapters.items()},
+        geometry=geometry,
+        crs=srid if srid > 0 else None,
+    )
+
+
+async def _get_global_territory_from_db(usda_zone: c_enum.UsdaZone | None) -> GlobalTerritory:
+    """
+    Collect polygons of different factors from the database as a GlobalTerritory. Layers are loaded concurrently.
+    """
+    logger.debug("Getting global territory")
+    lf_gdf, lt_gdf, ht_gdf, terr_gdf = await asyncio.gather(
+        _get_layer(
+            select(limitation_factors.c.name, ST_AsEWKB(limitation_factor_parts.c.geometry).label("geometry"))
             .select_from(limitation_factors)
             .join(
                 limitation_factor_parts,
                 limitation_factors.c.id == limitation_factor_parts.c.limitation_factor_id,
             ),
-            conn.sync_engine,
-            geom_col="geometry",
-        )
-    )
-    lf_gdf["name"] = lf_gdf["name"].apply(EnumAdapters.limitation_factors.get)
-    lf_gdf = lf_gdf.dropna(subset="name")
-
-    lt_gdf = await greenlet_spawn(
-        lambda: gpd.read_postgis(
-            select(light_types.c.name, light_type_parts.c.geometry)
+            {"name": EnumAdapters.limitation_factors},
+        ),
+        _get_layer(
+            select(light_types.c.name, ST_AsEWKB(light_type_parts.c.geometry).label("geometry"))
             .select_from(light_types)
             .join(light_type_parts, light_types.c.id == light_type_parts.c.light_type_id),
-            conn.sync_engine,
-            geom_col="geometry",
-        )
-    )
-    lt_gdf["name"] = lt_gdf["name"].apply(EnumAdapters.light.get)
-    lt_gdf = lt_gdf.dropna(subset="name")
-
-    ht_gdf = await greenlet_spawn(
-        lambda: gpd.read_postgis(
-            select(humidity_types.c.name, humidity_type_parts.c.geometry)
+            {"name": EnumAdapters.light},
+        ),
+        _get_layer(
+            select(humidity_types.c.name, ST_AsEWKB(humidity_type_parts.c.geometry).label("geometry"))
             .select_from(humidity_types)
             .join(
                 humidity_type_parts,
                 humidity_types.c.id == humidity_type_parts.c.humidity_type_id,
             ),
-            conn.sync_engine,
-            geom_col="geometry",
-        )
-    )
-    ht_gdf["name"] = ht_gdf["name"].apply(EnumAdapters.humidity.get)
-    ht_gdf = ht_gdf.dropna(subset="name")
-
-    terr_gdf = await greenlet_spawn(
-        lambda: gpd.read_postgis(
+            {"name": EnumAdapters.humidity},
+        ),
+        _get_layer(
             select(
                 soil_types.c.name.label("soil_type"),
                 soil_acidity_types.c.name.label("acidity_type"),
                 soil_fertility_types.c.name.label("fertility_type"),
-                territories.c.geometry,
+                ST_AsEWKB(territories.c.geometry).label("geometry"),
             )
             .select_from(territories)
             .join(soil_types, soil_types.c.id == territories.c.type_id)
@@ -114,13 +147,16 @@ async def get_global_territory(conn: AsyncConnection, use_cached: bool = True) -
                 soil_fertility_types,
                 soil_fertility_types.c.id == territories.c.fertility_type_id,
             ),
-            conn.sync_engine,
-            geom_col="geometry",
-        )
+            {
+                "soil_type": EnumAdapters.soil,
+                "acidity_type": EnumAdapters.acidity,
+                "fertility_type": EnumAdapters.fertility,
+            },
+        ),
     )
-    terr_gdf["soil_type"] = terr_gdf["soil_type"].apply(EnumAdapters.soil.get)
-    terr_gdf["acidity_type"] = terr_gdf["acidity_type"].apply(EnumAdapters.acidity.get)
-    terr_gdf["fertility_type"] = terr_gdf["fertility_type"].apply(EnumAdapters.fertility.get)
+    lf_gdf = lf_gdf.dropna(subset="name")
+    lt_gdf = lt_gdf.dropna(subset="name")
+    ht_gdf = ht_gdf.dropna(subset="name")
 
     global_territory = GlobalTerritory(
         usda_zone,
@@ -131,7 +167,6 @@ async def get_global_territory(conn: AsyncConnection, use_cached: bool = True) -
         terr_gdf[["acidity_type", "geometry"]].rename({"acidity_type": "name"}, axis=1).dropna(subset="name"),
         terr_gdf[["fertility_type", "geometry"]].rename({"fertility_type": "name"}, axis=1).dropna(subset="name"),
     )
-    _cached_global_territory = global_territory
     logger.debug(
         "Global territory has next number of polygons: {} limitation factor, {} light type, {} humidity type,"
         " and {} territory (soil + acidity + fertility)",
@@ -143,23 +178,41 @@ async def get_global_territory(conn: AsyncConnection, use_cached: bool = True) -
     return global_territory
 
 
-def get_territory(polygon: BaseGeometry, global_territory: GlobalTerritory) -> Territory:
+async def get_territory(polygon: BaseGeometry, global_territory: GlobalTerritory) -> Territory:
     """
-    Form a Territory object from polygon and global territory.
+    Form a Territory object from polygon and global territory in the computations pool.
     """
-    return cm_get_territory(polygon, global_territory)
+    return await ComputeExecutor().get_territory(polygon, global_territory)
 
 
-async def get_plants_compositions(
+async def get_plants_compositions(  # pylint: disable=too-many-arguments,too-many-positional-arguments
     conn: AsyncConnection,
     plants_available: list[Plant],
     territory: Territory,
     cohabitation_attributes: list[GeneraCohabitation],
     plants_present: list[Plant],
+    tolerance_matrix: ToleranceMatrix | None = None,
+    compatibility_index: CompatibilityIndex | None = None,
 ) -> list[list[PlantDto]]:
     """
     Get plants composition that will cohabitate well with the given plants already present in the territory.
+
+    Compositions are computed in the computations pool.
     """
-    compositions = get_compositions(plants_available, territory, cohabitation_attributes, plants_present)
+    compositions = await ComputeExecutor().get_compositions(
+        plants_available,
+        territory,
+        cohabitation_attributes,
+        plants_present,
+        tolerance_matrix,
+        compatibility_index,
+    )
 
-    return [await get_plants_by_name_ru(conn, [p.name_ru for p in composition]) for composition in compositions]
+    with span("dto_hydration"):
+        plants_dtos = await get_cached_plants_by_name_ru(
+            conn, [plant.name_ru for composition in compositions for plant in composition]
+        )
+        return [
+            [plants_dtos[plant.name_ru] for plant in composition if plant.name_ru in plants_dtos]
+            for composition in compositions
+        ]
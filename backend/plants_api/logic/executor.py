@@ -0,0 +1,342 @@
+"""
+Executor of CPU-bound computations (territory lookup, compositions and PDF generation) is defined here.
+
+Computations run in a thread or process pool so the event loop is not blocked by them. Process pool workers
+get the plants catalog, genera cohabitation and global territory once on initialization instead of receiving
+them with each of the tasks. When the data changes, its version is increased and a worker having an outdated
+version gets the new data along with the next task it runs, so the pool is never recreated. Compositions are
+memoized with `derevo.CompositionsCache` and PDF thumbnails are decoded once in each of the pool processes,
+clearing of these caches is passed to the workers the same way with a cache generation number. Stages durations
+recorded by the tasks with `derevo.timing` are returned along with the results and added to the timer of the calling
+request, the same goes for cProfile statistics of the profiled requests.
+"""
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
+from functools import partial
+from io import BytesIO
+from typing import Any, Callable, Literal
+
+from borb.pdf import PDF
+from derevo import (
+    CompatibilityIndex,
+    CompositionsCache,
+    GeneraCohabitation,
+    GlobalTerritory,
+    Plant,
+    Territory,
+    ToleranceMatrix,
+)
+from derevo import get_territory as cm_get_territory
+from derevo.timing import collect_timings, get_current_timer
+from loguru import logger
+from shapely.geometry.base import BaseGeometry
+
+from plants_api.config import AppSettings
+from plants_api.config.app_settings_global import app_settings
+from plants_api.dto import PlantDto
+from plants_api.exceptions.logic.compute import ComputeQueueIsFull
+from plants_api.logic.pdf import clear_thumbnails_cache, compositions_to_pdf
+from plants_api.utils.profiling import get_current_profile, profile_call
+
+
+ComputeExecutorType = Literal["thread", "process"]
+COMPUTE_EXECUTOR_TYPES: tuple[ComputeExecutorType, ...] = ("thread", "process")
+
+_worker_state: dict[str, Any] = {}
+_worker_versions = {"state": 0, "caches": 0}
+_compositions_cache: CompositionsCache | None = None
+
+
+class _OutdatedState:  # pylint: disable=too-few-public-methods
+    """
+    Result of a process pool task which was not run as the worker has outdated computations data.
+    """
+
+
+def _reset_compositions_cache() -> None:
+    """
+    Replace compositions cache of the current process with an empty one of a size set in settings.
+    """
+    global _compositions_cache  # pylint: disable=invalid-name,global-statement
+    _compositions_cache = CompositionsCache(app_settings.compositions_cache_size)
+
+
+def _init_worker(settings: AppSettings, state: dict[str, Any], state_version: int, cache_generation: int) -> None:
+    """
+    Initialize process pool worker with application settings and computations data.
+    """
+    app_settings.update(settings)
+    _worker_state.update(state)
+    _worker_versions.update(state=state_version, caches=cache_generation)
+    _reset_compositions_cache()
+
+
+def _timed_task(func: Callable, *args: Any, profile: bool = False) -> tuple[Any, dict[str, float], dict | None]:
+    """
+    Run the given function collecting its stages durations, and cProfile statistics if `profile` is set.
+    """
+    with collect_timings() as timer:
+        if profile:
+            result, stats = profile_call(func, *args)
+            return result, timer.stages, stats
+        return func(*args), timer.stages, None
+
+
+def _process_task(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    func: Callable,
+    args: tuple,
+    profile: bool,
+    state_version: int,
+    cache_generation: int,
+    state: dict[str, Any] | None = None,
+) -> tuple[Any, dict[str, float], dict | None] | _OutdatedState:
+    """
+    Run the given function in a process pool worker with `_timed_task`. Worker computations data is replaced
+    if `state` is given, and `_OutdatedState` is returned without running the function if worker data version
+    differs from the given one. Compositions and thumbnails caches are cleared if their generation differs from
+    the given one.
+    """
+    if state is not None:
+        _worker_state.clear()
+        _worker_state.update(state)
+        _worker_versions["state"] = state_version
+    if _worker_versions["state"] != state_version:
+        return _OutdatedState()
+    if _worker_versions["caches"] != cache_generation:
+        _reset_compositions_cache()
+        clear_thumbnails_cache()
+        _worker_versions["caches"] = cache_generation
+    return _timed_task(func, *args, profile=profile)
+
+
+def _get_territory_task(polygon: BaseGeometry, global_territory: GlobalTerritory | None = None) -> Territory:
+    """
+    Get territory of a given polygon. Process pool worker uses global territory set on initialization.
+    """
+    if global_territory is None:
+        global_territory = _worker_state["global_territory"]
+    return cm_get_territory(polygon, global_territory)
+
+
+def _get_compositions_task(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    territory: Territory,
+    plants_present: list[Plant],
+    communities_backend: str,
+    plants_available: list[Plant] | None = None,
+    cohabitation_attributes: list[GeneraCohabitation] | None = None,
+    tolerance_matrix: ToleranceMatrix | None = None,
+    compatibility_index: CompatibilityIndex | None = None,
+) -> list[list[Plant]]:
+    """
+    Get plants compositions from the compositions cache. Process pool worker uses plants and cohabitation data
+    set on initialization.
+    """
+    if plants_available is None:
+        plants_available = _worker_state["plants_available"]
+        cohabitation_attributes = _worker_state["cohabitation_attributes"]
+        tolerance_matrix = _worker_state["tolerance_matrix"]
+        compatibility_index = _worker_state["compatibility_index"]
+    return _compositions_cache.get_compositions(
+        plants_available,
+        territory,
+        cohabitation_attributes,
+        plants_present,
+        tolerance_matrix=tolerance_matrix,
+        compatibility_index=compatibility_index,
+        communities_backend=communities_backend,
+    )
+
+
+def _compositions_pdf_task(compositions: list[list[PlantDto]], territory: Territory) -> bytes:
+    """
+    Form a PDF file with given compositions and return its contents.
+    """
+    pdf = compositions_to_pdf(compositions, territory)
+    with BytesIO() as buffer:
+        PDF.dumps(buffer, pdf)
+        return buffer.getvalue()
+
+
+class ComputeExecutor:
+    """
+    A class that runs CPU-bound computations in a pool configured by global settings: `compute_executor` sets
+    pool type, `compute_workers` - number of workers, and `compute_queue_size` - number of tasks which can wait
+    for a free worker. When the queue is full, `ComputeQueueIsFull` is raised.
+    """
+
+    def __init__(self) -> None:
+        """
+        Perform base initialization once in a application run.
+        """
+        if not hasattr(self, "initialized"):
+            self.initialized = False
+            self.executor: Executor = None  # type: ignore
+            self._state: dict[str, Any] = {}
+            self._state_version = 0
+            self._cache_generation = 0
+            self._tasks_count = 0
+
+    def __new__(cls):
+        """
+        Every constructed entity will be one object.
+        """
+        if not hasattr(cls, "instance"):
+            cls.instance = super(ComputeExecutor, cls).__new__(cls)
+        return cls.instance
+
+    @property
+    def is_process_pool(self) -> bool:
+        """
+        Check if computations are performed in separate processes.
+        """
+        return app_settings.compute_executor == "process"
+
+    def refresh(self) -> None:
+        """
+        Recreate a pool with current settings and state. Running tasks of the previous pool are not cancelled.
+
+        It is meant to be called once on startup after computations data is set with `set_state`.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        _reset_compositions_cache()
+        logger.info(
+            "Creating {} pool for computations with {} workers and queue size = {}",
+            app_settings.compute_executor,
+            app_settings.compute_workers,
+            app_settings.compute_queue_size,
+        )
+        if self.is_process_pool:
+            self.executor = ProcessPoolExecutor(
+                app_settings.compute_workers,
+                initializer=_init_worker,
+                initargs=(replace(app_settings), self._state, self._state_version, self._cache_generation),
+            )
+        else:
+            self.executor = ThreadPoolExecutor(app_settings.compute_workers, thread_name_prefix="compute")
+        self.initialized = True
+
+    def shutdown(self) -> None:
+        """
+        Shutdown the pool and deinitialize.
+        """
+        if self.initialized and self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            self.initialized = False
+
+    def clear_caches(self) -> None:
+        """
+        Drop memoized compositions and decoded PDF thumbnails. Process pool workers clear their caches before
+        running the next task.
+        """
+        if _compositions_cache is not None:
+            logger.debug("Clearing compositions cache: {}", _compositions_cache.info())
+        self._cache_generation += 1
+        _reset_compositions_cache()
+        clear_thumbnails_cache()
+
+    def set_state(self, **values: Any) -> None:
+        """
+        Update data set to the process pool workers, its version is increased if any of values has changed.
+        """
+        if all(self._state.get(name) is value for name, value in values.items()):
+            return
+        logger.debug("Computations data has changed ({}), workers will get it with the next tasks", ", ".join(values))
+        self._state = self._state | values
+        self._state_version += 1
+
+    async def _run(self, func: Callable, *args: Any) -> Any:
+        """
+        Run the given function in the pool, raise `ComputeQueueIsFull` if the queue is full.
+        """
+        if not self.initialized:
+            self.refresh()
+        if self._tasks_count >= app_settings.compute_workers + app_settings.compute_queue_size:
+            raise ComputeQueueIsFull(app_settings.compute_queue_size)
+        self._tasks_count += 1
+        profile = get_current_profile()
+        try:
+            if self.is_process_pool:
+                result, stages, stats = await self._run_in_process(func, args, profile is not None)
+            else:
+                result, stages, stats = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, partial(_timed_task, func, *args, profile=profile is not None)
+                )
+        finally:
+            self._tasks_count -= 1
+        if (timer := get_current_timer()) is not None:
+            timer.update(stages)
+        if profile is not None:
+            profile.add_stats(stats)
+        return result
+
+    async def _run_in_process(
+        self, func: Callable, args: tuple, profile: bool
+    ) -> tuple[Any, dict[str, float], dict | None]:
+        """
+        Run the given function in the process pool, the task is resubmitted with the current computations data
+        if the worker which got it has an outdated version of the data.
+        """
+        state = None
+        while True:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                partial(_process_task, func, args, profile, self._state_version, self._cache_generation, state),
+            )
+            if not isinstance(result, _OutdatedState):
+                return result
+            state = self._state
+
+    async def get_territory(self, polygon: BaseGeometry, global_territory: GlobalTerritory) -> Territory:
+        """
+        Get territory of a given polygon from the global territory.
+        """
+        if self.is_process_pool:
+            self.set_state(global_territory=global_territory)
+            return await self._run(_get_territory_task, polygon)
+        return await self._run(_get_territory_task, polygon, global_territory)
+
+    async def get_compositions(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        plants_available: list[Plant],
+        territory: Territory,
+        cohabitation_attributes: list[GeneraCohabitation],
+        plants_present: list[Plant],
+        tolerance_matrix: ToleranceMatrix | None = None,
+        compatibility_index: CompatibilityIndex | None = None,
+    ) -> list[list[Plant]]:
+        """
+        Get plants compositions with `derevo.get_compositions`.
+        """
+        if self.is_process_pool:
+            self.set_state(
+                plants_available=plants_available,
+                cohabitation_attributes=cohabitation_attributes,
+                tolerance_matrix=tolerance_matrix,
+                compatibility_index=compatibility_index,
+            )
+            return await self._run(_get_compositions_task, territory, plants_present, app_settings.communities_backend)
+        return await self._run(
+            _get_compositions_task,
+            territory,
+            plants_present,
+            app_settings.communities_backend,
+            plants_available,
+            cohabitation_attributes,
+            tolerance_matrix,
+            compatibility_index,
+        )
+
+    async def compositions_to_pdf(self, compositions: list[list[PlantDto]], territory: Territory) -> bytes:
+        """
+        Form a PDF file with given compositions and return its contents.
+        """
+        return await self._run(_compositions_pdf_task, compositions, territory)
+
+
+__all__ = [
+    "COMPUTE_EXECUTOR_TYPES",
+    "ComputeExecutor",
+]
@@ -2,23 +2,27 @@
 Logic of user requests of limitations polygons by the given geometry is defined here.
 """
 
-import json
-from typing import Any
+from typing import Any, AsyncIterator
 
 from geoalchemy2 import Geography, Geometry
 from geoalchemy2.functions import ST_AsGeoJSON
 from shapely import geometry as geom
-from sqlalchemy import cast, func, select, text
+from sqlalchemy import JSON, ColumnElement, Text, and_, cast, func, select, text
 from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql.selectable import CTE
 
+from plants_api.db.connection.session import SessionManager
 from plants_api.db.entities import light_type_parts, light_types, limitation_factor_parts, limitation_factors
 
 
-async def get_limitation_factors(conn: AsyncConnection, geometry: geom.Polygon | geom.MultiPolygon) -> dict[str, Any]:
+_STREAM_BATCH_SIZE = 1000
+
+
+def _buffered_geometry(geometry: geom.Polygon | geom.MultiPolygon) -> CTE:
     """
-    Select limitation factors polygons with names.
+    Return CTE with a single `geometry` column - the given geometry buffered by 200 meters.
     """
-    buffered_geom = select(
+    return select(
         cast(
             func.ST_Buffer(
                 cast(
@@ -29,6 +33,24 @@ async def get_limitation_factors(conn: AsyncConnection, geometry: geom.Polygon |
             Geometry("GEOMETRY", "4326"),
         ).label("geometry")
     ).cte("buffered_geom")
+
+
+def _intersects_buffered(parts_geometry: ColumnElement, buffered_geom: CTE) -> ColumnElement:
+    """
+    Return condition of intersection with the buffered geometry. Bounding boxes `&&` prefilter goes first so
+    GiST index on the parts geometry is used, and the exact check is performed only for the candidates.
+    """
+    return and_(
+        parts_geometry.op("&&")(select(func.ST_Envelope(buffered_geom.c.geometry)).scalar_subquery()),
+        func.ST_Intersects(parts_geometry, select(buffered_geom.c.geometry).scalar_subquery()),
+    )
+
+
+async def get_limitation_factors(conn: AsyncConnection, geometry: geom.Polygon | geom.MultiPolygon) -> dict[str, Any]:
+    """
+    Select limitation factors polygons with names.
+    """
+    buffered_geom = _buffered_geometry(geometry)
     statement = (
         select(
             limitation_factor_parts.c.id,
@@ -41,36 +63,40 @@ async def get_limitation_factors(conn: AsyncConnection, geometry: geom.Polygon |
         )
         .select_from(limitation_factors)
         .join(limitation_factor_parts, limitation_factor_parts.c.limitation_factor_id == limitation_factors.c.id)
-        .where(func.ST_Intersects(limitation_factor_parts.c.geometry, select(buffered_geom.c.geometry).as_scalar()))
+        .where(_intersects_buffered(limitation_factor_parts.c.geometry, buffered_geom))
     )
     return [{"id": idx, "name": name, "geometry": geom} for idx, name, geom in await conn.execute(statement)]
 
 
-async def get_all_limitation_factors(conn: AsyncConnection, limitation_factor_type_id: int) -> list[dict[str, Any]]:
+async def stream_all_limitation_factors(limitation_factor_type_id: int) -> AsyncIterator[list[str]]:
     """
-    Get all limitation factor polygons of a given type.
+    Get all limitation factor polygons of a given type as batches of GeoJSON Feature strings encoded by PostGIS.
+
+    Rows are read with a server-side cursor on a separate pooled connection, so it can be used in a streaming
+    response after the request connection is released.
     """
-    statement = select(limitation_factor_parts.c.id, ST_AsGeoJSON(limitation_factor_parts.c.geometry)).where(
+    feature = func.json_build_object(
+        "type",
+        "Feature",
+        "geometry",
+        cast(ST_AsGeoJSON(limitation_factor_parts.c.geometry), JSON),
+        "properties",
+        func.json_build_object("id", limitation_factor_parts.c.id),
+    )
+    statement = select(cast(feature, Text)).where(
         limitation_factor_parts.c.limitation_factor_id == limitation_factor_type_id
     )
-    return [{"id": idx, "geometry": json.loads(geom)} for idx, geom in await conn.execute(statement)]
+    async with SessionManager().engine.connect() as conn:
+        result = await conn.stream(statement)
+        async for features in result.scalars().partitions(_STREAM_BATCH_SIZE):
+            yield features
 
 
 async def get_light(conn: AsyncConnection, geometry: geom.Polygon | geom.MultiPolygon) -> dict[str, Any]:
     """
     Select light polygons with names.
     """
-    buffered_geom = select(
-        cast(
-            func.ST_Buffer(
-                cast(
-                    func.ST_SetSRID(func.ST_GeometryFromText(geometry.wkt), text("4326")), Geography("GEOMETRY", "4326")
-                ),
-                text("200"),
-            ),
-            Geometry("GEOMETRY", "4326"),
-        ).label("geometry")
-    ).cte("buffered_geom")
+    buffered_geom = _buffered_geometry(geometry)
     statement = (
         select(
             light_types.c.id,
@@ -81,6 +107,6 @@ async def get_light(conn: AsyncConnection, geometry: geom.Polygon | geom.MultiPo
         )
         .select_from(light_types)
         .join(light_type_parts, light_type_parts.c.light_type_id == light_types.c.id)
-        .where(func.ST_Intersects(light_type_parts.c.geometry, select(buffered_geom.c.geometry).scalar_subquery()))
+        .where(_intersects_buffered(light_type_parts.c.geometry, buffered_geom))
     )
     return [{"id": idx, "name": name, "geometry": geom} for idx, name, geom in await conn.execute(statement)]
@@ -1,8 +1,15 @@
 """
 Plants compositions PDF generation methods are defined here.
+
+Decoded thumbnails are kept in memory between PDF generations, and the formed PDF files are cached by
+compositions and territory content hash.
 """
+import hashlib
 import os
+import threading
+from collections import OrderedDict
 from decimal import Decimal
+from functools import lru_cache
 from math import ceil
 from pathlib import Path
 
@@ -14,6 +21,7 @@ from PIL import Image as PilImage
 
 from plants_api.config.app_settings_global import app_settings
 from plants_api.dto import PlantDto
+from plants_api.utils.photos import get_thumbnail
 
 
 _FONT = "Helvetica"
@@ -46,6 +54,28 @@ if _FONT == "Helvetica":
 
 _PAGE_SIZE = (1600, 1900)
 _PLANTS_PER_PAGE = 10
+_THUMBNAILS_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=_THUMBNAILS_CACHE_SIZE)
+def _load_thumbnail(path: Path, modification_time: int) -> PilImage.Image:  # pylint: disable=unused-argument
+    """
+    Open and decode thumbnail sized to fit PDF table cell. Modification time is a part of the cache key so
+    the updated files are reloaded.
+    """
+    with PilImage.open(path) as image:
+        thumbnail = get_thumbnail(image)
+    thumbnail.load()
+    return thumbnail
+
+
+def _get_thumbnail(thumbnail_url: str) -> PilImage.Image:
+    """
+    Get a copy of a decoded thumbnail by its url from the in-memory cache. Raise FileNotFoundError if the thumbnail
+    file is missing.
+    """
+    path = Path(app_settings.photos_dir) / thumbnail_url[len(app_settings.photos_prefix) :]
+    return _load_thumbnail(path, path.stat().st_mtime_ns).copy()
 
 
 def _set_layout(page: Page) -> MultiColumnLayout:
@@ -160,10 +190,7 @@ def compositions_to_pdf(  # pylint: disable=too-many-locals,too-many-branches
             img_to_add = Paragraph("")
             if plant.thumbnail_url is not None:
                 try:
-                    pil_img = PilImage.open(
-                        Path(app_settings.photos_dir) / plant.thumbnail_url[len(app_settings.photos_prefix) :]
-                    )
-                    img_to_add = Image(pil_img)
+                    img_to_add = Image(_get_thumbnail(plant.thumbnail_url))
                 except FileNotFoundError:
                     logger.warning(
                         "Thumbnail is not found for plant id={} (thumbnail '{}')", plant.id, plant.thumbnail_url
@@ -177,3 +204,59 @@ def compositions_to_pdf(  # pylint: disable=too-many-locals,too-many-branches
             logger.warning("Could not insert page: {}", exc.args)
 
     return pdf
+
+
+def get_pdf_key(compositions: list[list[PlantDto]], territory: Territory) -> str:
+    """
+    Return content hash of compositions and territory which PDF file is formed for.
+    """
+    hasher = hashlib.sha256(str(territory).encode())
+    for composition in compositions:
+        hasher.update(b"|")
+        for plant in composition:
+            hasher.update(repr(plant).encode())
+    return hasher.hexdigest()
+
+
+_cached_pdfs: OrderedDict[str, bytes] = OrderedDict()
+_cached_pdfs_lock = threading.Lock()
+
+
+def get_cached_pdf(key: str) -> bytes | None:
+    """
+    Get PDF file contents by the key given by `get_pdf_key` if it was cached.
+    """
+    with _cached_pdfs_lock:
+        if key not in _cached_pdfs:
+            return None
+        _cached_pdfs.move_to_end(key)
+        return _cached_pdfs[key]
+
+
+def cache_pdf(key: str, pdf: bytes) -> None:
+    """
+    Cache PDF file contents by the key given by `get_pdf_key`, least recently used files are removed when
+    the cache size set by `pdf_cache_size` setting is exceeded.
+    """
+    with _cached_pdfs_lock:
+        _cached_pdfs[key] = pdf
+        _cached_pdfs.move_to_end(key)
+        while len(_cached_pdfs) > app_settings.pdf_cache_size:
+            _cached_pdfs.popitem(last=False)
+
+
+def clear_thumbnails_cache() -> None:
+    """
+    Remove decoded thumbnails of the current process.
+    """
+    _load_thumbnail.cache_clear()
+
+
+def clear_pdf_caches() -> None:
+    """
+    Remove all of the cached PDF files and decoded thumbnails of the current process (computations pool workers
+    clear their thumbnails with `ComputeExecutor.clear_caches`).
+    """
+    with _cached_pdfs_lock:
+        _cached_pdfs.clear()
+    clear_thumbnails_cache()
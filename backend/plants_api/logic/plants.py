@@ -1,9 +1,10 @@
 """
 Plants endpoints logic of getting entities from the database is defined here.
 """
+import asyncio
 
 from derevo import CohabitationType as CmCohabitationType
-from derevo import GeneraCohabitation, Plant
+from derevo import CompatibilityIndex, GeneraCohabitation, Plant, ToleranceMatrix
 from loguru import logger
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncConnection
@@ -11,6 +12,13 @@ from sqlalchemy.ext.asyncio import AsyncConnection
 from plants_api.db.entities import cohabitation, genera, plant_types, plants
 from plants_api.db.entities.enums import CohabitationType
 from plants_api.dto import PlantDto
+from plants_api.logic.cache_versions import CachedData, get_cache_version, is_cache_actual, set_cache_loaded
+from plants_api.logic.snapshot import (
+    load_genera_cohabitation_snapshot,
+    load_plants_snapshot,
+    save_genera_cohabitation_snapshot,
+    save_plants_snapshot,
+)
 from plants_api.utils import get_photo_url
 from plants_api.utils.adapters.plants import plant_dto_to_derevo_plant
 from plants_api.utils.photos import get_thumbnail_url
@@ -67,21 +75,93 @@ async def get_plants_by_name_ru(conn: AsyncConnection, names_ru: list[str]) -> l
 
 
 _cached_plants_derevo: list[Plant] | None = None
+_cached_plants_by_id: dict[int, PlantDto] = {}
+_cached_plants_by_name_ru: dict[str, PlantDto] = {}
 
 
 async def get_plants_derevo(conn: AsyncConnection, use_cached: bool = True) -> list[Plant]:
     """
     Return all database plants as a list of `derevo.Plant` classes.
+
+    Plant DTOs index by id and name_ru used by `get_cached_plants_by_ids` and `get_cached_plants_by_name_ru`
+    is built along with the cached list. Cached list is reloaded when plants data version is changed, local
+    snapshot of the current data version is used instead of the database if present.
     """
     global _cached_plants_derevo  # pylint: disable=invalid-name,global-statement
-    if use_cached and _cached_plants_derevo is not None:
+    global _cached_plants_by_id, _cached_plants_by_name_ru  # pylint: disable=invalid-name,global-statement
+    if use_cached and _cached_plants_derevo is not None and await is_cache_actual(conn, CachedData.PLANTS):
         logger.debug("Using cached derevo plants list")
         return _cached_plants_derevo
-    logger.debug("Getting plants list")
-    _cached_plants_derevo = await plant_dto_to_derevo_plant(conn, await get_plants_from_db(conn))
+    version = await get_cache_version(conn, CachedData.PLANTS)
+    snapshot = await asyncio.to_thread(load_plants_snapshot, version)
+    if snapshot is not None:
+        plants_dtos, plants_derevo = snapshot
+    else:
+        logger.debug("Getting plants list")
+        plants_dtos = await get_plants_from_db(conn)
+        plants_derevo = await plant_dto_to_derevo_plant(conn, plants_dtos)
+        await asyncio.to_thread(save_plants_snapshot, version, plants_dtos, plants_derevo)
+    _cached_plants_by_id = {plant.id: plant for plant in plants_dtos}
+    _cached_plants_by_name_ru = {plant.name_ru: plant for plant in plants_dtos}
+    _cached_plants_derevo = plants_derevo
+    set_cache_loaded(CachedData.PLANTS, version)
     return _cached_plants_derevo
 
 
+async def get_cached_plants_by_ids(conn: AsyncConnection, ids: list[int]) -> list[PlantDto]:
+    """
+    Get plants with given list of identifier values from the plants catalog cached by `get_plants_derevo`.
+
+    Plants missing in the cache are requested from the database with a single query.
+    """
+    await get_plants_derevo(conn)
+    found = {idx: _cached_plants_by_id[idx] for idx in ids if idx in _cached_plants_by_id}
+    missing = [idx for idx in dict.fromkeys(ids) if idx not in found]
+    if len(missing) != 0:
+        logger.debug("{} plants are missing in the cache, getting them from database", len(missing))
+        found.update({plant.id: plant for plant in await get_plants_by_ids(conn, missing)})
+    return [found[idx] for idx in sorted(found)]
+
+
+async def get_cached_plants_by_name_ru(conn: AsyncConnection, names_ru: list[str]) -> dict[str, PlantDto]:
+    """
+    Get plants with given list of name_ru values from the plants catalog cached by `get_plants_derevo`
+    as a dictionary by name_ru. Names which plants were not found are absent in the result.
+
+    Plants missing in the cache are requested from the database with a single query.
+    """
+    await get_plants_derevo(conn)
+    found = {name: _cached_plants_by_name_ru[name] for name in names_ru if name in _cached_plants_by_name_ru}
+    missing = [name for name in dict.fromkeys(names_ru) if name not in found]
+    if len(missing) != 0:
+        logger.debug("{} plants are missing in the cache, getting them from database", len(missing))
+        found.update({plant.name_ru: plant for plant in await get_plants_by_name_ru(conn, missing)})
+    return found
+
+
+_cached_plants_tolerance_matrix: ToleranceMatrix | None = None
+
+
+async def get_plants_tolerance_matrix(conn: AsyncConnection, use_cached: bool = True) -> ToleranceMatrix:
+    """
+    Return `derevo.ToleranceMatrix` built for the plants list returned by `get_plants_derevo`.
+
+    Matrix is rebuilt when the cached plants list is changed or if `use_cached` is set to False.
+    """
+    global _cached_plants_tolerance_matrix  # pylint: disable=invalid-name,global-statement
+    plants_derevo = await get_plants_derevo(conn, use_cached)
+    if (
+        use_cached
+        and _cached_plants_tolerance_matrix is not None
+        and _cached_plants_tolerance_matrix.plants is plants_derevo
+    ):
+        logger.debug("Using cached plants tolerance matrix")
+        return _cached_plants_tolerance_matrix
+    logger.debug("Building plants tolerance matrix")
+    _cached_plants_tolerance_matrix = ToleranceMatrix.from_plants(plants_derevo)
+    return _cached_plants_tolerance_matrix
+
+
 async def get_plants_from_db(conn: AsyncConnection) -> list[PlantDto]:
     """
     Get all plants from database.
@@ -103,12 +183,33 @@ _cached_genera_cohabitation: list[GeneraCohabitation] | None = None
 async def get_genera_cohabitation(conn: AsyncConnection, use_cached: bool = True) -> list[GeneraCohabitation]:
     """
     Get all genus cohabitations from database.
+
+    Cached data is reloaded when genera cohabitation data version is changed, local snapshot of the current data
+    version is used instead of the database if present.
     """
     global _cached_genera_cohabitation  # pylint: disable=invalid-name,global-statement
-    if use_cached and _cached_genera_cohabitation is not None:
+    if (
+        use_cached
+        and _cached_genera_cohabitation is not None
+        and await is_cache_actual(conn, CachedData.GENERA_COHABITATION)
+    ):
         logger.debug("Using cached genera cohabitation data")
         return _cached_genera_cohabitation
 
+    version = await get_cache_version(conn, CachedData.GENERA_COHABITATION)
+    genera_cohabitation = await asyncio.to_thread(load_genera_cohabitation_snapshot, version)
+    if genera_cohabitation is None:
+        genera_cohabitation = await _get_genera_cohabitation_from_db(conn)
+        await asyncio.to_thread(save_genera_cohabitation_snapshot, version, genera_cohabitation)
+    _cached_genera_cohabitation = genera_cohabitation
+    set_cache_loaded(CachedData.GENERA_COHABITATION, version)
+    return _cached_genera_cohabitation
+
+
+async def _get_genera_cohabitation_from_db(conn: AsyncConnection) -> list[GeneraCohabitation]:
+    """
+    Get all genus cohabitations from database.
+    """
     logger.debug("Getting genera cohabitation data from database")
     genera_1 = genera.alias("genera_1")
     genera_2 = genera.alias("genera_2")
@@ -124,8 +225,32 @@ async def get_genera_cohabitation(conn: AsyncConnection, use_cached: bool = True
         CohabitationType.neutral: CmCohabitationType.NEUTRAL,
         CohabitationType.positive: CmCohabitationType.POSITIVE,
     }
-    _cached_genera_cohabitation = [
+    return [
         GeneraCohabitation(genus_1, genus_2, enum_adapter[cohabitation_type])
         for genus_1, genus_2, cohabitation_type in await conn.execute(statement)
     ]
-    return _cached_genera_cohabitation
+
+
+_cached_compatibility_index: CompatibilityIndex | None = None
+
+
+async def get_compatibility_index(conn: AsyncConnection, use_cached: bool = True) -> CompatibilityIndex:
+    """
+    Return `derevo.CompatibilityIndex` built for the cached plants list and genera cohabitation data.
+
+    Index is rebuilt when one of the cached values has changed or if `use_cached` is set to False.
+    """
+    global _cached_compatibility_index  # pylint: disable=invalid-name,global-statement
+    plants_derevo = await get_plants_derevo(conn)
+    genera_cohabitation = await get_genera_cohabitation(conn)
+    if (
+        use_cached
+        and _cached_compatibility_index is not None
+        and _cached_compatibility_index.plants is plants_derevo
+        and _cached_compatibility_index.cohabitation_attributes is genera_cohabitation
+    ):
+        logger.debug("Using cached compatibility index")
+        return _cached_compatibility_index
+    logger.debug("Building compatibility index")
+    _cached_compatibility_index = CompatibilityIndex.build(plants_derevo, genera_cohabitation)
+    return _cached_compatibility_index
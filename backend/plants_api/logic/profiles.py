@@ -0,0 +1,101 @@
+"""
+Saved requests profiles logic is defined here.
+
+Profiles are saved to `profiles_dir` directory as a pair of files: `<id>.prof` with cProfile statistics
+(can be opened with `pstats` or visualization tools like snakeviz) and `<id>.json` with request information
+and statistics summary. Identifiers start with the creation time, so only `profiles_max_count` newest profiles
+are kept.
+"""
+import dataclasses
+import json
+import pstats
+import re
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from loguru import logger
+
+from plants_api.config.app_settings_global import app_settings
+from plants_api.dto import ProfileDto, ProfileFunctionDto
+from plants_api.exceptions.logic.common import EntityNotFoundById
+
+
+_PROFILE_ID_PATTERN = re.compile(r"^\d{8}T\d{6}\d{6}-[0-9a-f]{8}$")
+
+
+def new_profile_id() -> str:
+    """
+    Generate an identifier of a new profile.
+    """
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+
+def get_top_functions(stats: pstats.Stats, count: int = 30) -> list[ProfileFunctionDto]:
+    """
+    Get statistics of the functions with the highest cumulative time.
+    """
+    functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:count]  # type: ignore
+    return [
+        ProfileFunctionDto(
+            function=pstats.func_std_string(function),
+            calls=calls,
+            total_ms=round(total_time * 1000, 3),
+            cumulative_ms=round(cumulative_time * 1000, 3),
+        )
+        for function, (_primitive_calls, calls, total_time, cumulative_time, _callers) in functions
+    ]
+
+
+def save_profile(profile: ProfileDto, stats: pstats.Stats) -> None:
+    """
+    Save request profile and remove the oldest profiles exceeding `profiles_max_count`.
+    """
+    profiles_dir = Path(app_settings.profiles_dir)
+    profiles_dir.mkdir(parents=True, exist_ok=True)
+    stats.dump_stats(profiles_dir / f"{profile.id}.prof")
+    with (profiles_dir / f"{profile.id}.json").open("w", encoding="utf-8") as file:
+        json.dump(dataclasses.asdict(profile), file, ensure_ascii=False, default=str)
+    logger.info("Saved profile {} of {} {} ({:.1f} ms)", profile.id, profile.method, profile.path, profile.duration_ms)
+
+    for old_profile in sorted(profiles_dir.glob("*.json"), reverse=True)[max(app_settings.profiles_max_count, 0) :]:
+        old_profile.unlink(missing_ok=True)
+        old_profile.with_suffix(".prof").unlink(missing_ok=True)
+
+
+def _read_profile(path: Path) -> ProfileDto:
+    with path.open("r", encoding="utf-8") as file:
+        data = json.load(file)
+    return ProfileDto(
+        **data
+        | {
+            "created_at": datetime.fromisoformat(data["created_at"]),
+            "top_functions": [ProfileFunctionDto(**function) for function in data["top_functions"]],
+        }
+    )
+
+
+def list_profiles() -> list[ProfileDto]:
+    """
+    Get saved profiles, the newest first.
+    """
+    profiles_dir = Path(app_settings.profiles_dir)
+    if app_settings.profiles_dir == "" or not profiles_dir.is_dir():
+        return []
+    profiles = []
+    for path in sorted(profiles_dir.glob("*.json"), reverse=True):
+        try:
+            profiles.append(_read_profile(path))
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Could not read profile {}: {!r}", path, exc)
+    return profiles
+
+
+def get_profile_stats_path(profile_id: str) -> Path:
+    """
+    Get path of the saved profile cProfile statistics file, raise `EntityNotFoundById` if there is no such profile.
+    """
+    path = Path(app_settings.profiles_dir) / f"{profile_id}.prof"
+    if app_settings.profiles_dir == "" or _PROFILE_ID_PATTERN.match(profile_id) is None or not path.is_file():
+        raise EntityNotFoundById(profile_id, "profiles")
+    return path
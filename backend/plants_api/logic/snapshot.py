@@ -0,0 +1,269 @@
+"""
+Local snapshots of the cached data are defined here.
+
+After loading from the database, cached data is saved to `snapshot_dir` directory as a subdirectory named by
+the data name and version: GeoParquet files for global territory layers and Parquet files for plants (with their
+tolerance data) and genera cohabitation. Snapshot of the current version is used instead of the database
+on the next load (application restart or another worker start).
+
+Snapshots are keyed by `cache_versions` only, so changes made to the database without increasing the data version
+(manual SQL, external scripts) are not seen after a restart while the snapshot exists. Start the application with
+`--drop_snapshots` option (or remove `snapshot_dir` contents) after such changes.
+"""
+import dataclasses
+import json
+import os
+import shutil
+import tempfile
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, get_args, get_type_hints
+
+import geopandas as gpd
+import pandas as pd
+from derevo import CohabitationType as CmCohabitationType
+from derevo import GeneraCohabitation, GlobalTerritory, Plant
+from derevo import enumerations as c_enum
+from loguru import logger
+
+from plants_api.config.app_settings_global import app_settings
+from plants_api.dto import PlantDto
+from plants_api.logic.cache_versions import CachedData
+
+
+_METADATA_FILENAME = "metadata.json"
+
+_PLANT_DTO_DTYPES: dict[str, str] = {
+    name: {int: "Int64", float: "Float64", bool: "boolean", str: "string"}[next(iter(get_args(hint)), hint)]
+    for name, hint in get_type_hints(PlantDto).items()
+}
+_PLANTS_PREFERENCES_ENUMS: dict[str, type[Enum]] = {
+    "limitation_factors_resistances": c_enum.LimitationFactor,
+    "usda_zone_preferences": c_enum.UsdaZone,
+    "light_preferences": c_enum.LightType,
+    "humidity_preferences": c_enum.HumidityType,
+    "soil_acidity_preferences": c_enum.AcidityType,
+    "soil_fertility_preferences": c_enum.FertilityType,
+    "soil_type_preferences": c_enum.SoilType,
+}
+_PLANTS_ATTRIBUTES_ENUMS: dict[str, type[Enum]] = {
+    "life_form": c_enum.LifeForm,
+    "aggresiveness": c_enum.AggressivenessLevel,
+    "survivability": c_enum.SurvivabilityLevel,
+}
+
+
+def _enum_name(value: Enum | None) -> str | None:
+    return value.name if value is not None else None
+
+
+def _enum_value(name: str | None, concrete_enum: type[Enum]) -> Enum | None:
+    return concrete_enum[name] if name is not None and not pd.isna(name) else None
+
+
+def _get_snapshot_path(cached_data: CachedData, version: int) -> Path:
+    return Path(app_settings.snapshot_dir) / f"{cached_data.value}-{version}"
+
+
+def _save_snapshot(
+    cached_data: CachedData, version: int, metadata: dict[str, Any], write: Callable[[Path], None]
+) -> None:
+    """
+    Save snapshot of the given cached data version with a `write` function, which gets a directory to write files
+    to. Snapshot directory is prepared under a temporary name and renamed on success, snapshots of older versions
+    are removed (newer ones could be saved by other workers meanwhile). Errors are logged, not raised.
+    """
+    if app_settings.snapshot_dir == "":
+        return
+    snapshot_path = _get_snapshot_path(cached_data, version)
+    if snapshot_path.exists():
+        return
+    temporary_path = None
+    try:
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = Path(tempfile.mkdtemp(prefix=f".{snapshot_path.name}-", dir=snapshot_path.parent))
+        write(temporary_path)
+        with (temporary_path / _METADATA_FILENAME).open("w", encoding="utf-8") as file:
+            json.dump(metadata, file)
+        os.rename(temporary_path, snapshot_path)
+        temporary_path = None
+        logger.info("Saved {} snapshot version {} to {}", cached_data.value, version, snapshot_path)
+        for old_snapshot in snapshot_path.parent.glob(f"{cached_data.value}-*"):
+            old_version = old_snapshot.name.removeprefix(f"{cached_data.value}-")
+            if old_version.isdigit() and int(old_version) < version:
+                shutil.rmtree(old_snapshot, ignore_errors=True)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning("Could not save {} snapshot version {}: {!r}", cached_data.value, version, exc)
+    finally:
+        if temporary_path is not None:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+
+
+def drop_snapshots() -> None:
+    """
+    Remove all of the saved snapshots, so the cached data is loaded from the database on the next load.
+    """
+    if app_settings.snapshot_dir == "":
+        return
+    for cached_data in CachedData:
+        for snapshot_path in Path(app_settings.snapshot_dir).glob(f"{cached_data.value}-*"):
+            shutil.rmtree(snapshot_path, ignore_errors=True)
+    logger.info("Dropped cached data snapshots in {}", app_settings.snapshot_dir)
+
+
+def _load_snapshot(
+    cached_data: CachedData, version: int, metadata: dict[str, Any], read: Callable[[Path], Any]
+) -> Any | None:
+    """
+    Load snapshot of the given cached data version with a `read` function, which gets a snapshot directory.
+    Return None if there is no snapshot, its metadata differs from the given one or it could not be read.
+    """
+    if app_settings.snapshot_dir == "":
+        return None
+    snapshot_path = _get_snapshot_path(cached_data, version)
+    if not (snapshot_path / _METADATA_FILENAME).exists():
+        return None
+    try:
+        with (snapshot_path / _METADATA_FILENAME).open("r", encoding="utf-8") as file:
+            if json.load(file) != metadata:
+                logger.debug("Snapshot {} is made with other settings, skipping it", snapshot_path)
+                return None
+        result = read(snapshot_path)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning("Could not load snapshot {}: {!r}", snapshot_path, exc)
+        return None
+    logger.info("Loaded {} snapshot version {}", cached_data.value, version)
+    return result
+
+
+def save_plants_snapshot(version: int, plants_dtos: list[PlantDto], plants_derevo: list[Plant]) -> None:
+    """
+    Save plants DTOs and derevo plants (with tolerance data in a long format) snapshot.
+    """
+
+    def write(path: Path) -> None:
+        pd.DataFrame(
+            [dataclasses.astuple(dto) for dto in plants_dtos], columns=[f.name for f in dataclasses.fields(PlantDto)]
+        ).astype(_PLANT_DTO_DTYPES).to_parquet(path / "plants_dtos.parquet", index=False)
+        pd.DataFrame(
+            [
+                (plant.name_ru, plant.name_latin, plant.genus, plant.is_invasive)
+                + tuple(_enum_name(getattr(plant, attribute)) for attribute in _PLANTS_ATTRIBUTES_ENUMS)
+                for plant in plants_derevo
+            ],
+            columns=["name_ru", "name_latin", "genus", "is_invasive", *_PLANTS_ATTRIBUTES_ENUMS],
+        ).to_parquet(path / "plants.parquet", index=False)
+        pd.DataFrame(
+            [
+                (plant_idx, attribute, value.name, _enum_name(tolerance))
+                for plant_idx, plant in enumerate(plants_derevo)
+                for attribute in _PLANTS_PREFERENCES_ENUMS
+                for value, tolerance in getattr(plant, attribute).items()
+            ],
+            columns=["plant_idx", "attribute", "value", "tolerance"],
+        ).to_parquet(path / "plants_preferences.parquet", index=False)
+
+    _save_snapshot(CachedData.PLANTS, version, {"photos_prefix": app_settings.photos_prefix}, write)
+
+
+def load_plants_snapshot(version: int) -> tuple[list[PlantDto], list[Plant]] | None:
+    """
+    Load plants DTOs and derevo plants snapshot of the given version if it exists.
+    """
+
+    def read(path: Path) -> tuple[list[PlantDto], list[Plant]]:
+        plants_dtos_df = pd.read_parquet(path / "plants_dtos.parquet")
+        plants_dtos = [
+            PlantDto(*(None if pd.isna(value) else value for value in row))
+            for row in plants_dtos_df.astype(object).itertuples(index=False)
+        ]
+        preferences: list[dict[str, dict]] = []
+        plants_derevo = []
+        for row in pd.read_parquet(path / "plants.parquet").astype(object).itertuples(index=False):
+            plant_preferences = {attribute: {} for attribute in _PLANTS_PREFERENCES_ENUMS}
+            preferences.append(plant_preferences)
+            plants_derevo.append(
+                Plant(
+                    row.name_ru,
+                    row.name_latin,
+                    None if pd.isna(row.genus) else row.genus,
+                    is_invasive=bool(row.is_invasive),
+                    **{
+                        attribute: _enum_value(getattr(row, attribute), concrete_enum)
+                        for attribute, concrete_enum in _PLANTS_ATTRIBUTES_ENUMS.items()
+                    },
+                    **plant_preferences,
+                )
+            )
+        for plant_idx, attribute, value, tolerance in pd.read_parquet(path / "plants_preferences.parquet").itertuples(
+            index=False
+        ):
+            preferences[plant_idx][attribute][_PLANTS_PREFERENCES_ENUMS[attribute][value]] = _enum_value(
+                tolerance, c_enum.ToleranceType
+            )
+        return plants_dtos, plants_derevo
+
+    return _load_snapshot(CachedData.PLANTS, version, {"photos_prefix": app_settings.photos_prefix}, read)
+
+
+def save_genera_cohabitation_snapshot(version: int, genera_cohabitation: list[GeneraCohabitation]) -> None:
+    """
+    Save genera cohabitation snapshot.
+    """
+
+    def write(path: Path) -> None:
+        pd.DataFrame(
+            [(c.genus_1, c.genus_2, c.cohabitation.name) for c in genera_cohabitation],
+            columns=["genus_1", "genus_2", "cohabitation"],
+        ).to_parquet(path / "genera_cohabitation.parquet", index=False)
+
+    _save_snapshot(CachedData.GENERA_COHABITATION, version, {}, write)
+
+
+def load_genera_cohabitation_snapshot(version: int) -> list[GeneraCohabitation] | None:
+    """
+    Load genera cohabitation snapshot of the given version if it exists.
+    """
+
+    def read(path: Path) -> list[GeneraCohabitation]:
+        return [
+            GeneraCohabitation(genus_1, genus_2, CmCohabitationType[cohabitation])
+            for genus_1, genus_2, cohabitation in pd.read_parquet(path / "genera_cohabitation.parquet").itertuples(
+                index=False
+            )
+        ]
+
+    return _load_snapshot(CachedData.GENERA_COHABITATION, version, {}, read)
+
+
+def save_global_territory_snapshot(version: int, global_territory: GlobalTerritory) -> None:
+    """
+    Save global territory snapshot as a GeoParquet file for each of the layers.
+    """
+
+    def write(path: Path) -> None:
+        for layer in GlobalTerritory.layers():
+            gdf: gpd.GeoDataFrame = getattr(global_territory, layer)
+            gpd.GeoDataFrame(
+                {"name": [value.name for value in gdf["name"]]}, geometry=gdf.geometry.values, crs=gdf.crs
+            ).to_parquet(path / f"{layer}.parquet", index=False)
+
+    _save_snapshot(
+        CachedData.GLOBAL_TERRITORY,
+        version,
+        {"usda_zone": _enum_name(global_territory.usda_zone)},
+        write,
+    )
+
+
+def load_global_territory_snapshot(version: int, usda_zone: c_enum.UsdaZone | None) -> GlobalTerritory | None:
+    """
+    Load global territory snapshot of the given version if it exists.
+    """
+
+    def read(path: Path) -> GlobalTerritory:
+        return GlobalTerritory(
+            usda_zone, **{layer: gpd.read_parquet(path / f"{layer}.parquet") for layer in GlobalTerritory.layers()}
+        )
+
+    return _load_snapshot(CachedData.GLOBAL_TERRITORY, version, {"usda_zone": _enum_name(usda_zone)}, read)
@@ -0,0 +1,109 @@
+"""
+Mapbox Vector Tiles of factors layers logic is defined here.
+
+Tiles are built by PostGIS with `ST_AsMVT`, geometries are simplified with a tolerance of one tile extent unit
+of the requested zoom level. Formed tiles are cached in memory until global territory data version is changed
+(limitation factors insertion or deletion, or caches refresh).
+"""
+from collections import OrderedDict
+from enum import Enum
+
+from loguru import logger
+from sqlalchemy import Table, func, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from plants_api.config.app_settings_global import app_settings
+from plants_api.db.entities import light_type_parts, light_types, limitation_factor_parts, limitation_factors
+from plants_api.exceptions.logic.geometry import TileOutOfBoundsError
+from plants_api.logic.cache_versions import CachedData, get_cache_version
+
+
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+TILE_MAX_ZOOM = 22
+_WEB_MERCATOR_WORLD_SIZE = 2 * 20037508.342789244
+
+
+class TileLayer(str, Enum):
+    """
+    Layers available as vector tiles.
+    """
+
+    LIMITATION_FACTORS = "limitation_factors"
+    LIGHT_TYPES = "light_types"
+
+
+_LAYERS_TABLES: dict[TileLayer, tuple[Table, Table, str]] = {
+    TileLayer.LIMITATION_FACTORS: (limitation_factors, limitation_factor_parts, "limitation_factor_id"),
+    TileLayer.LIGHT_TYPES: (light_types, light_type_parts, "light_type_id"),
+}
+
+_cached_tiles: OrderedDict[tuple[TileLayer, int, int, int], bytes] = OrderedDict()
+_cached_tiles_version: int | None = None
+
+
+def _get_simplification_tolerance(z: int) -> float:
+    """
+    Return size of one tile extent unit at the given zoom level in Web Mercator meters.
+    """
+    return _WEB_MERCATOR_WORLD_SIZE / (TILE_EXTENT * 2**z)
+
+
+async def _get_tile_from_db(conn: AsyncConnection, layer: TileLayer, z: int, x: int, y: int) -> bytes:
+    """
+    Form a vector tile of the given layer with `ST_AsMVT`.
+    """
+    types_table, parts_table, type_id_column = _LAYERS_TABLES[layer]
+    bounds = func.ST_TileEnvelope(z, x, y)
+    features = (
+        select(
+            parts_table.c.id,
+            types_table.c.name,
+            func.ST_AsMVTGeom(
+                func.ST_Simplify(
+                    func.ST_Transform(parts_table.c.geometry, text("3857")), _get_simplification_tolerance(z)
+                ),
+                bounds,
+                TILE_EXTENT,
+                TILE_BUFFER,
+                True,
+            ).label("geometry"),
+        )
+        .select_from(parts_table)
+        .join(types_table, parts_table.c[type_id_column] == types_table.c.id)
+        .where(parts_table.c.geometry.op("&&")(func.ST_Transform(bounds, text("4326"))))
+        .cte("features")
+    )
+    statement = (
+        select(func.ST_AsMVT(literal_column(features.name), layer.value, TILE_EXTENT, "geometry", "id"))
+        .select_from(features)
+        .where(features.c.geometry.is_not(None))
+    )
+    return bytes((await conn.execute(statement)).scalar_one() or b"")
+
+
+async def get_tile(conn: AsyncConnection, layer: TileLayer, z: int, x: int, y: int) -> bytes:
+    """
+    Get a vector tile of the given layer, raise `TileOutOfBoundsError` if there is no tile with the given
+    coordinates. Tiles are cached until global territory data version is changed, least recently used tiles
+    are removed when the cache size set by `tiles_cache_size` setting is exceeded.
+    """
+    global _cached_tiles_version  # pylint: disable=invalid-name,global-statement
+    if not 0 <= z <= TILE_MAX_ZOOM or not 0 <= x < 2**z or not 0 <= y < 2**z:
+        raise TileOutOfBoundsError(z, x, y)
+    version = await get_cache_version(conn, CachedData.GLOBAL_TERRITORY)
+    if version != _cached_tiles_version:
+        if len(_cached_tiles) != 0:
+            logger.debug("Global territory data version has changed, dropping {} cached tiles", len(_cached_tiles))
+        _cached_tiles.clear()
+        _cached_tiles_version = version
+    key = (layer, z, x, y)
+    if key in _cached_tiles:
+        _cached_tiles.move_to_end(key)
+        return _cached_tiles[key]
+    tile = await _get_tile_from_db(conn, layer, z, x, y)
+    if version == _cached_tiles_version:
+        _cached_tiles[key] = tile
+        while len(_cached_tiles) > app_settings.tiles_cache_size:
+            _cached_tiles.popitem(last=False)
+    return tile
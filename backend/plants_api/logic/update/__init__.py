@@ -3,4 +3,13 @@ Database entities update logic is defined here.
 """
 
 from .limitation_factors import delete_limitation_factors, insert_limitation_factors
+from .limitation_factors_uploads import (
+    UploadPartFormat,
+    abort_limitation_factors_upload,
+    commit_limitation_factors_upload,
+    get_limitation_factors_upload,
+    get_upload_part_format,
+    start_limitation_factors_upload,
+    upload_limitation_factors_part,
+)
 from .xlsx import update_plants_from_xlsx
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncConnection
 from plants_api.db.entities import limitation_factor_parts, limitation_factors
 from plants_api.dto.update import LimitationFactorGeometryDto
 from plants_api.exceptions.logic.db import UnsatisfiedIdDependencyError
+from plants_api.logic.cache_versions import CachedData, bump_cache_versions
 
 
 async def insert_limitation_factors(
@@ -49,6 +50,7 @@ async def insert_limitation_factors(
         ).scalars()
     )
 
+    await bump_cache_versions(conn, CachedData.GLOBAL_TERRITORY)
     await conn.commit()
 
     return ids
@@ -61,4 +63,5 @@ async def delete_limitation_factors(conn: AsyncConnection, limitation_factors_id
     statement = delete(limitation_factor_parts).where(limitation_factor_parts.c.id.in_(limitation_factors_ids))
     await conn.execute(statement)
 
+    await bump_cache_versions(conn, CachedData.GLOBAL_TERRITORY)
     await conn.commit()
@@ -0,0 +1,277 @@
+"""
+Chunked limitation factor layer replacement logic is defined here.
+
+An upload is started for a limitation factor, then its geometries are sent in parts (NDJSON or GeoParquet), each
+part is COPY-ed as WKB to the `limitation_factors_uploads_geometries` staging table. Re-sending a part replaces
+its previously uploaded geometries, so failed parts can be retried. On commit the whole limitation factor layer
+is replaced by the uploaded geometries in one transaction.
+"""
+import asyncio
+import json
+import uuid
+from datetime import timedelta
+from enum import Enum
+from io import BytesIO
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from loguru import logger
+from sqlalchemy import delete, func, insert, literal, select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from plants_api.db.entities import (
+    limitation_factor_parts,
+    limitation_factors,
+    limitation_factors_uploads,
+    limitation_factors_uploads_geometries,
+)
+from plants_api.dto.update import LimitationFactorsUploadDto
+from plants_api.exceptions.logic.common import EntityNotFoundById
+from plants_api.exceptions.logic.db import UnsatisfiedIdDependencyError
+from plants_api.exceptions.logic.uploads import (
+    UnsupportedUploadPartFormatError,
+    UploadAlreadyCommittedError,
+    UploadPartParseError,
+)
+from plants_api.logic.cache_versions import CachedData, bump_cache_versions
+
+
+UPLOADS_EXPIRATION = timedelta(days=1)
+
+
+class UploadPartFormat(str, Enum):
+    """
+    Formats of the upload parts.
+    """
+
+    NDJSON = "ndjson"
+    GEOPARQUET = "geoparquet"
+
+
+UPLOAD_PART_CONTENT_TYPES: dict[str, UploadPartFormat] = {
+    "application/x-ndjson": UploadPartFormat.NDJSON,
+    "application/geo+json-seq": UploadPartFormat.NDJSON,
+    "application/vnd.apache.parquet": UploadPartFormat.GEOPARQUET,
+    "application/x-parquet": UploadPartFormat.GEOPARQUET,
+}
+
+
+def get_upload_part_format(content_type: str | None) -> UploadPartFormat:
+    """
+    Get upload part format by the given content type, raise `UnsupportedUploadPartFormatError` if it is unknown.
+    """
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type not in UPLOAD_PART_CONTENT_TYPES:
+        raise UnsupportedUploadPartFormatError(content_type, list(UPLOAD_PART_CONTENT_TYPES))
+    return UPLOAD_PART_CONTENT_TYPES[media_type]
+
+
+def _read_part_geometries(data: bytes, part_format: UploadPartFormat) -> np.ndarray:
+    """
+    Read geometries of the upload part in EPSG:4326 as WKB array, skipping missing and empty geometries.
+
+    NDJSON part is a GeoJSON Feature or geometry on each of the lines (in EPSG:4326 by GeoJSON specification),
+    GeoParquet part is reprojected to EPSG:4326 if it has another CRS set.
+    """
+    if part_format == UploadPartFormat.NDJSON:
+        geometries = []
+        for line in data.splitlines():
+            if len(line.strip()) == 0:
+                continue
+            geometry = json.loads(line)
+            if geometry.get("type") == "Feature":
+                geometry = geometry["geometry"]
+            geometries.append(json.dumps(geometry) if geometry is not None else None)
+        geometries = shapely.from_geojson(geometries)
+    else:
+        gdf = gpd.read_parquet(BytesIO(data))
+        if gdf.crs is not None and gdf.crs != 4326:
+            gdf = gdf.to_crs(4326)
+        geometries = gdf.geometry.values.to_numpy()
+    geometries = geometries[~shapely.is_missing(geometries) & ~shapely.is_empty(geometries)]
+    return shapely.to_wkb(geometries)
+
+
+async def _get_upload(
+    conn: AsyncConnection, upload_id: uuid.UUID, for_update: bool = False
+) -> LimitationFactorsUploadDto:
+    """
+    Get upload with its progress by identifier, raise `EntityNotFoundById` if it does not exist. If `for_update`
+    is set, the upload row is locked until the end of the transaction.
+    """
+    statement = select(limitation_factors_uploads).where(limitation_factors_uploads.c.id == upload_id)
+    if for_update:
+        statement = statement.with_for_update()
+    upload = (await conn.execute(statement)).mappings().one_or_none()
+    if upload is None:
+        raise EntityNotFoundById(upload_id, "limitation_factors_uploads")
+    statement = select(func.count()).where(
+        limitation_factor_parts.c.limitation_factor_id == upload["limitation_factor_id"]
+    )
+    features_current = (await conn.execute(statement)).scalar_one()
+    return LimitationFactorsUploadDto(
+        id=upload["id"],
+        limitation_factor_id=upload["limitation_factor_id"],
+        created_at=upload["created_at"],
+        committed_at=upload["committed_at"],
+        parts_uploaded=upload["parts_uploaded"],
+        features_uploaded=upload["features_uploaded"],
+        features_current=features_current,
+    )
+
+
+async def _get_uncommitted_upload(conn: AsyncConnection, upload_id: uuid.UUID) -> LimitationFactorsUploadDto:
+    """
+    Get and lock upload which is not committed yet, raise `UploadAlreadyCommittedError` otherwise.
+    """
+    upload = await _get_upload(conn, upload_id, for_update=True)
+    if upload.committed_at is not None:
+        raise UploadAlreadyCommittedError(upload_id)
+    return upload
+
+
+async def start_limitation_factors_upload(
+    conn: AsyncConnection, limitation_factor_id: int, user_id: int
+) -> LimitationFactorsUploadDto:
+    """
+    Start a new upload of the limitation factor layer. Uncommitted uploads which are older than
+    `UPLOADS_EXPIRATION` are removed along with their geometries.
+    """
+    statement = select(limitation_factors.c.id).where(limitation_factors.c.id == limitation_factor_id)
+    if (await conn.execute(statement)).scalar_one_or_none() is None:
+        raise UnsatisfiedIdDependencyError(limitation_factor_id, "limitation_factors")
+
+    statement = delete(limitation_factors_uploads).where(
+        limitation_factors_uploads.c.committed_at.is_(None),
+        limitation_factors_uploads.c.created_at < func.now() - UPLOADS_EXPIRATION,
+    )
+    if (expired := (await conn.execute(statement)).rowcount) != 0:
+        logger.info("Removed {} expired limitation factors uploads", expired)
+
+    upload_id = uuid.uuid4()
+    statement = insert(limitation_factors_uploads).values(
+        id=upload_id, limitation_factor_id=limitation_factor_id, user_id=user_id
+    )
+    await conn.execute(statement)
+    upload = await _get_upload(conn, upload_id)
+    await conn.commit()
+    return upload
+
+
+async def get_limitation_factors_upload(conn: AsyncConnection, upload_id: uuid.UUID) -> LimitationFactorsUploadDto:
+    """
+    Get upload with its progress.
+    """
+    return await _get_upload(conn, upload_id)
+
+
+async def upload_limitation_factors_part(
+    conn: AsyncConnection, upload_id: uuid.UUID, part_number: int, data: bytes, part_format: UploadPartFormat
+) -> LimitationFactorsUploadDto:
+    """
+    Read geometries of the upload part and COPY them to the staging table replacing the previously uploaded
+    geometries of the same part.
+    """
+    try:
+        geometries = await asyncio.to_thread(_read_part_geometries, data, part_format)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.debug("Could not read part {} of upload {}: {!r}", part_number, upload_id, exc)
+        raise UploadPartParseError(upload_id, part_number) from exc
+
+    await _get_uncommitted_upload(conn, upload_id)
+    statement = delete(limitation_factors_uploads_geometries).where(
+        limitation_factors_uploads_geometries.c.upload_id == upload_id,
+        limitation_factors_uploads_geometries.c.part_number == part_number,
+    )
+    await conn.execute(statement)
+    raw_connection = await conn.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        limitation_factors_uploads_geometries.name,
+        records=((upload_id, part_number, geometry) for geometry in geometries),
+        columns=["upload_id", "part_number", "geometry"],
+    )
+
+    uploaded = (
+        select(
+            func.count(func.distinct(limitation_factors_uploads_geometries.c.part_number)).label("parts"),
+            func.count().label("features"),
+        )
+        .where(limitation_factors_uploads_geometries.c.upload_id == upload_id)
+        .subquery()
+    )
+    statement = (
+        update(limitation_factors_uploads)
+        .values(parts_uploaded=uploaded.c.parts, features_uploaded=uploaded.c.features)
+        .where(limitation_factors_uploads.c.id == upload_id)
+    )
+    await conn.execute(statement)
+    upload = await _get_upload(conn, upload_id)
+    await conn.commit()
+    logger.info(
+        "Upload {} part {}: {} geometries, {} geometries in {} parts uploaded",
+        upload_id,
+        part_number,
+        len(geometries),
+        upload.features_uploaded,
+        upload.parts_uploaded,
+    )
+    return upload
+
+
+async def commit_limitation_factors_upload(conn: AsyncConnection, upload_id: uuid.UUID) -> LimitationFactorsUploadDto:
+    """
+    Replace all of the limitation factor geometries with the uploaded ones in one transaction.
+    """
+    upload = await _get_uncommitted_upload(conn, upload_id)
+    statement = (
+        select(limitation_factors.c.id).where(limitation_factors.c.id == upload.limitation_factor_id).with_for_update()
+    )
+    await conn.execute(statement)
+
+    statement = delete(limitation_factor_parts).where(
+        limitation_factor_parts.c.limitation_factor_id == upload.limitation_factor_id
+    )
+    deleted = (await conn.execute(statement)).rowcount
+    statement = insert(limitation_factor_parts).from_select(
+        ["limitation_factor_id", "geometry"],
+        select(
+            literal(upload.limitation_factor_id),
+            func.ST_SetSRID(func.ST_GeomFromWKB(limitation_factors_uploads_geometries.c.geometry), text("4326")),
+        )
+        .where(limitation_factors_uploads_geometries.c.upload_id == upload_id)
+        .order_by(limitation_factors_uploads_geometries.c.part_number),
+    )
+    inserted = (await conn.execute(statement)).rowcount
+    statement = delete(limitation_factors_uploads_geometries).where(
+        limitation_factors_uploads_geometries.c.upload_id == upload_id
+    )
+    await conn.execute(statement)
+    statement = (
+        update(limitation_factors_uploads)
+        .values(committed_at=func.now())
+        .where(limitation_factors_uploads.c.id == upload_id)
+    )
+    await conn.execute(statement)
+
+    await bump_cache_versions(conn, CachedData.GLOBAL_TERRITORY)
+    upload = await _get_upload(conn, upload_id)
+    await conn.commit()
+    logger.info(
+        "Upload {} is committed: limitation factor {} layer of {} geometries is replaced by {} geometries",
+        upload_id,
+        upload.limitation_factor_id,
+        deleted,
+        inserted,
+    )
+    return upload
+
+
+async def abort_limitation_factors_upload(conn: AsyncConnection, upload_id: uuid.UUID) -> None:
+    """
+    Remove uncommitted upload with its geometries.
+    """
+    await _get_uncommitted_upload(conn, upload_id)
+    statement = delete(limitation_factors_uploads).where(limitation_factors_uploads.c.id == upload_id)
+    await conn.execute(statement)
+    await conn.commit()
@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncConnection
 from plants_api.config.app_settings_global import app_settings
 from plants_api.db.entities import plants
 from plants_api.exceptions.logic.common import DependencyNotFoundById
+from plants_api.logic.cache_versions import CachedData, bump_cache_versions
 from plants_api.utils.photos import get_thumbnail
 
 
@@ -33,4 +34,5 @@ async def set_photo_to_plant(conn: AsyncConnection, plant_id: int, photo: Image.
         logger.info("Removing old photo for the plant with id={} - {}", plant_id, old_photo_name)
         (Path(app_settings.photos_dir) / old_photo_name).unlink(missing_ok=True)
         (Path(app_settings.photos_dir) / "thumbnails" / old_photo_name).unlink(missing_ok=True)
+    await bump_cache_versions(conn, CachedData.PLANTS)
     await conn.commit()
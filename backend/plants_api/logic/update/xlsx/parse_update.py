@@ -1,15 +1,20 @@
 """
 Excel document parsing and updating process is defined here.
+
+Document sheets are normalized once as DataFrames, bulk data is copied to temporary staging tables with COPY
+and applied to the database entities with set-based statements.
 """
 from collections import defaultdict
 from io import BytesIO, StringIO
+from typing import Any, Callable
 
+import numpy as np
 import pandas as pd
 from loguru import logger
-from numpy import nan
-from sqlalchemy import func, insert, select, update
+from sqlalchemy import Boolean, Column, Float, Integer, MetaData, String, Table, func, select, tuple_, update
 from sqlalchemy.dialects.postgresql import insert as insert_pg
 from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateTable
 
 from plants_api.db.entities import (
     climate_zones,
@@ -36,7 +41,14 @@ from plants_api.db.entities import (
     soil_types,
 )
 from plants_api.db.entities.enums import CohabitationType
-from plants_api.schemas.update.sheets_configuration import SheetsConfiguration
+from plants_api.db.entities.plants_factors import CohabitationTypeEnum
+from plants_api.logic.cache_versions import CachedData, bump_cache_versions
+from plants_api.schemas.update.sheets_configuration import (
+    GeneraCohabitationConfiguration,
+    PlantsConfiguration,
+    PlantsGeneraConfiguration,
+    SheetsConfiguration,
+)
 
 from .document_parse import get_cohabitation, get_plants_from_xlsx_sheets, get_plants_genera
 from .sheets_configuration import sheets_configuration as s_conf
@@ -56,84 +68,81 @@ s_conf.plants_naming_exceptions = {
     normalize(key): normalize(val) for key, val in s_conf.plants_naming_exceptions.items()
 }
 
+_TOLERANCE_TYPES = {
+    "-1": CohabitationType.negative.value,
+    "0": CohabitationType.neutral.value,
+    "1": CohabitationType.positive.value,
+}
+_COHABITATION_VALUES = {CohabitationType.positive: 1, CohabitationType.neutral: 0, CohabitationType.negative: -1}
+_FACTORS_TABLES = {
+    "limitation_factors": (plants_limitation_factors, "limitation_factor_id", limitation_factors),
+    "soil_acidity_types": (plants_soil_acidity_types, "soil_acidity_type_id", soil_acidity_types),
+    "soil_fertility_types": (plants_soil_fertility_types, "soil_fertility_type_id", soil_fertility_types),
+    "soil_types": (plants_soil_types, "soil_type_id", soil_types),
+    "light_types": (plants_light_types, "light_type_id", light_types),
+    "humidity_types": (plants_humidity_types, "humidity_type_id", humidity_types),
+}
 
-async def update_plants_from_xlsx(  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
-    conn: AsyncConnection, input_xlsx: BytesIO, sheets_configuration: SheetsConfiguration
-) -> StringIO:
+
+def _to_records(data: pd.DataFrame) -> list[tuple[Any, ...]]:
     """
-    Parse xlsx with given format and update database entities.
+    Convert DataFrame rows to tuples of builtin Python values with None instead of missing values.
     """
-    out = StringIO()
-    sheets = pd.read_excel(input_xlsx, sheet_name=None)
+    return list(data.astype(object).where(data.notna(), None).itertuples(index=False, name=None))
 
-    def log(message: str) -> None:
-        print(message, file=out)
-        logger.info(message)
 
-    log(f"Входной файл имеет {len(sheets)} листов: {' --- '.join(sorted(sheets.keys()))}")
-
-    plants_df = get_plants_from_xlsx_sheets(
-        sheets[sheets_configuration.plants_sheet],
-        sheets[sheets_configuration.lifeforms_sheet],
-        sheets_configuration.plants_config,
-        sheets_configuration.lifeforms_config,
+async def _copy_to_staging(conn: AsyncConnection, name: str, columns: dict[str, Any], data: pd.DataFrame) -> Table:
+    """
+    Create a temporary table with given columns types which is dropped on transaction commit, and COPY
+    the DataFrame columns of the same names to it.
+    """
+    staging = Table(
+        name,
+        MetaData(),
+        *(Column(column, column_type) for column, column_type in columns.items()),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
     )
-    genera_df = get_plants_genera(
-        sheets[sheets_configuration.plants_genera_sheet], sheets_configuration.plants_genera_config
+    await conn.execute(CreateTable(staging))
+    raw_connection = await conn.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        name, records=_to_records(data[list(columns)]), columns=list(columns)
     )
-    cohabitation_df = get_cohabitation(
-        sheets[sheets_configuration.genera_cohabitation_sheet],
-        genera_df,
-        log,
-        sheets_configuration.plants_genera_config,
-        sheets_configuration.genera_cohabitation_config,
-    )
-
-    comments_ids = {}
-    plants_ids = {}
-    genera_ids = {}
+    return staging
 
-    plant_types_ids = {}
 
-    type_table_name = {
-        "limitation_factors": (
-            plants_limitation_factors,
-            plants_limitation_factors.c.limitation_factor_id,
-            limitation_factors,
-        ),
-        "soil_acidity_types": (
-            plants_soil_acidity_types,
-            plants_soil_acidity_types.c.soil_acidity_type_id,
-            soil_acidity_types,
-        ),
-        "soil_fertility_types": (
-            plants_soil_fertility_types,
-            plants_soil_fertility_types.c.soil_fertility_type_id,
-            soil_fertility_types,
-        ),
-        "soil_types": (
-            plants_soil_types,
-            plants_soil_types.c.soil_type_id,
-            soil_types,
-        ),
-        "light_types": (
-            plants_light_types,
-            plants_light_types.c.light_type_id,
-            light_types,
-        ),
-        "humidity_types": (
-            plants_humidity_types,
-            plants_humidity_types.c.humidity_type_id,
-            humidity_types,
-        ),
-    }
+async def _merge_from_staging(
+    conn: AsyncConnection, table: Table, staging: Table, key_columns: list[str], value_column: str
+) -> tuple[int, int]:
+    """
+    Update value column of the table rows which are present in the staging table with a different value
+    and insert the missing rows. Return numbers of inserted and updated rows.
+    """
+    statement = (
+        update(table)
+        .values({value_column: staging.c[value_column]})
+        .where(
+            *(table.c[column] == staging.c[column] for column in key_columns),
+            table.c[value_column] != staging.c[value_column],
+        )
+    )
+    updated = (await conn.execute(statement)).rowcount
+    statement = (
+        insert_pg(table)
+        .from_select(list(staging.c.keys()), select(staging))
+        .on_conflict_do_nothing(index_elements=key_columns)
+    )
+    inserted = (await conn.execute(statement)).rowcount
+    return inserted, updated
 
-    # считывание парков
 
-    # district:
-    #   - park:
-    #       - plant
-    #       - plant
+def _get_plants_locations(
+    sheets: dict[str, pd.DataFrame], sheets_configuration: SheetsConfiguration, log: Callable[[str], None]
+) -> dict[str, dict[str, list[str]]]:
+    """
+    Read normalized names of plants located in parks from the district sheets as
+    {district: {park: [plant, ...]}}.
+    """
     plants_locations: dict[str, dict[str, list[str]]] = defaultdict(lambda: {})
     for district_sheet_name in sheets_configuration.parks_sheets:
         if (parks_plants := sheets.get(district_sheet_name)) is None:
@@ -142,338 +151,408 @@ async def update_plants_from_xlsx(  # pylint: disable=too-many-locals,too-many-b
         for park_name in parks_plants.columns:
             park_plants = list(parks_plants[park_name].dropna().apply(normalize).unique())
             plants_locations[district_sheet_name][park_name] = park_plants
+    return plants_locations
 
-    # Загрузка жизненных форм с соответствующего листа.
-    statement = select(plant_types.c.name, plant_types.c.id)
-    for name, idx in await conn.execute(statement):
-        plant_types_ids[name] = idx
 
-    insert_statement = insert(plant_types).returning(plant_types.c.id)
-    for name in plants_df[sheets_configuration.plants_config.lifeform_short_column].unique():
-        if name is None or name != name or name in plant_types_ids:  # pylint: disable=comparison-with-itself
-            continue
-        plant_types_ids[name] = (await conn.execute(insert_statement, {"name": name})).scalar()
+async def _update_genera(
+    conn: AsyncConnection, genera_df: pd.DataFrame, genera_config: PlantsGeneraConfiguration
+) -> dict[str, int]:
+    """
+    Insert missing genera and return identifiers of the document genera by their lower-case names.
+    """
+    genera_names = dict(zip(genera_df["genus_lower"], genera_df[genera_config.genus_column]))
+    statement = select(genera.c.name_ru, genera.c.id).where(func.lower(genera.c.name_ru).in_(list(genera_names)))
+    genera_ids: dict[str, int] = {name.lower(): idx for name, idx in await conn.execute(statement)}
+    if len(missing_genera_names := [name for lower, name in genera_names.items() if lower not in genera_ids]) != 0:
+        statement = (
+            insert_pg(genera)
+            .values([{"name_ru": name} for name in missing_genera_names])
+            .returning(genera.c.name_ru, genera.c.id)
+        )
+        genera_ids.update({name.lower(): idx for name, idx in await conn.execute(statement)})
+    return genera_ids
 
-    # Загрузка родов
-    insert_statement = insert(genera).returning(genera.c.id)
-    for name in set(genera_df[sheets_configuration.plants_genera_config.genus_column]):
-        statement = select(genera.c.id).where(func.lower(genera.c.name_ru) == name.lower())
-        if (res := (await conn.execute(statement)).fetchone()) is None:
-            res = (await conn.execute(insert_statement, {"name_ru": name})).fetchone()
-        genera_ids[name.lower()] = res[0]
-
-    # Загрузка комментрариев сочетаемости с листа
-    insert_statement = insert(cohabitation_comments).returning(cohabitation_comments.c.id)
-    for comment in [
-        c
-        for c in cohabitation_df[sheets_configuration.genera_cohabitation_config.comment_column].unique()
-        if c == c  # pylint: disable=comparison-with-itself
-    ]:
-        statement = select(cohabitation_comments).where(cohabitation_comments.c.text == comment)
-        if (res := (await conn.execute(statement)).fetchone()) is None:
-            res = (await conn.execute(insert_statement, {"text": comment})).fetchone()
-        comments_ids[comment] = res[0]
+
+async def _update_plants(  # pylint: disable=too-many-locals
+    conn: AsyncConnection, plants_df: pd.DataFrame, plants_config: PlantsConfiguration, log: Callable[[str], None]
+) -> int:
+    """
+    Insert plants life forms, synchronize russian names by latin ones, insert new plants and update
+    life forms of the existing ones. Return number of inserted plants.
+    """
+    # Загрузка жизненных форм с соответствующего листа.
+    lifeforms = list(plants_df["lifeform"].dropna().unique())
+    if len(lifeforms) != 0:
+        statement = insert_pg(plant_types).values([{"name": name} for name in lifeforms]).on_conflict_do_nothing()
+        await conn.execute(statement)
+
+    staging_plants = await _copy_to_staging(
+        conn,
+        "staging_plants",
+        {
+            "idx": Integer,
+            plants_config.name_ru_column: String,
+            plants_config.name_lat_column: String,
+            "genus_id": Integer,
+            "lifeform": String,
+            plants_config.height_column: Float,
+            plants_config.crown_diameter_column: Float,
+            plants_config.aggressiveness_column: Integer,
+            plants_config.survivability_column: Integer,
+            "is_invasive": Boolean,
+        },
+        plants_df,
+    )
+    staging_name_ru = staging_plants.c[plants_config.name_ru_column]
+    staging_name_lat = staging_plants.c[plants_config.name_lat_column]
 
     # Синхронизация названия на русском по названию на латыни.
     log("Обновление названий на русском языке в соответствии с документом")
-    was_updated = 0
-    for _, (name_ru, name_lat) in plants_df[
-        [sheets_configuration.plants_config.name_ru_column, sheets_configuration.plants_config.name_lat_column]
-    ].iterrows():
-        statement = select(plants.c.name_ru).where(plants.c.name_latin == name_lat)
-        if (res := (await conn.execute(statement)).fetchone()) is not None:
-            if res[0] != name_ru:
-                log(f"Обновление названия по-русски: {res[0]} -> {name_ru} (название на латыни: {name_lat})")
-                statement = update(plants).where(plants.c.name_latin == name_lat).values(name_ru=name_ru)
-                await conn.execute(statement)
-                was_updated += 1
-    if was_updated == 0:
+    plants_before = plants.alias("plants_before")
+    statement = (
+        update(plants)
+        .values(name_ru=staging_name_ru)
+        .where(
+            plants_before.c.id == plants.c.id,
+            plants.c.name_latin == staging_name_lat,
+            plants.c.name_ru != staging_name_ru,
+        )
+        .returning(staging_plants.c.idx, plants_before.c.name_ru, staging_name_ru, staging_name_lat)
+    )
+    renamed = sorted(await conn.execute(statement))
+    for _, name_ru_before, name_ru, name_lat in renamed:
+        log(f"Обновление названия по-русски: {name_ru_before} -> {name_ru} (название на латыни: {name_lat})")
+    if len(renamed) == 0:
         log("Названия на русском языке соответствуют тем, что указаны в документе.")
 
+    # Загрузка и обновление растений
+    new_plants = (
+        select(
+            staging_name_ru,
+            staging_name_lat,
+            staging_plants.c.genus_id,
+            plant_types.c.id,
+            staging_plants.c[plants_config.height_column],
+            staging_plants.c[plants_config.crown_diameter_column],
+            staging_plants.c[plants_config.aggressiveness_column],
+            staging_plants.c[plants_config.survivability_column],
+            staging_plants.c.is_invasive,
+        )
+        .distinct(staging_name_ru)
+        .select_from(staging_plants)
+        .outerjoin(plant_types, plant_types.c.name == staging_plants.c.lifeform)
+        .where(
+            staging_name_ru.is_not(None),
+            ~select(plants.c.id).where(plants.c.name_ru == staging_name_ru).exists(),
+        )
+        .order_by(staging_name_ru, staging_plants.c.idx)
+    )
+    statement = insert_pg(plants).from_select(
+        [
+            "name_ru",
+            "name_latin",
+            "genus_id",
+            "type_id",
+            "height_avg",
+            "crown_diameter",
+            "spread_aggressiveness_level",
+            "survivability_level",
+            "is_invasive",
+        ],
+        new_plants,
+    )
+    inserted_new = (await conn.execute(statement)).rowcount
+    statement = (
+        update(plants)
+        .values(type_id=plant_types.c.id)
+        .where(
+            plants.c.name_ru == staging_name_ru,
+            plant_types.c.name == staging_plants.c.lifeform,
+            plants.c.type_id.is_distinct_from(plant_types.c.id),
+        )
+    )
+    await conn.execute(statement)
+    return inserted_new
+
+
+async def _update_plants_factors(  # pylint: disable=too-many-locals
+    conn: AsyncConnection, plants_df: pd.DataFrame, plants_config: PlantsConfiguration, log: Callable[[str], None]
+) -> tuple[int, int]:
+    """
+    Insert and update plants tolerance to the factors (USDA zones, limitation factors, light, humidity
+    and soil types). Return numbers of inserted and updated values.
+    """
+    statement = select(plants.c.name_ru, plants.c.id)
+    plants_ids_by_name_ru = dict(list(await conn.execute(statement)))
     statement = select(climate_zones.c.usda_number, climate_zones.c.id)
     usda_numbers_climate_zones = dict((await conn.execute(statement)).fetchall())
 
-    # Загрузка и обновление растений
-    inserted_new = 0
+    factors_columns = [
+        name for name in plants_df.columns if name in s_conf.additional_columns or name in s_conf.plants_columns_mapping
+    ]
+    factors_df = plants_df[[plants_config.name_ru_column, *factors_columns]].melt(
+        id_vars=plants_config.name_ru_column, var_name="factor", value_name="value"
+    )
+    factors_df["type"] = factors_df["value"].astype(str).str.strip().map(_TOLERANCE_TYPES)
+    factors_df["plant_id"] = factors_df[plants_config.name_ru_column].map(plants_ids_by_name_ru)
+    factors_df = factors_df.dropna(subset=["type", "plant_id"]).astype({"plant_id": int})
+
     inserted_factors = 0
     updated_factors = 0
-
-    for idx, line in plants_df.replace({nan: None}).iterrows():
-        statement = select(plants.c.id).where(
-            plants.c.name_ru == line[sheets_configuration.plants_config.name_ru_column]
+    is_usda = factors_df["factor"].str.startswith("USDA")
+    factors_by_table = [
+        (
+            plants_climate_zones,
+            "climate_zone_id",
+            factors_df[is_usda].assign(
+                climate_zone_id=factors_df["factor"][is_usda]
+                .str[len("USDA") :]
+                .astype(int)
+                .map(usda_numbers_climate_zones)
+            ),
         )
-        if (res := (await conn.execute(statement)).fetchone()) is None:
-            insert_statement = insert(plants).returning(plants.c.id)
-            res = (
-                await conn.execute(
-                    insert_statement,
-                    {
-                        "name_ru": line[sheets_configuration.plants_config.name_ru_column],
-                        "name_latin": line[sheets_configuration.plants_config.name_lat_column],
-                        "genus_id": (
-                            genera_ids.get(
-                                genera_df[
-                                    genera_df["Вид"].apply(normalize)
-                                    == normalize(line[sheets_configuration.plants_config.name_ru_column])
-                                ][sheets_configuration.plants_genera_config.genus_column]
-                                .iloc[0]
-                                .lower()
-                            )
-                            if normalize(line[sheets_configuration.plants_config.name_ru_column])
-                            in genera_df[sheets_configuration.plants_config.lifeform_short_column].apply(normalize)
-                            else None
-                        ),
-                        "height_avg": line[sheets_configuration.plants_config.height_column],
-                        "crown_diameter": line[sheets_configuration.plants_config.crown_diameter_column],
-                        "spread_aggressiveness_level": line[sheets_configuration.plants_config.aggressiveness_column],
-                        "survivability_level": line[sheets_configuration.plants_config.survivability_column],
-                        "is_invasive": bool(line[sheets_configuration.plants_config.invasiveness_column]),
-                    },
-                )
-            ).fetchone()
-            inserted_new += 1
-        plant_id = res[0]
-        insert_statement = insert(plants_climate_zones)
-        for name, value in line.items():
-            if (name not in s_conf.additional_columns) and (
-                name not in s_conf.plants_columns_mapping or (value := str(value).strip()) not in ("-1", "0", "1")
-            ):
-                continue
-            if name.startswith("USDA"):
-                value = (
-                    CohabitationType.positive
-                    if value == "1"
-                    else CohabitationType.neutral
-                    if value == "0"
-                    else CohabitationType.negative
-                )
-                usda_number = int(name[len("USDA") :])
-                statement = select(plants_climate_zones.c.type).where(
-                    (plants_climate_zones.c.plant_id == plant_id)
-                    & (plants_climate_zones.c.climate_zone_id == usda_numbers_climate_zones[usda_number])
-                )
-                if (res := (await conn.execute(statement)).fetchone()) is None:
-                    await conn.execute(
-                        insert_statement,
-                        {
-                            "plant_id": plant_id,
-                            "climate_zone_id": usda_numbers_climate_zones[usda_number],
-                            "type": value,
-                        },
-                    )
-                    inserted_factors += 1
-                elif res[0] != value:
-                    statement = (
-                        update(plants_climate_zones)
-                        .values(type=value)
-                        .where(
-                            plants_climate_zones.c.plant_id == plant_id,
-                            plants_climate_zones.c.climate_zone_id == usda_numbers_climate_zones[usda_number],
-                        )
-                    )
-                    await conn.execute(statement)
-                    updated_factors += 1
-                continue
-            if name == sheets_configuration.plants_config.lifeform_short_column:
-                statement = select(plants.c.type_id).where(plants.c.id == plant_id)
-                if (await conn.execute(statement)).scalar() != value:
-                    statement = update(plants).where(plants.c.id == plant_id).values(type_id=plant_types_ids[value])
-                    await conn.execute(statement)
-                continue
-            try:
-                value = (
-                    CohabitationType.positive
-                    if value == "1"
-                    else CohabitationType.neutral
-                    if value == "0"
-                    else CohabitationType.negative
-                )
-                plants_to_table, table_column, table_types = type_table_name[s_conf.plants_columns_mapping[name]]
-                statement = select(plants_to_table.c.type).where(
-                    (plants_to_table.c.plant_id == plant_id)
-                    & (table_column == select(table_types.c.id).where(table_types.c.name == name).scalar_subquery())
-                )
-                if (res := (await conn.execute(statement)).fetchone()) is None:
-                    statement = insert(plants_to_table).values(
-                        plant_id=plant_id,
-                        type=value,
-                        **{
-                            table_column.name: select(table_types.c.id)
-                            .where(table_types.c.name == name)
-                            .scalar_subquery()
-                        },
-                    )
-                    await conn.execute(statement)
-                    inserted_factors += 1
-                elif res[0] != value:
-                    statement = (
-                        update(plants_to_table)
-                        .where(
-                            (plants_to_table.c.plant_id == plant_id)
-                            & (
-                                table_column
-                                == select(table_types.c.id).where(table_types.c.name == name).scalar_subquery()
-                            )
-                        )
-                        .values(type=value)
-                    )
-                    await conn.execute(statement)
-                    updated_factors += 1
-            except Exception as exc:
-                log(repr(exc))
-                raise
-    log(f"Добавлено растений {inserted_new}")
-    log(f"Добавлено свойств: {inserted_factors}")
-    log(f"Обновлено свойств: {updated_factors}")
-    log("")
+    ]
+    factors_kinds = factors_df["factor"].map(s_conf.plants_columns_mapping)
+    for kind, (plants_to_table, table_column, table_types) in _FACTORS_TABLES.items():
+        kind_df = factors_df[~is_usda & (factors_kinds == kind)]
+        if kind_df.shape[0] == 0:
+            continue
+        statement = select(table_types.c.name, table_types.c.id).where(
+            table_types.c.name.in_(list(kind_df["factor"].unique()))
+        )
+        types_ids = dict(list(await conn.execute(statement)))
+        for name in set(kind_df["factor"]) - set(types_ids):
+            log(f"Свойство '{name}' не найдено в базе данных, пропускается!")
+        factors_by_table.append(
+            (plants_to_table, table_column, kind_df.assign(**{table_column: kind_df["factor"].map(types_ids)}))
+        )
+    for plants_to_table, table_column, table_df in factors_by_table:
+        table_df = table_df.dropna(subset=table_column).drop_duplicates(["plant_id", table_column], keep="last")
+        if table_df.shape[0] == 0:
+            continue
+        staging = await _copy_to_staging(
+            conn,
+            f"staging_{plants_to_table.name}",
+            {"plant_id": Integer, table_column: Integer, "type": CohabitationTypeEnum},
+            table_df.astype({table_column: int}),
+        )
+        inserted, updated = await _merge_from_staging(
+            conn, plants_to_table, staging, ["plant_id", table_column], "type"
+        )
+        inserted_factors += inserted
+        updated_factors += updated
+    return inserted_factors, updated_factors
 
-    # Обновление родов
+
+async def _update_plants_genera(
+    conn: AsyncConnection,
+    genera_df: pd.DataFrame,
+    genera_config: PlantsGeneraConfiguration,
+    genera_ids: dict[str, int],
+    log: Callable[[str], None],
+) -> dict[str, int]:
+    """
+    Update plants genera by the document genera sheet. Return identifiers of all of the plants by their
+    normalized names.
+    """
     statement = select(plants.c.name_ru, plants.c.id)
     plants_ids = {normalize(name): idx for name, idx in await conn.execute(statement)}
-    statement = select(plants.c.id, plants.c.genus_id).where(
-        plants.c.genus_id != None  # pylint: disable=singleton-comparison
-    )
-    plants_genera = dict((await conn.execute(statement)).fetchall())
-    updated_genera = 0
-    for name in set(genera_df[sheets_configuration.plants_genera_config.genus_column]):
+    for name in set(genera_df[genera_config.genus_column]):
         if normalize(name) not in plants_ids:
             name = f"'{name}'"
             log(f"Растение {name:<40} отсутствует в базе данных, хотя указано его соовтетствие роду.")
-    for _, (genus_name, plant_name) in genera_df[
-        [
-            sheets_configuration.plants_genera_config.genus_column,
-            sheets_configuration.plants_genera_config.plant_column,
-        ]
-    ].iterrows():
-        if (plant_name := normalize(plant_name)) in plants_ids:
-            genus_name = genus_name.lower()
-            if plants_genera.get(plants_ids[plant_name]) != genera_ids[genus_name]:
-                statement = (
-                    update(plants).where(plants.c.id == plants_ids[plant_name]).values(genus_id=genera_ids[genus_name])
-                )
-                await conn.execute(statement)
-                updated_genera += 1
-                plants_genera[plants_ids[plant_name]] = genera_ids[genus_name]
+    plants_genera_df = genera_df.assign(
+        id=genera_df["plant_normalized"].map(plants_ids), genus_id=genera_df["genus_lower"].map(genera_ids)
+    ).dropna(subset=["id", "genus_id"])
+    updated_genera = 0
+    if plants_genera_df.shape[0] != 0:
+        staging = await _copy_to_staging(
+            conn,
+            "staging_plants_genera",
+            {"id": Integer, "genus_id": Integer},
+            plants_genera_df.drop_duplicates("id", keep="last").astype({"id": int, "genus_id": int}),
+        )
+        statement = (
+            update(plants)
+            .values(genus_id=staging.c.genus_id)
+            .where(plants.c.id == staging.c.id, plants.c.genus_id.is_distinct_from(staging.c.genus_id))
+        )
+        updated_genera = (await conn.execute(statement)).rowcount
     if updated_genera != 0:
         log(f"Updated {updated_genera} plants genera")
+    return plants_ids
 
-    # Вставка сочетаемостей
+
+async def _update_cohabitation_comments(
+    conn: AsyncConnection, cohabitation_df: pd.DataFrame, cohabitation_config: GeneraCohabitationConfiguration
+) -> dict[str, int]:
+    """
+    Insert missing cohabitation comments and return identifiers of the document comments by their texts.
+    """
+    comments = list(cohabitation_df[cohabitation_config.comment_column].dropna().unique())
+    if len(comments) == 0:
+        return {}
+    statement = (
+        insert_pg(cohabitation_comments)
+        .values([{"text": comment} for comment in comments])
+        .on_conflict_do_nothing(index_elements=["text"])
+    )
+    await conn.execute(statement)
+    statement = select(cohabitation_comments.c.text, cohabitation_comments.c.id).where(
+        cohabitation_comments.c.text.in_(comments)
+    )
+    return dict(list(await conn.execute(statement)))
+
+
+async def _update_cohabitation(  # pylint: disable=too-many-locals
+    conn: AsyncConnection,
+    cohabitation_df: pd.DataFrame,
+    cohabitation_config: GeneraCohabitationConfiguration,
+    genera_ids: dict[str, int],
+    log: Callable[[str], None],
+) -> None:
+    """
+    Insert genera cohabitation values (straight and, if missing, back ones) with their comments and update
+    the changed ones. Cohabitation of genera missing in the document genera sheet is skipped.
+    """
+    comments_ids = await _update_cohabitation_comments(conn, cohabitation_df, cohabitation_config)
+    cohabitation_df = cohabitation_df.reset_index(drop=True)
+    cohabitation_df = cohabitation_df.assign(
+        idx=cohabitation_df.index,
+        genus_1=cohabitation_df[cohabitation_config.genus_1_column].str.lower(),
+        genus_2=cohabitation_df[cohabitation_config.genus_2_column].str.lower(),
+        cohabitation_type=np.select(
+            [
+                cohabitation_df[cohabitation_config.cohabitation_column] == 1,
+                cohabitation_df[cohabitation_config.cohabitation_column] == 0,
+            ],
+            [CohabitationType.positive.value, CohabitationType.neutral.value],
+            CohabitationType.negative.value,
+        ),
+        comment_id=cohabitation_df[cohabitation_config.comment_column].map(comments_ids).astype("Int64"),
+    )
+    cohabitation_df = cohabitation_df[
+        cohabitation_df["genus_1"].isin(genera_ids.keys()) & cohabitation_df["genus_2"].isin(genera_ids.keys())
+    ]
+    cohabitation_df = cohabitation_df.assign(
+        genus_id_1=cohabitation_df["genus_1"].map(genera_ids).astype(int),
+        genus_id_2=cohabitation_df["genus_2"].map(genera_ids).astype(int),
+    )
     inserted_straight = 0
     inserted_back = 0
     updated = 0
-    missing_genera = (
-        set(cohabitation_df[sheets_configuration.genera_cohabitation_config.genus_1_column].apply(str.lower))
-        | set(cohabitation_df[sheets_configuration.genera_cohabitation_config.genus_2_column].apply(str.lower))
-    ) - set(genera_df[sheets_configuration.plants_genera_config.genus_column].apply(str.lower))
-    insert_statement = insert(cohabitation)
-    for _, (genus_1, value, genus_2, comment) in cohabitation_df[
-        [
-            sheets_configuration.genera_cohabitation_config.genus_1_column,
-            sheets_configuration.genera_cohabitation_config.cohabitation_column,
-            sheets_configuration.genera_cohabitation_config.genus_2_column,
-            sheets_configuration.genera_cohabitation_config.comment_column,
-        ]
-    ].iterrows():
-        genus_1, genus_2 = genus_1.lower(), genus_2.lower()
-        if genus_1 in missing_genera or genus_2 in missing_genera:
-            continue
-        statement = select(cohabitation.c.cohabitation_type).where(
-            (cohabitation.c.genus_id_1 == genera_ids[genus_1]) & (cohabitation.c.genus_id_2 == genera_ids[genus_2])
+    if cohabitation_df.shape[0] != 0:
+        staging = await _copy_to_staging(
+            conn,
+            "staging_cohabitation",
+            {
+                "genus_id_1": Integer,
+                "genus_id_2": Integer,
+                "cohabitation_type": CohabitationTypeEnum,
+                "comment_id": Integer,
+                "idx": Integer,
+            },
+            cohabitation_df,
         )
-        if (res := (await conn.execute(statement)).fetchone()) is not None:
-            value_now = 1 if res[0] == CohabitationType.positive else 0 if res[0] == CohabitationType.neutral else -1
-            if value_now != value:
-                statement = (
-                    update(cohabitation)
-                    .where(
-                        (cohabitation.c.genus_id_1 == genera_ids[genus_1])
-                        & (cohabitation.c.genus_id_2 == genera_ids[genus_2])
-                    )
-                    .values(
-                        cohabitation_type=(
-                            CohabitationType.positive
-                            if value == 1
-                            else CohabitationType.neutral
-                            if value == 0
-                            else CohabitationType.negative
-                        )
-                    )
-                )
-                await conn.execute(statement)
-                updated += 1
-        else:
-            await conn.execute(
-                insert_statement,
-                {
-                    "genus_id_1": genera_ids[genus_1],
-                    "genus_id_2": genera_ids[genus_2],
-                    "cohabitation_type": CohabitationType.positive
-                    if value == 1
-                    else CohabitationType.neutral
-                    if value == 0
-                    else CohabitationType.negative,
-                    "comment_id": comments_ids[comment] if comment in comments_ids else None,
-                },
+        statement = (
+            update(cohabitation)
+            .values(cohabitation_type=staging.c.cohabitation_type)
+            .where(
+                cohabitation.c.genus_id_1 == staging.c.genus_id_1,
+                cohabitation.c.genus_id_2 == staging.c.genus_id_2,
+                cohabitation.c.cohabitation_type != staging.c.cohabitation_type,
             )
-            inserted_straight += 1
+        )
+        updated = (await conn.execute(statement)).rowcount
+        cohabitation_columns = ["genus_id_1", "genus_id_2", "cohabitation_type", "comment_id"]
+        statement = (
+            insert_pg(cohabitation)
+            .from_select(cohabitation_columns, select(*(staging.c[column] for column in cohabitation_columns)))
+            .on_conflict_do_nothing(index_elements=["genus_id_1", "genus_id_2"])
+        )
+        inserted_straight = (await conn.execute(statement)).rowcount
 
-    for _, (genus_1, value, genus_2, comment) in cohabitation_df[
-        [
-            sheets_configuration.genera_cohabitation_config.genus_1_column,
-            sheets_configuration.genera_cohabitation_config.cohabitation_column,
-            sheets_configuration.genera_cohabitation_config.genus_2_column,
-            sheets_configuration.genera_cohabitation_config.comment_column,
-        ]
-    ].iterrows():
-        genus_1, genus_2 = genus_1.lower(), genus_2.lower()
-        if genus_1 in missing_genera or genus_2 in missing_genera:
-            continue
-        statement = select(cohabitation.c.cohabitation_type).where(
-            (cohabitation.c.genus_id_1 == genera_ids[genus_2]) & (cohabitation.c.genus_id_2 == genera_ids[genus_1])
+        statement = (
+            select(staging.c.idx, cohabitation.c.cohabitation_type)
+            .select_from(staging)
+            .join(
+                cohabitation,
+                (cohabitation.c.genus_id_1 == staging.c.genus_id_2)
+                & (cohabitation.c.genus_id_2 == staging.c.genus_id_1),
+            )
+            .order_by(staging.c.idx)
         )
-        if (res := (await conn.execute(statement)).fetchone()) is not None:
-            value_now = 1 if res[0] == CohabitationType.positive else 0 if res[0] == CohabitationType.neutral else -1
-            if value_now != value:
+        cohabitation_by_idx = cohabitation_df.set_index("idx")
+        for idx, cohabitation_type in await conn.execute(statement):
+            value = cohabitation_by_idx.at[idx, cohabitation_config.cohabitation_column]
+            if (value_now := _COHABITATION_VALUES[cohabitation_type]) != value:
+                genus_1, genus_2 = cohabitation_by_idx.at[idx, "genus_1"], cohabitation_by_idx.at[idx, "genus_2"]
                 log(
                     f"Сочетаемость родов {genus_2:<20} и {genus_1:<20} имеет значение "
                     f" {value_now} напрямую и {value} в обратную сторону"
                 )
-        else:
-            await conn.execute(
-                insert_statement,
-                {
-                    "genus_id_1": genera_ids[genus_2],
-                    "genus_id_2": genera_ids[genus_1],
-                    "cohabitation_type": CohabitationType.positive
-                    if value == 1
-                    else CohabitationType.neutral
-                    if value == 0
-                    else CohabitationType.negative,
-                    "comment_id": comments_ids[comment] if comment in comments_ids else None,
-                },
+        statement = (
+            insert_pg(cohabitation)
+            .from_select(
+                cohabitation_columns,
+                select(staging.c.genus_id_2, staging.c.genus_id_1, staging.c.cohabitation_type, staging.c.comment_id),
             )
-            inserted_back += 1
+            .on_conflict_do_nothing(index_elements=["genus_id_1", "genus_id_2"])
+        )
+        inserted_back = (await conn.execute(statement)).rowcount
     log(
         f"Добавлено {inserted_straight} прямых значений совместимости + {inserted_back}"
         f" обратных значений. Обновлены {updated} связей."
     )
-    log("")
+
+
+async def _update_parks(  # pylint: disable=too-many-locals
+    conn: AsyncConnection,
+    plants_locations: dict[str, dict[str, list[str]]],
+    plants_ids: dict[str, int],
+    log: Callable[[str], None],
+) -> None:
+    """
+    Insert districts, parks and plants located in them. Plants missing in the database are skipped.
+    """
+    districts_ids: dict[str, int] = {}
+    parks_ids: dict[tuple[int, str], int] = {}
+    if len(plants_locations) != 0:
+        statement = (
+            insert_pg(districts)
+            .values([{"name": name, "sheet_name": name} for name in plants_locations])
+            .on_conflict_do_nothing()
+        )
+        await conn.execute(statement)
+        statement = select(districts.c.sheet_name, districts.c.id).where(
+            districts.c.sheet_name.in_(list(plants_locations))
+        )
+        districts_ids = dict(list(await conn.execute(statement)))
+        parks_keys = list(
+            dict.fromkeys(
+                (districts_ids[district_name], park_name.strip()[:80])
+                for district_name, parks_dict in plants_locations.items()
+                for park_name in parks_dict
+            )
+        )
+        if len(parks_keys) != 0:
+            statement = (
+                insert_pg(parks)
+                .values([{"district_id": district_id, "name": name} for district_id, name in parks_keys])
+                .on_conflict_do_nothing(index_elements=["district_id", "name"])
+            )
+            await conn.execute(statement)
+        statement = select(parks.c.district_id, parks.c.name, parks.c.id).where(
+            tuple_(parks.c.district_id, parks.c.name).in_(parks_keys)
+        )
+        parks_ids = {(district_id, name): idx for district_id, name, idx in await conn.execute(statement)}
 
     missing_plants = set()
+    plants_parks_records = []
     for district_name, parks_dict in plants_locations.items():
-        statement = select(districts.c.id).where(districts.c.sheet_name == district_name)
-        if (res := (await conn.execute(statement)).fetchone()) is None:
-            statement = insert(districts).values(name=district_name, sheet_name=district_name).returning(districts.c.id)
-            res = (await conn.execute(statement)).fetchone()
-        district_id = res[0]
-
         for park_name, park_plants in parks_dict.items():
             park_name = park_name.strip()[:80]
-            statement = select(parks.c.id).where((parks.c.district_id == district_id) & (parks.c.name == park_name))
-            if (res := (await conn.execute(statement)).fetchone()) is None:
-                statement = insert(parks).values(district_id=district_id, name=park_name).returning(parks.c.id)
-                res = (await conn.execute(statement)).fetchone()
-            park_id = res[0]
+            park_id = parks_ids[(districts_ids[district_name], park_name)]
             for plant_name in park_plants:
                 if plant_name not in plants_ids:
                     log(
@@ -482,14 +561,106 @@ async def update_plants_from_xlsx(  # pylint: disable=too-many-locals,too-many-b
                     )
                     missing_plants.add(plant_name)
                     continue
-                statement = (
-                    insert_pg(plants_parks)
-                    .values(plant_id=plants_ids[plant_name], park_id=park_id)
-                    .on_conflict_do_nothing(index_elements=["plant_id", "park_id"])
-                )
-                await conn.execute(statement)
+                plants_parks_records.append((plants_ids[plant_name], park_id))
+    if len(plants_parks_records) != 0:
+        staging = await _copy_to_staging(
+            conn,
+            "staging_plants_parks",
+            {"plant_id": Integer, "park_id": Integer},
+            pd.DataFrame(plants_parks_records, columns=["plant_id", "park_id"]),
+        )
+        statement = (
+            insert_pg(plants_parks)
+            .from_select(["plant_id", "park_id"], select(staging.c.plant_id, staging.c.park_id).distinct())
+            .on_conflict_do_nothing(index_elements=["plant_id", "park_id"])
+        )
+        await conn.execute(statement)
     if len(missing_plants) > 0:
         log(f"{len(missing_plants)} отсутствующие в БД растения, указанные в парках: {', '.join(missing_plants)}")
 
+
+async def update_plants_from_xlsx(  # pylint: disable=too-many-locals
+    conn: AsyncConnection, input_xlsx: BytesIO, sheets_configuration: SheetsConfiguration
+) -> StringIO:
+    """
+    Parse xlsx with given format and update database entities.
+    """
+    out = StringIO()
+    sheets = pd.read_excel(input_xlsx, sheet_name=None)
+
+    def log(message: str) -> None:
+        print(message, file=out)
+        logger.info(message)
+
+    log(f"Входной файл имеет {len(sheets)} листов: {' --- '.join(sorted(sheets.keys()))}")
+
+    plants_config = sheets_configuration.plants_config
+    genera_config = sheets_configuration.plants_genera_config
+    cohabitation_config = sheets_configuration.genera_cohabitation_config
+
+    plants_df = get_plants_from_xlsx_sheets(
+        sheets[sheets_configuration.plants_sheet],
+        sheets[sheets_configuration.lifeforms_sheet],
+        plants_config,
+        sheets_configuration.lifeforms_config,
+    )
+    genera_df = get_plants_genera(sheets[sheets_configuration.plants_genera_sheet], genera_config)
+    cohabitation_df = get_cohabitation(
+        sheets[sheets_configuration.genera_cohabitation_sheet],
+        genera_df,
+        log,
+        genera_config,
+        cohabitation_config,
+    )
+
+    # считывание парков
+
+    # district:
+    #   - park:
+    #       - plant
+    #       - plant
+    plants_locations = _get_plants_locations(sheets, sheets_configuration, log)
+
+    # Нормализация данных документа
+    genera_df = genera_df.assign(
+        genus_lower=genera_df[genera_config.genus_column].str.lower(),
+        plant_normalized=genera_df[genera_config.plant_column].apply(normalize),
+    )
+    plants_df = plants_df.reset_index(drop=True)
+    plants_df["idx"] = plants_df.index
+    plants_df["name_normalized"] = plants_df[plants_config.name_ru_column].apply(
+        lambda name: normalize(name) if isinstance(name, str) else None
+    )
+    plants_df["lifeform"] = plants_df[plants_config.lifeform_short_column].dropna().astype(str)
+    plants_df["is_invasive"] = plants_df[plants_config.invasiveness_column].notna() & plants_df[
+        plants_config.invasiveness_column
+    ].astype(bool)
+    for column in (plants_config.aggressiveness_column, plants_config.survivability_column):
+        plants_df[column] = pd.to_numeric(plants_df[column], errors="coerce").round().astype("Int64")
+
+    # Загрузка родов
+    genera_ids = await _update_genera(conn, genera_df, genera_config)
+
+    # Загрузка и обновление растений
+    genus_by_plant = genera_df.drop_duplicates("plant_normalized").set_index("plant_normalized")["genus_lower"]
+    plants_df["genus_id"] = plants_df["name_normalized"].map(genus_by_plant).map(genera_ids).astype("Int64")
+    inserted_new = await _update_plants(conn, plants_df, plants_config, log)
+    inserted_factors, updated_factors = await _update_plants_factors(conn, plants_df, plants_config, log)
+    log(f"Добавлено растений {inserted_new}")
+    log(f"Добавлено свойств: {inserted_factors}")
+    log(f"Обновлено свойств: {updated_factors}")
+    log("")
+
+    # Обновление родов
+    plants_ids = await _update_plants_genera(conn, genera_df, genera_config, genera_ids, log)
+
+    # Вставка сочетаемостей
+    await _update_cohabitation(conn, cohabitation_df, cohabitation_config, genera_ids, log)
+    log("")
+
+    # Загрузка растений в парках
+    await _update_parks(conn, plants_locations, plants_ids, log)
+
+    await bump_cache_versions(conn, CachedData.PLANTS, CachedData.GENERA_COHABITATION)
     await conn.commit()
     return out
@@ -2,7 +2,7 @@
 Geojson response model and its inner parts are defined here.
 """
 import json
-from typing import Any, Generic, Iterable, Literal, TypeVar
+from typing import Any, AsyncIterable, AsyncIterator, Generic, Iterable, Literal, TypeVar
 
 import pandas as pd
 import shapely.geometry as geom
@@ -173,3 +173,19 @@ class GeoJSONResponse(GenericModel, Generic[FeaturePropertiesType]):
             crs=crs,
             features=features,
         )
+
+    @staticmethod
+    async def stream(features_batches: AsyncIterable[Iterable[str]], crs: Crs = crs_4326) -> AsyncIterator[bytes]:
+        """
+        Stream GeoJSON from batches of already encoded Feature JSON strings (i.e. built by PostGIS) without
+        parsing and holding them all in memory.
+        """
+        yield f'{{"crs":{json.dumps({"type": crs.type, "properties": crs.properties})},'.encode()
+        yield b'"type":"FeatureCollection","features":['
+        separator = ""
+        async for features in features_batches:
+            if len(features) == 0:
+                continue
+            yield (separator + ",".join(features)).encode()
+            separator = ","
+        yield b"]}"
@@ -0,0 +1,80 @@
+"""
+Saved requests profiles responses are defined here.
+"""
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from plants_api.dto import ProfileDto, ProfileFunctionDto
+
+
+class ProfileFunction(BaseModel):
+    """
+    Function statistics of a request profile.
+    """
+
+    function: str
+    calls: int
+    total_ms: float = Field(..., description="Time spent in the function itself")
+    cumulative_ms: float = Field(..., description="Time spent in the function and its callees")
+
+    @classmethod
+    def from_dto(cls, dto: ProfileFunctionDto) -> "ProfileFunction":
+        """
+        Construct from DTO.
+        """
+        return cls(function=dto.function, calls=dto.calls, total_ms=dto.total_ms, cumulative_ms=dto.cumulative_ms)
+
+
+class Profile(BaseModel):
+    """
+    Saved profile of a slow request with statistics summary.
+    """
+
+    id: str
+    created_at: datetime
+    method: str
+    path: str
+    query: str
+    status: int | None
+    duration_ms: float
+    user: str
+    stages: dict[str, float] = Field(..., description="Durations of the request stages in milliseconds")
+    memory_peak_kb: float | None = Field(..., description="Peak memory traced by tracemalloc during the request")
+    top_functions: list[ProfileFunction]
+    top_allocations: list[str] = Field(..., description="Lines allocated most of the memory left by the request")
+
+    @classmethod
+    def from_dto(cls, dto: ProfileDto) -> "Profile":
+        """
+        Construct from DTO.
+        """
+        return cls(
+            id=dto.id,
+            created_at=dto.created_at,
+            method=dto.method,
+            path=dto.path,
+            query=dto.query,
+            status=dto.status,
+            duration_ms=dto.duration_ms,
+            user=dto.user,
+            stages=dto.stages,
+            memory_peak_kb=dto.memory_peak_kb,
+            top_functions=[ProfileFunction.from_dto(function) for function in dto.top_functions],
+            top_allocations=dto.top_allocations,
+        )
+
+
+class ProfilesResponse(BaseModel):
+    """
+    Saved requests profiles, the newest first.
+    """
+
+    profiles: list[Profile]
+
+    @classmethod
+    def from_dtos(cls, dtos: list[ProfileDto]) -> "ProfilesResponse":
+        """
+        Construct from DTOs list.
+        """
+        return cls(profiles=[Profile.from_dto(dto) for dto in dtos])
@@ -2,4 +2,5 @@
 Request and response schemas of data update enpoints are defined here.
 """
 from .limitation_factors import LimitationFactorsGeometryInsertionRequest
+from .limitation_factors_uploads import LimitationFactorsUploadRequest, LimitationFactorsUploadResponse
 from .sheets_configuration import SheetsConfiguration
@@ -0,0 +1,46 @@
+"""
+Limitation factors layer upload request and response are defined here.
+"""
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from plants_api.dto.update import LimitationFactorsUploadDto
+
+
+class LimitationFactorsUploadRequest(BaseModel):
+    """
+    Request to start a limitation factor layer upload.
+    """
+
+    limitation_factor_id: int
+
+
+class LimitationFactorsUploadResponse(BaseModel):
+    """
+    Limitation factor layer upload with its progress.
+    """
+
+    id: UUID
+    limitation_factor_id: int
+    created_at: datetime
+    committed_at: datetime | None = Field(..., description="Layer replacement time, null if not committed yet")
+    parts_uploaded: int
+    features_uploaded: int
+    features_current: int = Field(..., description="Number of the limitation factor geometries in the database")
+
+    @classmethod
+    def from_dto(cls, dto: LimitationFactorsUploadDto) -> "LimitationFactorsUploadResponse":
+        """
+        Construct from DTO.
+        """
+        return cls(
+            id=dto.id,
+            limitation_factor_id=dto.limitation_factor_id,
+            created_at=dto.created_at,
+            committed_at=dto.committed_at,
+            parts_uploaded=dto.parts_uploaded,
+            features_uploaded=dto.features_uploaded,
+            features_current=dto.features_current,
+        )
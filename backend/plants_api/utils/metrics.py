@@ -0,0 +1,105 @@
+"""
+In-process metrics registry with Prometheus text exposition format is defined here.
+
+Each application worker process has its own registry, so metrics are aggregated per process.
+"""
+import threading
+from bisect import bisect_left
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels.items()) + "}"
+
+
+class Histogram:
+    """
+    Histogram of the observed values with the given label names, rendered as Prometheus histogram.
+    """
+
+    def __init__(
+        self, name: str, documentation: str, label_names: tuple[str, ...], buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """
+        Observe the value for the series with given label values (in `label_names` order).
+        """
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"Histogram {self.name} has labels {self.label_names}, got values {label_values}")
+        with self._lock:
+            if (series := self._series.get(label_values)) is None:
+                series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+            counts, total = series
+            counts[bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def render(self) -> list[str]:
+        """
+        Return lines of the histogram in Prometheus text exposition format.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total[0]) for labels, (counts, total) in sorted(self._series.items())]
+        for label_values, counts, total in series:
+            labels = dict(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip((*map(repr, self.buckets), "+Inf"), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labels | {'le': bound})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        """
+        Remove all of the observed values.
+        """
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """
+    Registry of the application metrics.
+    """
+
+    def __init__(self) -> None:
+        self._histograms: dict[str, Histogram] = {}
+
+    def histogram(
+        self, name: str, documentation: str, label_names: tuple[str, ...], buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """
+        Get histogram with the given name, it is created on the first call.
+        """
+        if name not in self._histograms:
+            self._histograms[name] = Histogram(name, documentation, label_names, buckets)
+        return self._histograms[name]
+
+    def render(self) -> str:
+        """
+        Return all of the metrics in Prometheus text exposition format.
+        """
+        return "".join(line + "\n" for histogram in self._histograms.values() for line in histogram.render())
+
+
+metrics_registry = MetricsRegistry()
+
+stages_duration_histogram = metrics_registry.histogram(
+    "plants_api_stage_duration_seconds",
+    "Duration of the request processing stages, stage 'total' is the whole request processing time.",
+    ("endpoint", "stage"),
+)
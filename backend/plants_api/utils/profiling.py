@@ -0,0 +1,248 @@
+"""
+Opt-in requests profiling middleware is defined here.
+
+A request is profiled if it has `X-Profile: 1` header or `profile=1` query parameter and an access token of an
+approved user. The request is run under cProfile (computations pool tasks are profiled in their workers and
+merged) and tracemalloc. Request duration includes sending of the whole response body, if it exceeds
+`profile_threshold_ms`, the profile is saved to `profiles_dir`. Its identifier is returned in `X-Profile-Id`
+response header when the threshold is exceeded before the response is started, otherwise it is only logged
+as headers are already sent.
+
+Profilers are process-wide, so only one request is profiled at a time, others are executed as usual.
+Event loop profile also includes concurrently running requests.
+"""
+import asyncio
+import cProfile
+import pstats
+import time
+import tracemalloc
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import parse_qs
+
+from derevo.timing import get_current_timer
+from loguru import logger
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from plants_api.config.app_settings_global import app_settings
+from plants_api.db.connection import SessionManager
+from plants_api.dto import ProfileDto
+from plants_api.dto.users import User
+from plants_api.logic.profiles import get_top_functions, new_profile_id, save_profile
+from plants_api.logic.users import get_user_info, validate_user_token
+from plants_api.utils.tokens import Token
+
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_QUERY_PARAMETER = "profile"
+_TRUE_VALUES = ("1", "true", "yes")
+_TOP_ALLOCATIONS_COUNT = 20
+
+
+class _CollectedStats:  # pylint: disable=too-few-public-methods
+    """
+    cProfile statistics collected in another thread or process, can be added to `pstats.Stats`.
+    """
+
+    def __init__(self, stats: dict[tuple, tuple]) -> None:
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        """
+        Statistics are already created.
+        """
+
+
+class RequestProfile:
+    """
+    Profile of a request: cProfile profiler of the event loop thread and statistics collected in the
+    computations pool.
+    """
+
+    def __init__(self) -> None:
+        self.profiler = cProfile.Profile()
+        self.collected_stats: list[dict[tuple, tuple]] = []
+
+    def add_stats(self, stats: dict[tuple, tuple]) -> None:
+        """
+        Add statistics of a profile collected in another thread or process.
+        """
+        self.collected_stats.append(stats)
+
+    def get_stats(self) -> pstats.Stats:
+        """
+        Return combined statistics, profiler must be disabled.
+        """
+        stats = pstats.Stats(self.profiler)
+        for collected in self.collected_stats:
+            stats.add(_CollectedStats(collected))
+        return stats
+
+
+_current_profile: ContextVar[RequestProfile | None] = ContextVar("plants_api_request_profile", default=None)
+_profiling_lock = asyncio.Lock()
+
+
+def get_current_profile() -> RequestProfile | None:
+    """
+    Return profile of the current request if it is profiled.
+    """
+    return _current_profile.get()
+
+
+def profile_call(func: Any, *args: Any) -> tuple[Any, dict[tuple, tuple]]:
+    """
+    Call the given function under cProfile and return its result and profile statistics. Since Python 3.12
+    profiler is process-wide, so the function is called as is if another profiler is active (event loop profiler
+    in the same process profiles it anyway).
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return func(*args), {}
+    try:
+        result = func(*args)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return result, profiler.stats  # type: ignore
+
+
+def _is_profiling_requested(scope: Scope) -> bool:
+    if Headers(scope=scope).get(PROFILE_HEADER, "").lower() in _TRUE_VALUES:
+        return True
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return any(value.lower() in _TRUE_VALUES for value in query.get(PROFILE_QUERY_PARAMETER, []))
+
+
+async def _get_profiling_user(scope: Scope) -> User | None:
+    """
+    Return approved user by the access token given in `Authorization` header or None if it is not valid.
+    """
+    scheme, _, credentials = Headers(scope=scope).get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or credentials == "":
+        return None
+    try:
+        token = Token.from_jwt(credentials)
+        if token.type != "access":
+            return None
+        async with SessionManager().engine.connect() as conn:
+            if not await validate_user_token(conn, token):
+                return None
+            user = await get_user_info(conn, token.email, token.device)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.debug("Could not authorize profiling request: {!r}", exc)
+        return None
+    return user if user.is_approved else None
+
+
+def _get_top_allocations(snapshot: tracemalloc.Snapshot) -> list[str]:
+    snapshot = snapshot.filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>"))
+    )
+    return [str(statistic) for statistic in snapshot.statistics("lineno")[:_TOP_ALLOCATIONS_COUNT]]
+
+
+class ProfilingMiddleware:  # pylint: disable=too-few-public-methods
+    """
+    ASGI middleware which profiles requests on demand of authorized users.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _is_profiling_requested(scope):
+            await self.app(scope, receive, send)
+            return
+        if (user := await _get_profiling_user(scope)) is None:
+            logger.warning(
+                "Profiling of {} {} is requested without valid authorization", scope["method"], scope["path"]
+            )
+            await self.app(scope, receive, send)
+            return
+        if _profiling_lock.locked():
+            logger.warning("Another request is being profiled, {} {} is not profiled", scope["method"], scope["path"])
+            await self.app(scope, receive, send)
+            return
+        async with _profiling_lock:
+            await self._profile(scope, receive, send, user)
+
+    async def _profile(  # pylint: disable=too-many-locals
+        self, scope: Scope, receive: Receive, send: Send, user: User
+    ) -> None:
+        start = time.perf_counter()
+        end: float | None = None
+        status: int | None = None
+        profile_id: str | None = None
+
+        def is_slow(moment: float) -> bool:
+            return app_settings.profiles_dir != "" and (moment - start) * 1000 >= app_settings.profile_threshold_ms
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status, profile_id, end
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if is_slow(time.perf_counter()):
+                    profile_id = new_profile_id()
+                    MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                end = time.perf_counter()
+
+        profile = RequestProfile()
+        is_tracing = tracemalloc.is_tracing()
+        if not is_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        token = _current_profile.set(profile)
+        profile.profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.profiler.disable()
+            _current_profile.reset(token)
+            if end is None:
+                end = time.perf_counter()
+            duration_ms = (end - start) * 1000
+            if profile_id is None and is_slow(end):
+                profile_id = new_profile_id()
+                logger.info(
+                    "{} {} exceeded profile threshold while sending response body, profile id = {}",
+                    scope["method"],
+                    scope["path"],
+                    profile_id,
+                )
+            memory_peak = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot() if profile_id is not None else None
+            if not is_tracing:
+                tracemalloc.stop()
+        if profile_id is None:
+            logger.debug(
+                "{} {} is profiled in {:.1f} ms, profile is not saved", scope["method"], scope["path"], duration_ms
+            )
+            return
+        timer = get_current_timer()
+        stats = profile.get_stats()
+        request_profile = ProfileDto(
+            id=profile_id,
+            created_at=datetime.now(timezone.utc),
+            method=scope["method"],
+            path=scope["path"],
+            query=scope.get("query_string", b"").decode("latin-1"),
+            status=status,
+            duration_ms=round(duration_ms, 3),
+            user=user.email,
+            stages={stage: round(duration * 1000, 3) for stage, duration in (timer.stages if timer else {}).items()},
+            memory_peak_kb=round(memory_peak / 1024, 1),
+            top_functions=get_top_functions(stats),
+            top_allocations=_get_top_allocations(snapshot),
+        )
+        try:
+            await asyncio.to_thread(save_profile, request_profile, stats)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Could not save profile {}: {!r}", profile_id, exc)
@@ -0,0 +1,57 @@
+"""
+Request stages timing middleware is defined here.
+
+A `derevo.timing` timer is activated for each HTTP request, so stages recorded by endpoints (and by derevo
+in the computations pool) are collected. If any stages are recorded, their durations are sent in `Server-Timing`
+response header, logged as a structured record (with `endpoint`, `status` and `stages` extra fields) and observed
+in the stages duration histogram along with the total request processing time.
+"""
+import time
+
+from derevo.timing import StageTimer, collect_timings
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from plants_api.utils.metrics import stages_duration_histogram
+
+
+def format_server_timing(stages: dict[str, float]) -> str:
+    """
+    Format stages durations (in seconds) as a `Server-Timing` header value.
+    """
+    return ", ".join(f"{stage};dur={duration * 1000:.1f}" for stage, duration in stages.items())
+
+
+class TimingMiddleware:  # pylint: disable=too-few-public-methods
+    """
+    ASGI middleware which collects request stages durations.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        timer = StageTimer()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and len(timer.stages) != 0:
+                stages = timer.stages | {"total": time.perf_counter() - start}
+                MutableHeaders(scope=message).append("Server-Timing", format_server_timing(stages))
+                route = scope.get("route")
+                endpoint = getattr(route, "path", scope["path"])
+                for stage, duration in stages.items():
+                    stages_duration_histogram.observe(duration, endpoint, stage)
+                logger.bind(
+                    endpoint=endpoint,
+                    status=message["status"],
+                    stages={stage: round(duration * 1000, 1) for stage, duration in stages.items()},
+                ).info("{} {} stages timing: {}", scope["method"], endpoint, format_server_timing(stages))
+            await send(message)
+
+        with collect_timings(timer):
+            await self.app(scope, receive, send_with_timing)
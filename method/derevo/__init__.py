@@ -7,20 +7,37 @@ cohabitations and possible limitation factors
 __all__ = [
     "get_compositions",
     "Compatability",
+    "CompatibilityIndex",
+    "CompositionsCache",
     "GeneraCohabitation",
     "GlobalTerritory",
     "Plant",
+    "RasterTerritory",
     "Territory",
+    "ToleranceMatrix",
     "enumerations",
     "CohabitationType",
     "get_territory",
+    "get_territories",
+    "get_territory_raster",
 ]
 
 import os
 
 os.environ["USE_PYGEOS"] = os.environ.get("USE_PYGEOS", "0")  # remove this if some Shapely 2.0 incompatibility is found
 
+from derevo.compatability import CompatibilityIndex
 from derevo.composition import get_compositions
-from derevo.models import Compatability, GeneraCohabitation, GlobalTerritory, Plant, Territory, enumerations
+from derevo.compositions_cache import CompositionsCache
+from derevo.models import (
+    Compatability,
+    GeneraCohabitation,
+    GlobalTerritory,
+    Plant,
+    RasterTerritory,
+    Territory,
+    ToleranceMatrix,
+    enumerations,
+)
 from derevo.models.cohabitation import CohabitationType
-from derevo.territories import get_territory
+from derevo.territories import get_territories, get_territory, get_territory_raster
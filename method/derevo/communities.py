@@ -0,0 +1,190 @@
+"""
+Community detection backends used to split compatability graphs into compositions are defined here.
+
+Two backends are available:
+- `networkx` - reference `greedy_modularity_communities` implementation working on a graph
+- `louvain` - multi-level Louvain method working on a dense weighted adjacency matrix with NumPy
+"""
+from __future__ import annotations
+
+from typing import Hashable, Iterable, Literal, Sequence
+
+import networkx as nx
+import numpy as np
+from networkx.algorithms.community import greedy_modularity_communities
+
+
+CommunitiesBackend = Literal["networkx", "louvain"]
+COMMUNITIES_BACKENDS: tuple[CommunitiesBackend, ...] = ("networkx", "louvain")
+
+_MAX_SWEEPS = 100
+_TOLERANCE = 1e-10
+
+
+def _check_backend(backend: str) -> None:
+    if backend not in COMMUNITIES_BACKENDS:
+        raise ValueError(f"Unknown communities backend '{backend}', available are: {', '.join(COMMUNITIES_BACKENDS)}")
+
+
+def get_communities(
+    graph: nx.Graph,
+    resolution: float = 1,
+    backend: CommunitiesBackend = "networkx",
+) -> list[frozenset]:
+    """
+    Return communities of the weighted ("weight" attribute) graph sorted by size in descending order.
+
+    Graph with non-positive total weight is returned as a single community as modularity is not defined for it.
+    """
+    _check_backend(backend)
+    if graph.number_of_nodes() == 0:
+        return []
+    if graph.size(weight="weight") <= 0:
+        return [frozenset(graph.nodes)]
+    if backend == "networkx":
+        return [frozenset(com) for com in greedy_modularity_communities(graph, weight="weight", resolution=resolution)]
+    nodes = list(graph.nodes)
+    return get_communities_by_matrix(
+        nodes, nx.to_numpy_array(graph, nodelist=nodes, weight="weight"), resolution, backend
+    )
+
+
+def get_communities_by_matrix(
+    nodes: Sequence[Hashable],
+    matrix: np.ndarray,
+    resolution: float = 1,
+    backend: CommunitiesBackend = "louvain",
+) -> list[frozenset]:
+    """
+    Return communities of the complete graph given by symmetric weighted adjacency matrix with `nodes` labels,
+    sorted by size in descending order.
+    """
+    _check_backend(backend)
+    if len(nodes) != matrix.shape[0] or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError(f"Adjacency matrix of shape {matrix.shape} does not correspond to {len(nodes)} nodes")
+    if backend == "networkx":
+        return get_communities(_complete_graph(nodes, matrix), resolution, backend)
+    return _group_communities(nodes, louvain_labels(matrix, resolution))
+
+
+def get_communities_by_resolutions(
+    nodes: Sequence[Hashable],
+    matrix: np.ndarray,
+    resolutions: Iterable[float],
+    backend: CommunitiesBackend = "louvain",
+) -> dict[float, list[frozenset]]:
+    """
+    Return communities of the complete graph given by symmetric weighted adjacency matrix for each of the given
+    resolutions.
+
+    With "louvain" backend resolutions are processed from the highest to the lowest one, each of them starting
+    from the partition found for the previous resolution. With "networkx" backend graph is built only once, but
+    each resolution is processed from scratch: greedy modularity merges order depends on the resolution, so merge
+    history of one resolution cannot be reused for another.
+    """
+    _check_backend(backend)
+    resolutions = sorted(set(resolutions), reverse=True)
+    if backend == "networkx":
+        graph = _complete_graph(nodes, matrix)
+        return {resolution: get_communities(graph, resolution, backend) for resolution in resolutions}
+    result = {}
+    labels = None
+    for resolution in resolutions:
+        labels = louvain_labels(matrix, resolution, labels)
+        result[resolution] = _group_communities(nodes, labels)
+    return result
+
+
+def louvain_labels(matrix: np.ndarray, resolution: float = 1, initial_labels: np.ndarray | None = None) -> np.ndarray:
+    """
+    Return community label of each node of the weighted graph given by symmetric adjacency matrix.
+
+    Labels are computed with Louvain method: nodes are greedily moved between communities while modularity
+    increases, then communities are aggregated to nodes of a new graph, and the process repeats until no
+    node moves. The result is deterministic as nodes are processed in order.
+
+    If `initial_labels` are given, the first local moving phase starts from this partition instead of singletons.
+    """
+    adjacency = np.asarray(matrix, dtype=float)
+    total_weight = adjacency.sum()
+    if adjacency.shape[0] < 2 or total_weight <= 0:
+        return np.zeros(adjacency.shape[0], dtype=int)
+    labels = np.arange(adjacency.shape[0])
+    level_labels = None if initial_labels is None else np.unique(initial_labels, return_inverse=True)[1]
+    while adjacency.shape[0] > 1:
+        level_labels = _move_nodes(adjacency, resolution, total_weight, level_labels)
+        _, level_labels = np.unique(level_labels, return_inverse=True)
+        if level_labels.max() + 1 == adjacency.shape[0]:
+            break
+        labels = level_labels[labels]
+        adjacency = _aggregate(adjacency, level_labels)
+        level_labels = None
+    return labels
+
+
+def _move_nodes(
+    adjacency: np.ndarray, resolution: float, total_weight: float, labels: np.ndarray | None = None
+) -> np.ndarray:
+    """
+    Perform local moving phase of Louvain method starting from the given labels (singletons by default).
+    """
+    size = adjacency.shape[0]
+    degrees = adjacency.sum(axis=1)
+    links = adjacency.copy()
+    np.fill_diagonal(links, 0)
+    labels = np.arange(size) if labels is None else labels.copy()
+    community_degrees = np.bincount(labels, weights=degrees, minlength=size)
+    community_sizes = np.bincount(labels, minlength=size)
+    for _ in range(_MAX_SWEEPS):
+        improved = False
+        for node in range(size):
+            current = labels[node]
+            community_degrees[current] -= degrees[node]
+            community_sizes[current] -= 1
+            gains = np.bincount(labels, weights=links[node], minlength=size) - (
+                resolution * community_degrees * degrees[node] / total_weight
+            )
+            gains[(community_sizes == 0) & (np.arange(size) != current)] = -np.inf
+            best = int(np.argmax(gains))
+            if gains[best] <= gains[current] + _TOLERANCE:
+                best = current
+            labels[node] = best
+            community_degrees[best] += degrees[node]
+            community_sizes[best] += 1
+            if best != current:
+                improved = True
+        if not improved:
+            break
+    return labels
+
+
+def _aggregate(adjacency: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """
+    Return adjacency matrix of a graph where nodes are communities given by labels (from 0 to n-1 without gaps).
+    """
+    order = np.argsort(labels, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(labels[order]) != 0])
+    rows = np.add.reduceat(adjacency[order], starts, axis=0)
+    return np.add.reduceat(rows[:, order], starts, axis=1)
+
+
+def _group_communities(nodes: Sequence[Hashable], labels: np.ndarray) -> list[frozenset]:
+    """
+    Return communities of nodes given by labels sorted by size in descending order.
+    """
+    communities = [frozenset(nodes[idx] for idx in np.flatnonzero(labels == label)) for label in np.unique(labels)]
+    return sorted(communities, key=len, reverse=True)
+
+
+def _complete_graph(nodes: Sequence[Hashable], matrix: np.ndarray) -> nx.Graph:
+    """
+    Return complete weighted graph given by symmetric adjacency matrix.
+    """
+    graph = nx.Graph()
+    graph.add_nodes_from(nodes)
+    sources, targets = np.triu_indices(len(nodes), k=1)
+    graph.add_weighted_edges_from(
+        (nodes[source], nodes[target], weight)
+        for source, target, weight in zip(sources, targets, matrix[sources, targets].tolist())
+    )
+    return graph
@@ -3,64 +3,109 @@ Get cohabitation graph method is defined here
 """
 from __future__ import annotations
 
-from typing import BinaryIO
+import hashlib
+import itertools as it
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterable
 
 import networkx as nx
 import numpy as np
 import pandas as pd
 
+from derevo.models import GeneraCohabitation, Plant
 
-def get_compatability_graph(
+
+_COHABITATION_VALUES = {"negative": -1, "neutral": 0, "positive": 1}
+_UNKNOWN_COHABITATION_VALUE = 2
+
+
+def _get_genera_matrix(genera: pd.Series, cohabitation_attributes: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return genus codes of the given plants genera and genus x genus cohabitation matrix.
+
+    Matrix contains one additional row and column for plants with unknown genus (code -1), and all of the genera
+    pairs missing in cohabitation attributes have value of 2. Genera pairs are directional as given
+    in `genus_name_1` and `genus_name_2` columns, first occurence of a pair is used.
+    """
+    genus_codes, genera_names = pd.factorize(genera)
+    matrix = np.full((len(genera_names) + 1, len(genera_names) + 1), _UNKNOWN_COHABITATION_VALUE, dtype=np.int8)
+    if cohabitation_attributes.shape[0] == 0:
+        return genus_codes, matrix
+    cohabitation = pd.DataFrame(
+        {
+            "genus_1": genera_names.get_indexer(cohabitation_attributes["genus_name_1"]),
+            "genus_2": genera_names.get_indexer(cohabitation_attributes["genus_name_2"]),
+            "value": pd.to_numeric(
+                cohabitation_attributes["cohabitation_type"].replace(_COHABITATION_VALUES), errors="coerce"
+            ).fillna(_UNKNOWN_COHABITATION_VALUE),
+        }
+    )
+    cohabitation = cohabitation[(cohabitation["genus_1"] != -1) & (cohabitation["genus_2"] != -1)]
+    cohabitation = cohabitation.drop_duplicates(["genus_1", "genus_2"])
+    matrix[cohabitation["genus_1"].to_numpy(), cohabitation["genus_2"].to_numpy()] = cohabitation["value"].to_numpy()
+    return genus_codes, matrix
+
+
+def get_compatability_edges(
     plants: pd.DataFrame,
     cohabitation_attributes: pd.DataFrame,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Return edges of compatability graph as arrays of sources, targets and weights (-1 for negative, 0 for neutral,
+    1 for positive and 2 for unknown cohabitation).
+
+    Sources and targets are positions of plants in `plants` DataFrame, only the upper triangle (source < target)
+    is returned. `plants` must not contain duplicate `name_ru` values.
+    """
+    genus_codes, genera_matrix = _get_genera_matrix(plants["genus"], cohabitation_attributes)
+    sources, targets = np.triu_indices(plants.shape[0], k=1)
+    return sources, targets, genera_matrix[genus_codes[sources], genus_codes[targets]]
+
+
+def _build_compatability_graph(
+    plants: pd.DataFrame, sources: np.ndarray, targets: np.ndarray, weights: np.ndarray
 ) -> nx.Graph:
     """
-    Return compatability graph where weights of edges equals to outcome of species interaction
-    (1 for negative, 2 for neutral, 3 for positive).
-    """
-    plants = plants.copy()
-    cohabitation = cohabitation_attributes.copy()
-    df_comp = plants.copy()
-    df_comp = df_comp.join(df_comp, how="cross", rsuffix="_x")
-    df_comp = df_comp[df_comp["name_ru"] != df_comp["name_ru_x"]]
-    df_comp["genus_con"] = df_comp["genus"] + ":" + df_comp["genus_x"]
-    cohabitation["genus_con"] = cohabitation["genus_name_1"] + ":" + cohabitation["genus_name_2"]
-    df_comp = df_comp.merge(cohabitation[["cohabitation_type", "genus_con"]], on="genus_con", how="left")
-    df_comp = df_comp[~df_comp.filter(like="name_ru").apply(frozenset, axis=1).duplicated()].reset_index(drop=True)
-    df_comp = df_comp.rename(columns={"cohabitation_type": "weight"})
-    df_comp["weight"].fillna(2, inplace=True)
-    # df_comp["weight"].replace({"negative": 1, "neutral": 2, "positive": 3}, inplace=True)
-    df_comp["weight"].replace({"negative": -1, "neutral": 0, "positive": 1}, inplace=True)
-    df_comp = df_comp[["name_ru", "name_ru_x", "weight"]]
-    df_comp["is_compatability"] = 1
-    compatability_graph = nx.from_pandas_edgelist(
-        df_comp,
-        "name_ru",
-        "name_ru_x",
-        "weight",
-        create_using=nx.MultiGraph(),
-        edge_key="is_compatability",
+    Construct compatability graph from plants DataFrame (containing "name_ru", "name_latin", "is_invasive"
+    and "life_form" columns) and edges given by plants positions.
+    """
+    names = plants["name_ru"].to_numpy()
+    weights = weights.astype(float)
+    compatability_graph = nx.MultiGraph()
+    compatability_graph.add_edges_from(
+        zip(names[sources], names[targets], it.repeat(1), ({"weight": weight} for weight in weights.tolist()))
+    )
+    node_weights = (
+        pd.DataFrame({"source": sources, "weight": weights})
+        .drop_duplicates()
+        .sort_values("weight")
+        .groupby("source")["weight"]
+        .agg(lambda values: ", ".join(map(str, values)))
+        .reindex(range(plants.shape[0]), fill_value="")
+    )
+    plant_dict = (
+        plants[["name_latin", "is_invasive", "life_form"]]
+        .assign(weights=node_weights.to_numpy())
+        .set_axis(names, axis=0)
+        .to_dict("index")
     )
-    plant_dict = plants[["name_ru", "name_latin", "is_invasive", "life_form"]].copy()
-    plant_dict["weights"] = [
-        ", ".join(
-            [
-                str(x)
-                for x in list(
-                    np.sort(df_comp[df_comp["name_ru"] == species]["weight"].unique()),
-                )
-            ]
-        )
-        for species in plants["name_ru"]
-    ]
-    plant_dict.index = plant_dict["name_ru"]
-    plant_dict = plant_dict.transpose()
-    plant_dict = plant_dict[plant_dict.index != "name_ru"].to_dict()
     nx.set_node_attributes(compatability_graph, plant_dict)
-
     return compatability_graph
 
 
+def get_compatability_graph(
+    plants: pd.DataFrame,
+    cohabitation_attributes: pd.DataFrame,
+) -> nx.Graph:
+    """
+    Return compatability graph where weights of edges equals to outcome of species interaction
+    (-1 for negative, 0 for neutral, 1 for positive and 2 for unknown).
+    """
+    plants = plants.drop_duplicates("name_ru")
+    sources, targets, weights = get_compatability_edges(plants, cohabitation_attributes)
+    return _build_compatability_graph(plants, sources, targets, weights)
+
+
 def write_compatability_graph_gexf(
     plants: pd.DataFrame,
     cohabitation_attributes: pd.DataFrame,
@@ -96,3 +141,97 @@ def write_compatability_for_species_gexf(
     """
     current_graph = get_compatability_graph(species_list, compatability_graph)
     nx.write_gexf(current_graph, output_path)
+
+
+@dataclass(frozen=True)
+class CompatibilityIndex:  # pylint: disable=too-many-instance-attributes
+    """
+    Compatability data prepared once for the given plants and genera cohabitation attributes.
+
+    Index is keyed by a content hash of plants and cohabitations, so it can be reused between requests
+    while the data stays the same. It stores plants genus codes and a small genus x genus cohabitation matrix,
+    compatability graphs and matrices are built only for the requested species.
+    """
+
+    key: str
+    plants: list[Plant] = field(repr=False)
+    cohabitation_attributes: list[GeneraCohabitation] = field(repr=False)
+    plants_attributes: pd.DataFrame = field(repr=False)
+    genus_codes: np.ndarray = field(repr=False)
+    genera_matrix: np.ndarray = field(repr=False)
+    positions: dict[str, int] = field(repr=False)
+
+    @staticmethod
+    def get_key(plants: list[Plant], cohabitation_attributes: list[GeneraCohabitation]) -> str:
+        """
+        Return content hash of plants and genera cohabitation attributes used to build a graph.
+        """
+        hasher = hashlib.sha256()
+        for plant in plants:
+            hasher.update(
+                repr((plant.name_ru, plant.name_latin, plant.genus, plant.life_form, plant.is_invasive)).encode()
+            )
+        hasher.update(b"|")
+        for cohabitation in cohabitation_attributes:
+            hasher.update(repr((cohabitation.genus_1, cohabitation.genus_2, cohabitation.cohabitation)).encode())
+        return hasher.hexdigest()
+
+    @classmethod
+    def build(cls, plants: list[Plant], cohabitation_attributes: list[GeneraCohabitation]) -> "CompatibilityIndex":
+        """
+        Prepare compatability data for the given plants and genera cohabitation attributes.
+        """
+        plants_attributes = pd.DataFrame(
+            [(p.name_ru, p.name_latin, p.genus, p.is_invasive, p.life_form) for p in plants],
+            columns=["name_ru", "name_latin", "genus", "is_invasive", "life_form"],
+        ).drop_duplicates("name_ru", ignore_index=True)
+        cohabitation_df = pd.DataFrame(
+            [(c.genus_1, c.genus_2, c.cohabitation.to_value()) for c in cohabitation_attributes],
+            columns=["genus_name_1", "genus_name_2", "cohabitation_type"],
+        )
+        genus_codes, genera_matrix = _get_genera_matrix(plants_attributes["genus"], cohabitation_df)
+        return cls(
+            cls.get_key(plants, cohabitation_attributes),
+            plants,
+            cohabitation_attributes,
+            plants_attributes,
+            genus_codes,
+            genera_matrix,
+            {name: idx for idx, name in enumerate(plants_attributes["name_ru"])},
+        )
+
+    def is_built_for(self, plants: list[Plant], cohabitation_attributes: list[GeneraCohabitation]) -> bool:
+        """
+        Check if index was built for the given plants and genera cohabitation attributes.
+        """
+        if plants is self.plants and cohabitation_attributes is self.cohabitation_attributes:
+            return True
+        return self.key == self.get_key(plants, cohabitation_attributes)
+
+    def get_positions(self, species: Iterable[str]) -> np.ndarray:
+        """
+        Return sorted positions of the given species (by `name_ru`) in the index, unknown species are skipped.
+        """
+        return np.array(sorted({self.positions[name] for name in species if name in self.positions}), dtype=int)
+
+    def get_matrix(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Return symmetric compatability matrix (int8, zeros on the diagonal) for the species at given sorted positions.
+        """
+        codes = self.genus_codes[positions]
+        matrix = np.triu(self.genera_matrix[np.ix_(codes, codes)], k=1)
+        return matrix + matrix.T
+
+    def get_subgraph(self, species: Iterable[str]) -> nx.Graph:
+        """
+        Return compatability graph containing only the given species (by `name_ru`).
+        """
+        positions = self.get_positions(species)
+        codes = self.genus_codes[positions]
+        sources, targets = np.triu_indices(len(positions), k=1)
+        return _build_compatability_graph(
+            self.plants_attributes.iloc[positions],
+            sources,
+            targets,
+            self.genera_matrix[codes[sources], codes[targets]],
+        )
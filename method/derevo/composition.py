@@ -11,13 +11,14 @@ import geopandas as gpd
 import networkx as nx
 import pandas as pd
 from loguru import logger
-from networkx.algorithms.community import greedy_modularity_communities
 
 from derevo.adjacency import get_adjacency_graph
-from derevo.compatability import get_compatability_graph
+from derevo.communities import CommunitiesBackend, get_communities, get_communities_by_matrix
+from derevo.compatability import CompatibilityIndex, get_compatability_graph
 from derevo.models import Plant, Territory
 from derevo.models.cohabitation import GeneraCohabitation
-from derevo.models.enumerations import ToleranceType
+from derevo.models.tolerance_matrix import ToleranceMatrix
+from derevo.timing import span
 
 
 def get_compositions(
@@ -25,9 +26,21 @@ def get_compositions(
     territory: Territory,
     cohabitation_attributes: list[GeneraCohabitation],
     plants_present: list[Plant] | None = None,  # FIXME plants_present are definetly not used now
+    tolerance_matrix: ToleranceMatrix | None = None,
+    compatibility_index: CompatibilityIndex | None = None,
+    communities_backend: CommunitiesBackend = "networkx",
 ) -> list[list[Plant]]:
     """
     Return plants composition variants list for the given parameters.
+
+    `tolerance_matrix` can be built once for `plants_available` with `ToleranceMatrix.from_plants` and reused
+    between calls, otherwise it is built on every call. The same goes for `compatibility_index` which can be
+    built with `CompatibilityIndex.build` for `plants_available` and `cohabitation_attributes`.
+
+    `communities_backend` sets the community detection algorithm (see `derevo.communities`). "louvain" backend
+    works on the compatibility index matrix directly without building a graph.
+
+    Durations of the computation stages are recorded with `derevo.timing`.
     """
     logger.debug(
         "Number of light conditions: {}, limitation factors: {}, humidity types: {}, soil types: {}, soil acidity types: {}, soil fertility types: {}, usda_zone: {}",
@@ -43,74 +56,36 @@ def get_compositions(
         logger.trace("None plants present")
         plants_present = []
 
-    local_plants = pd.DataFrame(plants_available)
+    if tolerance_matrix is None:
+        with span("tolerance_matrix"):
+            tolerance_matrix = ToleranceMatrix.from_plants(plants_available)
+    elif not tolerance_matrix.is_built_for(plants_available):
+        raise ValueError("Tolerance matrix is built for another plants")
 
-    if territory.light_types and local_plants.shape[0] != 0:
-        local_plants = local_plants[
-            local_plants["light_preferences"].map(
-                lambda x: len(x) == 0
-                or any(x.get(lt, ToleranceType.NEUTRAL) != ToleranceType.NEGATIVE for lt in territory.light_types)
-            )
-        ]
-    if territory.humidity_types and local_plants.shape[0] != 0:
-        local_plants = local_plants[
-            local_plants["humidity_preferences"].map(
-                lambda x: len(x) == 0
-                or any(x.get(hd, ToleranceType.NEUTRAL) != ToleranceType.NEGATIVE for hd in territory.humidity_types)
-            )
-        ]
-    if territory.soil_types and local_plants.shape[0] != 0:
-        local_plants = local_plants[
-            local_plants["soil_type_preferences"].map(
-                lambda x: len(x) == 0
-                or any(x.get(st, ToleranceType.NEUTRAL) != ToleranceType.NEGATIVE for st in territory.soil_types)
-            )
-        ]
-    if territory.soil_acidity_types and local_plants.shape[0] != 0:
-        local_plants = local_plants[
-            local_plants["soil_acidity_preferences"].map(
-                lambda x: len(x) == 0
-                or any(
-                    x.get(sa, ToleranceType.NEUTRAL) != ToleranceType.NEGATIVE for sa in territory.soil_acidity_types
-                )
-            )
-        ]
-    if territory.soil_fertility_types and local_plants.shape[0] != 0:
-        local_plants = local_plants[
-            local_plants["soil_fertility_preferences"].map(
-                lambda x: len(x) == 0
-                or any(
-                    x.get(sf, ToleranceType.NEUTRAL) != ToleranceType.NEGATIVE for sf in territory.soil_fertility_types
-                )
-            )
-        ]
-    if territory.limitation_factors and local_plants.shape[0] != 0:
-        local_plants = local_plants[
-            local_plants["limitation_factors_resistances"].map(
-                lambda x: len(x) == 0
-                or all(
-                    x.get(factor, ToleranceType.NEUTRAL) != ToleranceType.NEGATIVE
-                    for factor in territory.limitation_factors
-                )
-            )
-        ]
-    if territory.usda_zone and local_plants.shape[0] != 0:
-        local_plants = local_plants[
-            local_plants["usda_zone_preferences"].map(
-                lambda x: len(x) == 0 or x.get(territory.usda_zone, ToleranceType.NEUTRAL) != ToleranceType.NEGATIVE
-            )
-        ]
-    if local_plants.shape[0] == 0:
+    with span("suitability_filtering"):
+        local_plants = [plants_available[idx] for idx in tolerance_matrix.get_suitable_indexes(territory)]
+    if len(local_plants) == 0:
         return [plants_present] if len(plants_present) != 0 else []
 
-    cohabitation_df = pd.DataFrame(
-        [(c.genus_1, c.genus_2, c.cohabitation.to_value()) for c in cohabitation_attributes],
-        columns=["genus_name_1", "genus_name_2", "cohabitation_type"],
-    )
-    if local_plants.shape[0] > 1:
-        compatability_graph: nx.Graph = get_compatability_graph(pd.DataFrame(plants_available), cohabitation_df)
-        comp_graph = compatability_graph.subgraph(local_plants["name_ru"]).copy()
-        communities_list = greedy_modularity_communities(comp_graph, weight="weight")
+    if len(local_plants) > 1:
+        if compatibility_index is None:
+            with span("compatibility_index"):
+                compatibility_index = CompatibilityIndex.build(plants_available, cohabitation_attributes)
+        elif not compatibility_index.is_built_for(plants_available, cohabitation_attributes):
+            raise ValueError("Compatibility index is built for another plants or cohabitation attributes")
+        species = [plant.name_ru for plant in local_plants]
+        if communities_backend == "networkx":
+            with span("graph_building"):
+                subgraph = compatibility_index.get_subgraph(species)
+            with span("community_detection"):
+                communities_list = get_communities(subgraph, backend=communities_backend)
+        else:
+            with span("graph_building"):
+                positions = compatibility_index.get_positions(species)
+                names = compatibility_index.plants_attributes["name_ru"].iloc[positions].tolist()
+                matrix = compatibility_index.get_matrix(positions)
+            with span("community_detection"):
+                communities_list = get_communities_by_matrix(names, matrix, backend=communities_backend)
         logger.debug(
             "Number of communities: {} (sizes: {})",
             len(communities_list),
@@ -118,7 +93,7 @@ def get_compositions(
         )
         compositions = [list(com) for com in communities_list]
     else:
-        compositions = [local_plants.iloc[0]["name_ru"]]
+        compositions = [[local_plants[0].name_ru]]
 
     present_names = {plant.name_ru for plant in plants_present}
     if (len(compositions) == 0 or all(len(composition) == 0 for composition in compositions)) and len(
@@ -126,11 +101,16 @@ def get_compositions(
     ) == 0:
         return []
 
-    compositions = [
-        plants_present
-        + [plant for plant in plants_available if plant.name_ru in composition and plant.name_ru not in present_names]
-        for composition in compositions
-    ]
+    with span("hydration"):
+        compositions = [
+            plants_present
+            + [
+                plant
+                for plant in plants_available
+                if plant.name_ru in composition and plant.name_ru not in present_names
+            ]
+            for composition in compositions
+        ]
     return compositions
 
 
@@ -153,6 +133,7 @@ def get_updated_composition(
     light: gpd.GeoDataFrame,
     species_in_parks: pd.DataFrame,
     greenery_polygon: gpd.GeoDataFrame,
+    communities_backend: CommunitiesBackend = "networkx",
 ) -> list[nx.Graph] | None:
     """
     Return list of graphs with variants of updated plants composition.
@@ -206,7 +187,7 @@ def get_updated_composition(
     compatability_graph: nx.Graph = get_compatability_graph(plants, cohabitation_attributes)
     comp_graph = compatability_graph.copy()
     comp_graph = comp_graph.subgraph(df_comp["name_ru"])
-    communities_list = greedy_modularity_communities(comp_graph, weight="weight")
+    communities_list = get_communities(comp_graph, backend=communities_backend)
     logger.debug("Number of communities: {}", len(communities_list))
 
     compositions = [list(com) for com in communities_list]
@@ -236,6 +217,7 @@ def write_updated_composition_gexf(
     species_in_parks: pd.DataFrame,
     greenery_polygon: gpd.GeoDataFrame,
     output_path_prefix: str | Iterable[BytesIO] | Iterable[str],
+    communities_backend: CommunitiesBackend = "networkx",
 ):
     """
     Write variants of updated plants composition to files with given prefix
@@ -250,6 +232,7 @@ def write_updated_composition_gexf(
         light,
         species_in_parks,
         greenery_polygon,
+        communities_backend,
     )
     if graph_variants is None:
         logger.error("updated composition graph is not exported")
@@ -270,6 +253,7 @@ def get_recommended_composition(
     light: pd.DataFrame,
     cohabitation_attributes: pd.DataFrame,
     greenery_polygon: gpd.GeoDataFrame,
+    communities_backend: CommunitiesBackend = "networkx",
 ) -> list[nx.Graph] | None:
     """
     Return list of graphs with variants of recommended composition with account for outer factors.
@@ -320,7 +304,7 @@ def get_recommended_composition(
     compatability_graph = get_compatability_graph(plants, cohabitation_attributes)
     comp_graph = compatability_graph.copy()
     comp_graph = comp_graph.subgraph(df_comp["name_ru"])
-    communities_list = greedy_modularity_communities(comp_graph, weight="weight")
+    communities_list = get_communities(comp_graph, backend=communities_backend)
     logger.debug("Number of communities: {}", len(communities_list))
 
     compositions = [list(com) for com in communities_list]
@@ -343,6 +327,7 @@ def write_recommended_composition_gexf(
     cohabitation_attributes: pd.DataFrame,
     greenery_polygon: gpd.GeoDataFrame,
     output_path_prefix: str | Iterable[BytesIO] | Iterable[str] = "recommended",
+    communities_backend: CommunitiesBackend = "networkx",
 ) -> None:
     """
     Write list of graphs with variants of recommended composition with account for outer factors
@@ -356,6 +341,7 @@ def write_recommended_composition_gexf(
         light,
         cohabitation_attributes,
         greenery_polygon,
+        communities_backend,
     )
     if graph_variants is None:
         logger.error("recommended composition graph is not exported")
@@ -371,12 +357,13 @@ def write_recommended_composition_gexf(
 def get_composition_unknown(
     plants: pd.DataFrame,
     cohabitation_attributes: pd.DataFrame,
+    communities_backend: CommunitiesBackend = "networkx",
 ) -> list[nx.Graph]:
     """
     Return list of graphs with variants of recommended composition for a place with unknown outer factors.
     """
     compatability_graph = get_compatability_graph(plants, cohabitation_attributes)
-    communities_list = greedy_modularity_communities(compatability_graph, weight="weight")
+    communities_list = get_communities(compatability_graph, backend=communities_backend)
     logger.debug("Number of communities: {}", len(communities_list))
     compositions = [list(com) for com in communities_list]
     graph_variants = []
@@ -393,12 +380,13 @@ def write_composition_unknown_gfsx(
     plants: pd.DataFrame,
     cohabitation_attributes: pd.DataFrame,
     output_path_prefix: str | Iterable[BytesIO] | Iterable[str] = "new_graph",
+    communities_backend: CommunitiesBackend = "networkx",
 ) -> list[nx.Graph]:
     """
     Write graphs with variants of recommended composition for a place with unknown outer factors
     to files with given prefix or names / file-like objects given in iterator.
     """
-    graph_variants = get_composition_unknown(plants, cohabitation_attributes)
+    graph_variants = get_composition_unknown(plants, cohabitation_attributes, communities_backend)
     if isinstance(output_path_prefix, str):
         for graph in graph_variants:
             nx.write_gexf(graph, f"{output_path_prefix}_v_{graph_variants.index(graph)}.gexf")
@@ -0,0 +1,169 @@
+"""
+Compositions cache is defined here.
+
+Many territories differ only in geometry and have the same factors values, so compositions for them are the same.
+`CompositionsCache` keeps the recent `get_compositions` results keyed by the territory factors values, present
+plants and the version of plants and cohabitation data.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+
+from derevo.communities import CommunitiesBackend
+from derevo.compatability import CompatibilityIndex
+from derevo.composition import get_compositions
+from derevo.models import Plant, Territory
+from derevo.models.cohabitation import GeneraCohabitation
+from derevo.models.tolerance_matrix import ToleranceMatrix
+
+
+@dataclass(frozen=True)
+class CompositionsCacheInfo:
+    """
+    Compositions cache statistics.
+    """
+
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+
+
+def get_data_version(plants: list[Plant], cohabitation_attributes: list[GeneraCohabitation]) -> str:
+    """
+    Return content hash of plants (with all of their preferences) and genera cohabitation attributes.
+    """
+    hasher = hashlib.sha256()
+    for plant in plants:
+        hasher.update(repr(plant).encode())
+    hasher.update(b"|")
+    for cohabitation in cohabitation_attributes:
+        hasher.update(repr((cohabitation.genus_1, cohabitation.genus_2, cohabitation.cohabitation)).encode())
+    return hasher.hexdigest()
+
+
+def get_territory_signature(territory: Territory) -> tuple:
+    """
+    Return canonical territory representation - the same for territories with the same factors values regardless
+    of their order and duplicates. Unknown (None) values differ from empty lists.
+    """
+    signature = [territory.usda_zone.name if territory.usda_zone is not None else None]
+    for attribute in (f.name for f in fields(Territory) if f.name != "usda_zone"):
+        values: list | None = getattr(territory, attribute)
+        signature.append(tuple(sorted({value.name for value in values})) if values is not None else None)
+    return tuple(signature)
+
+
+class CompositionsCache:
+    """
+    Least recently used cache of `get_compositions` results bounded by `max_size` entries.
+
+    Cache key consists of the territory signature (see `get_territory_signature`), names of present plants,
+    communities backend and the data version (see `get_data_version`). Data version is computed once for
+    the same plants and cohabitation lists objects, so the lists should not be changed in place - pass new
+    lists or call `clear` instead.
+
+    Methods are thread-safe, computations of missing values are performed outside of the lock.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        if max_size <= 0:
+            raise ValueError(f"Cache size must be positive, got {max_size}")
+        self.max_size = max_size
+        self._values: OrderedDict[str, list[list[Plant]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._data: tuple[list[Plant], list[GeneraCohabitation]] | None = None
+        self._data_version: str | None = None
+
+    def _get_data_version(self, plants: list[Plant], cohabitation_attributes: list[GeneraCohabitation]) -> str:
+        with self._lock:
+            if self._data is not None and self._data[0] is plants and self._data[1] is cohabitation_attributes:
+                return self._data_version
+        data_version = get_data_version(plants, cohabitation_attributes)
+        with self._lock:
+            self._data = (plants, cohabitation_attributes)
+            self._data_version = data_version
+        return data_version
+
+    def get_key(
+        self,
+        plants_available: list[Plant],
+        territory: Territory,
+        cohabitation_attributes: list[GeneraCohabitation],
+        plants_present: list[Plant] | None = None,
+        communities_backend: CommunitiesBackend = "networkx",
+    ) -> str:
+        """
+        Return cache key of the given `get_compositions` parameters.
+        """
+        return hashlib.sha256(
+            repr(
+                (
+                    self._get_data_version(plants_available, cohabitation_attributes),
+                    get_territory_signature(territory),
+                    tuple(sorted({plant.name_ru for plant in plants_present or []})),
+                    communities_backend,
+                )
+            ).encode()
+        ).hexdigest()
+
+    def get_compositions(  # pylint: disable=too-many-arguments
+        self,
+        plants_available: list[Plant],
+        territory: Territory,
+        cohabitation_attributes: list[GeneraCohabitation],
+        plants_present: list[Plant] | None = None,
+        tolerance_matrix: ToleranceMatrix | None = None,
+        compatibility_index: CompatibilityIndex | None = None,
+        communities_backend: CommunitiesBackend = "networkx",
+    ) -> list[list[Plant]]:
+        """
+        Return `get_compositions` result for the given parameters from the cache, or compute and cache it.
+        """
+        key = self.get_key(plants_available, territory, cohabitation_attributes, plants_present, communities_backend)
+        with self._lock:
+            if key in self._values:
+                self._hits += 1
+                self._values.move_to_end(key)
+                return [list(composition) for composition in self._values[key]]
+            self._misses += 1
+
+        compositions = get_compositions(
+            plants_available,
+            territory,
+            cohabitation_attributes,
+            plants_present,
+            tolerance_matrix=tolerance_matrix,
+            compatibility_index=compatibility_index,
+            communities_backend=communities_backend,
+        )
+
+        with self._lock:
+            self._values[key] = [list(composition) for composition in compositions]
+            self._values.move_to_end(key)
+            while len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+        return compositions
+
+    def clear(self) -> None:
+        """
+        Remove all of the cached values, reset statistics and the data version.
+        """
+        with self._lock:
+            self._values.clear()
+            self._hits = 0
+            self._misses = 0
+            self._data = None
+            self._data_version = None
+
+    def info(self) -> CompositionsCacheInfo:
+        """
+        Get cache statistics.
+        """
+        with self._lock:
+            return CompositionsCacheInfo(self._hits, self._misses, len(self._values), self.max_size)
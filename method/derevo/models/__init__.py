@@ -5,4 +5,6 @@ Model classes are defined here.
 from .cohabitation import GeneraCohabitation
 from .global_territory import GlobalTerritory
 from .plants import Compatability, Plant
+from .raster_territory import RasterTerritory
 from .territory import Territory
+from .tolerance_matrix import ToleranceMatrix
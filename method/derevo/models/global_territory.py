@@ -3,12 +3,16 @@ Global territory model class is defined here.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass, fields
+from dataclasses import dataclass, field, fields
 from enum import Enum
-from typing import Iterable, Type
+from typing import Sequence
 
 import geopandas as gpd
+import numpy as np
+import pandas as pd
 from loguru import logger
+from shapely import STRtree
+from shapely.geometry.base import BaseGeometry
 
 from derevo.models.enumerations import (
     AcidityType,
@@ -22,20 +26,29 @@ from derevo.models.enumerations import (
 from derevo.models.territory import Territory
 
 
-def _check_names(
-    gdf: gpd.GeoDataFrame,
-    concrete_enum: Type[LightType]
-    | Type[LimitationFactor]
-    | type[HumidityType]
-    | Type[SoilType]
-    | Type[AcidityType]
-    | Type[FertilityType],
-):
+def _prepare_layer(gdf: gpd.GeoDataFrame, concrete_enum: type[Enum]) -> tuple[gpd.GeoDataFrame, np.ndarray]:
     """
-    Remove rows which name cannot be cast to the given enumeration.
+    Check that GeoDataFrame contains 'name' column, throw ValueError otherwise. Return a copy of it without rows
+    which name cannot be cast to the given enumeration (names are compared case-insensitively with enumeration
+    members names) and with 'name' column converted to categorical of enumeration members.
+
+    Also return codes of the names - positions of enumeration members in the enumeration.
     """
-    enums = {entry.name.lower() for entry in concrete_enum}
-    if any((lf.name.lower() if isinstance(lf, Enum) else lf.lower()) not in enums for lf in gdf["name"].unique()):
+    if "name" not in gdf.columns:
+        raise ValueError(
+            f"{concrete_enum.__name__} GeoDataFrame does not contain 'name' column."
+            f" All columns provided: {', '.join(gdf.columns)}"
+        )
+    members = {entry.name.lower(): code for code, entry in enumerate(concrete_enum)}
+    codes, uniques = pd.factorize(gdf["name"])
+    uniques_codes = np.array(
+        [members.get(value.name.lower() if isinstance(value, Enum) else str(value).lower(), -1) for value in uniques]
+        + [-1],
+        dtype=np.int8,
+    )
+    codes = uniques_codes[codes]
+    known = codes != -1
+    if not known.all():
         logger.warning(
             "Some {} geometries are dropped as their names are not in enum values",
             concrete_enum.__name__,
@@ -45,35 +58,46 @@ def _check_names(
             concrete_enum.__name__,
             gdf.shape[0],
         )
-        gdf.drop(
-            (
-                gdf[~gdf["name"].apply(lambda lf: lf.name.lower() if isinstance(lf, Enum) else lf.lower()).isin(enums)]
-            ).index,
-            inplace=True,
-        )
+        gdf = gdf[known]
+        codes = codes[known]
         logger.debug(
             "Number of {} polygons after removal: {}",
             concrete_enum.__name__,
             gdf.shape[0],
         )
+    return gdf.assign(name=pd.Categorical.from_codes(codes, categories=list(concrete_enum))), codes
 
 
-def _names_to_enum(values: Iterable[str | Enum], concrete_enum: type[Enum]) -> list[Enum]:
+def _codes_to_enum(codes: np.ndarray, concrete_enum: type[Enum]) -> list[Enum]:
     """
-    Construct list of given enum types from their string names.
+    Return unique enumeration members by their codes (positions in the enumeration) in order of the enumeration.
     """
-    return [concrete_enum(v.capitalize()) if isinstance(v, str) else v for v in values]
+    members = list(concrete_enum)
+    return [members[code] for code in np.unique(codes)]
 
 
-def _names_to_unique_enum(values: Iterable[str | Enum], concrete_enum: type[Enum]) -> list[Enum]:
+LAYERS_ENUMS: dict[str, type[Enum]] = {
+    "limitation_factors": LimitationFactor,
+    "light_types": LightType,
+    "humidity_types": HumidityType,
+    "soil_types": SoilType,
+    "soil_acidity_types": AcidityType,
+    "soil_fertility_types": FertilityType,
+}
+
+
+def _build_spatial_index(gdf: gpd.GeoDataFrame) -> STRtree:
     """
-    Construct list of given enum types from their string names.
+    Build spatial index over GeoDataFrame geometries, GeoDataFrame without geometry gets an empty index.
     """
-    return list({concrete_enum(v.capitalize()) if isinstance(v, str) else v for v in values})
+    try:
+        return STRtree(gdf.geometry.values)
+    except AttributeError:
+        return STRtree([])
 
 
 @dataclass
-class GlobalTerritory:
+class GlobalTerritory:  # pylint: disable=too-many-instance-attributes
     """
     Global territory model (for a whole city for example) that contains all of its factors data.
 
@@ -89,6 +113,10 @@ class GlobalTerritory:
     to `AcidityType` enumeration
     - `soil_fertility_types` GeoDataFrame must contain column 'name' with values corresponding
     to `FertilityType` enumeration
+
+    On construction GeoDataFrames are replaced with copies without rows with unknown names and with 'name' columns
+    converted to categorical of enumeration members, and spatial index is built for each of them, so they should not
+    be changed after it. GeoDataFrames given to the constructor are not modified.
     """
 
     usda_zone: UsdaZone | None = None
@@ -98,51 +126,77 @@ class GlobalTerritory:
     soil_types: gpd.GeoDataFrame = ...
     soil_acidity_types: gpd.GeoDataFrame = ...
     soil_fertility_types: gpd.GeoDataFrame = ...
+    _spatial_indexes: dict[str, STRtree] = field(init=False, repr=False, compare=False, default_factory=dict)
+    _names_codes: dict[str, np.ndarray] = field(init=False, repr=False, compare=False, default_factory=dict)
 
     def __post_init__(self):
         """
         Check that each of the DataFrames contains 'name' column. Throw ValueError otherwise.
+        Build spatial index for each of the DataFrames.
         """
-        for attribute in (f.name for f in fields(GlobalTerritory) if f.name != "usda_zone"):
+        for attribute in self.layers():
             attr_value = getattr(self, attribute)
             if attr_value is None or attr_value is ...:
-                setattr(self, attribute, gpd.GeoDataFrame(columns="name"))
-
-        for concrete_enum, gdf in zip(
-            [
-                LimitationFactor,
-                LightType,
-                HumidityType,
-                SoilType,
-                AcidityType,
-                FertilityType,
-            ],
-            [
-                self.limitation_factors,
-                self.light_types,
-                self.humidity_types,
-                self.soil_types,
-                self.soil_acidity_types,
-                self.soil_fertility_types,
-            ],
-        ):
-            if "name" not in gdf.columns:
-                raise ValueError(
-                    f"{concrete_enum.__name__} GeoDataFrame does not contain 'name' column."
-                    f" All columns provided: {', '.join(gdf.columns)}"
-                )
-            _check_names(gdf, concrete_enum)
-
-    def as_territory(self) -> Territory:
+                setattr(self, attribute, gpd.GeoDataFrame(columns=["name", "geometry"], geometry="geometry"))
+
+        for attribute, concrete_enum in LAYERS_ENUMS.items():
+            gdf, self._names_codes[attribute] = _prepare_layer(getattr(self, attribute), concrete_enum)
+            setattr(self, attribute, gdf)
+
+        self._spatial_indexes = {
+            attribute: _build_spatial_index(getattr(self, attribute)) for attribute in self.layers()
+        }
+
+    @staticmethod
+    def layers() -> list[str]:
         """
-        Get global territory information as Territory class.
+        Get names of the GeoDataFrame attributes.
         """
-        return Territory(
-            self.usda_zone,
-            _names_to_unique_enum(self.limitation_factors["name"], LimitationFactor),
-            _names_to_unique_enum(self.light_types["name"], LightType),
-            _names_to_unique_enum(self.humidity_types["name"], HumidityType),
-            _names_to_unique_enum(self.soil_types["name"], SoilType),
-            _names_to_unique_enum(self.soil_acidity_types["name"], AcidityType),
-            _names_to_unique_enum(self.soil_fertility_types["name"], FertilityType),
-        )
+        return [f.name for f in fields(GlobalTerritory) if f.name != "usda_zone" and f.init]
+
+    def get_intersecting(self, layer: str, geometry: BaseGeometry) -> gpd.GeoDataFrame:
+        """
+        Get rows of the given layer which geometry intersects (covers or is covered by) the given geometry.
+
+        Spatial index bounding boxes are used to find candidates, and exact predicate is checked only for them.
+        """
+        gdf: gpd.GeoDataFrame = getattr(self, layer)
+        return gdf.iloc[np.sort(self._spatial_indexes[layer].query(geometry, predicate="intersects"))]
+
+    def as_territory(self, geometry: BaseGeometry | None = None) -> Territory:
+        """
+        Get global territory information as Territory class. If `geometry` is given, only the polygons
+        intersecting it are taken into account.
+        """
+        values = {}
+        for layer, concrete_enum in LAYERS_ENUMS.items():
+            codes = self._names_codes[layer]
+            if geometry is not None:
+                codes = codes[self._spatial_indexes[layer].query(geometry, predicate="intersects")]
+            values[layer] = _codes_to_enum(codes, concrete_enum)
+        return Territory(usda_zone=self.usda_zone, **values)
+
+    def as_territories(self, geometries: Sequence[BaseGeometry] | np.ndarray) -> list[Territory]:
+        """
+        Get territory information for each of the given geometries (in the same order) from the polygons
+        intersecting them. Each layer is queried once for all of the geometries.
+        """
+        geometries = np.asarray(geometries, dtype=object)
+        values: dict[str, list[list[Enum]]] = {}
+        for layer, concrete_enum in LAYERS_ENUMS.items():
+            geometries_idx, rows = self._spatial_indexes[layer].query(geometries, predicate="intersects")
+            pairs = np.unique(geometries_idx * len(concrete_enum) + self._names_codes[layer][rows])
+            members = list(concrete_enum)
+            values[layer] = [[] for _ in range(len(geometries))]
+            for geometry_idx, code in zip(*np.divmod(pairs, len(concrete_enum))):
+                values[layer][geometry_idx].append(members[code])
+        return [
+            Territory(usda_zone=self.usda_zone, **{layer: layer_values[idx] for layer, layer_values in values.items()})
+            for idx in range(len(geometries))
+        ]
+
+    def get_names_codes(self, layer: str) -> np.ndarray:
+        """
+        Get codes of the given layer names - positions of the enumeration members in the enumeration.
+        """
+        return self._names_codes[layer]
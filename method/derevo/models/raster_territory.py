@@ -0,0 +1,209 @@
+"""
+Rasterized global territory model class is defined here.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
+
+from derevo.models.enumerations import UsdaZone
+from derevo.models.global_territory import LAYERS_ENUMS, GlobalTerritory
+from derevo.models.territory import Territory
+
+
+_METADATA_FILENAME = "raster_territory.json"
+
+
+def _get_bitmask_dtype(concrete_enum: type[Enum]) -> np.dtype:
+    """
+    Return the smallest unsigned integer type having a bit for each of the enumeration values.
+    """
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if len(concrete_enum) <= np.iinfo(dtype).bits:
+            return np.dtype(dtype)
+    raise ValueError(f"{concrete_enum.__name__} has too many values to be stored as a bitmask")
+
+
+def _get_layers_bounds(global_territory: GlobalTerritory, cell_size: float) -> tuple[float, float, float, float]:
+    """
+    Return total bounds of all of the global territory layers, or a single cell at the origin if they are empty.
+    """
+    layers_bounds = np.array(
+        [
+            getattr(global_territory, layer).total_bounds
+            for layer in LAYERS_ENUMS
+            if getattr(global_territory, layer).shape[0] != 0
+        ]
+    ).reshape(-1, 4)
+    if layers_bounds.shape[0] == 0:
+        return (0.0, 0.0, cell_size, cell_size)
+    return (*layers_bounds[:, :2].min(axis=0), *layers_bounds[:, 2:].max(axis=0))
+
+
+def _bitmask_to_enum(bitmask: int, concrete_enum: type[Enum]) -> list[Enum]:
+    """
+    Return enumeration values which bits are set in the given bitmask.
+    """
+    return [value for bit, value in enumerate(concrete_enum) if bitmask >> bit & 1]
+
+
+@dataclass(frozen=True)
+class RasterTerritory:
+    """
+    Rasterized global territory: each of the factor layers is stored as a grid of bitmasks with a bit for each
+    of the enumeration values (in order of enumeration definition) set if a polygon with this value touches
+    the cell.
+
+    Cell (row, column) covers [minx + column * cell_size, minx + (column + 1) * cell_size] by x and
+    [miny + row * cell_size, miny + (row + 1) * cell_size] by y. Territory of a geometry is a union of values of
+    all cells it touches, so it can contain extra values of polygons located closer than `cell_size`, but never
+    misses values of intersecting polygons inside the grid bounds.
+
+    It is meant to be built once with `RasterTerritory.from_global_territory`, saved with `save` and loaded in
+    every worker with `load`, which memory-maps layers grids instead of reading them.
+    """
+
+    usda_zone: UsdaZone | None
+    bounds: tuple[float, float, float, float]
+    cell_size: float
+    layers: dict[str, np.ndarray] = field(repr=False)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """
+        Get grid size as (rows, columns).
+        """
+        minx, miny, maxx, maxy = self.bounds
+        rows = max(int(np.ceil((maxy - miny) / self.cell_size)), 1)
+        columns = max(int(np.ceil((maxx - minx) / self.cell_size)), 1)
+        return rows, columns
+
+    @classmethod
+    def from_global_territory(
+        cls,
+        global_territory: GlobalTerritory,
+        cell_size: float,
+        bounds: tuple[float, float, float, float] | None = None,
+    ) -> "RasterTerritory":
+        """
+        Rasterize global territory layers with a given cell size (in units of layers coordinate reference system).
+
+        If `bounds` (minx, miny, maxx, maxy) are not given, total bounds of all of the layers are used.
+        """
+        if cell_size <= 0:
+            raise ValueError(f"Cell size must be positive, got {cell_size}")
+        if bounds is None:
+            bounds = _get_layers_bounds(global_territory, cell_size)
+        raster = cls(
+            global_territory.usda_zone,
+            tuple(float(value) for value in bounds),
+            float(cell_size),
+            {},
+        )
+        for layer, concrete_enum in LAYERS_ENUMS.items():
+            raster.layers[layer] = raster._rasterize_layer(global_territory, layer, concrete_enum)
+        return raster
+
+    def _rasterize_layer(self, global_territory: GlobalTerritory, layer: str, concrete_enum: type[Enum]) -> np.ndarray:
+        """
+        Return grid of bitmasks of the given global territory layer.
+        """
+        grid = np.zeros(self.shape, dtype=_get_bitmask_dtype(concrete_enum))
+        gdf = getattr(global_territory, layer)
+        if gdf.shape[0] == 0:
+            return grid
+        for geometry, code in zip(gdf.geometry, global_territory.get_names_codes(layer).tolist()):
+            if geometry is None or geometry.is_empty:
+                continue
+            rows, columns = self.get_cells(geometry)
+            grid[rows, columns] |= 1 << code
+        return grid
+
+    def _get_cells_ranges(self, geometry: BaseGeometry) -> tuple[int, int, int, int]:
+        """
+        Return inclusive ranges of rows and columns (row_min, row_max, column_min, column_max) of the grid cells
+        touched by the given geometry bounding box. Ranges are empty if it is outside of the grid.
+        """
+        minx, miny, _, _ = self.bounds
+        rows_count, columns_count = self.shape
+        g_minx, g_miny, g_maxx, g_maxy = geometry.bounds
+        return (
+            max(int(np.floor((g_miny - miny) / self.cell_size)), 0),
+            min(int(np.floor((g_maxy - miny) / self.cell_size)), rows_count - 1),
+            max(int(np.floor((g_minx - minx) / self.cell_size)), 0),
+            min(int(np.floor((g_maxx - minx) / self.cell_size)), columns_count - 1),
+        )
+
+    def get_cells(self, geometry: BaseGeometry) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return rows and columns of the grid cells touched by the given geometry.
+        """
+        minx, miny, _, _ = self.bounds
+        row_min, row_max, column_min, column_max = self._get_cells_ranges(geometry)
+        if column_min > column_max or row_min > row_max:
+            return np.array([], dtype=int), np.array([], dtype=int)
+        rows, columns = (values.ravel() for values in np.mgrid[row_min : row_max + 1, column_min : column_max + 1])
+        cells = shapely.box(
+            minx + columns * self.cell_size,
+            miny + rows * self.cell_size,
+            minx + (columns + 1) * self.cell_size,
+            miny + (rows + 1) * self.cell_size,
+        )
+        shapely.prepare(geometry)
+        touched = shapely.intersects(geometry, cells)
+        return rows[touched], columns[touched]
+
+    def get_territory(self, geometry: BaseGeometry) -> Territory:
+        """
+        Get territory information for the given geometry as a union of values of the cells it touches.
+        """
+        rows, columns = self.get_cells(geometry)
+        return Territory(
+            usda_zone=self.usda_zone,
+            **{
+                layer: _bitmask_to_enum(
+                    int(np.bitwise_or.reduce(self.layers[layer][rows, columns])) if rows.shape[0] != 0 else 0,
+                    concrete_enum,
+                )
+                for layer, concrete_enum in LAYERS_ENUMS.items()
+            },
+        )
+
+    def save(self, directory: str | Path) -> None:
+        """
+        Save raster territory to the given directory as a metadata json file and .npy grid file for each layer.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for layer, grid in self.layers.items():
+            np.save(directory / f"{layer}.npy", grid)
+        with (directory / _METADATA_FILENAME).open("w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "usda_zone": self.usda_zone.value if self.usda_zone is not None else None,
+                    "bounds": list(self.bounds),
+                    "cell_size": self.cell_size,
+                },
+                file,
+            )
+
+    @classmethod
+    def load(cls, directory: str | Path, mmap: bool = True) -> "RasterTerritory":
+        """
+        Load raster territory saved with `save` method. If `mmap` is set, grids are memory-mapped read-only.
+        """
+        directory = Path(directory)
+        with (directory / _METADATA_FILENAME).open("r", encoding="utf-8") as file:
+            metadata = json.load(file)
+        return cls(
+            UsdaZone(metadata["usda_zone"]) if metadata["usda_zone"] is not None else None,
+            tuple(metadata["bounds"]),
+            metadata["cell_size"],
+            {layer: np.load(directory / f"{layer}.npy", mmap_mode="r" if mmap else None) for layer in LAYERS_ENUMS},
+        )
@@ -0,0 +1,151 @@
+"""
+Plants tolerance matrix model class is defined here.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Iterable, Literal, Type
+
+import numpy as np
+
+from derevo.models.enumerations import (
+    AcidityType,
+    FertilityType,
+    HumidityType,
+    LightType,
+    LimitationFactor,
+    SoilType,
+    ToleranceType,
+    UsdaZone,
+)
+from derevo.models.plants import Plant
+from derevo.models.territory import Territory
+
+
+@dataclass(frozen=True)
+class _FactorCategory:
+    """
+    Description of a factor category: which Plant and Territory fields correspond to it and how the
+    territory values are combined ("any" - at least one value must be tolerated, "all" - every one of them).
+    """
+
+    plant_field: str
+    territory_field: str
+    concrete_enum: Type[Enum]
+    mode: Literal["any", "all"]
+
+
+_CATEGORIES: tuple[_FactorCategory, ...] = (
+    _FactorCategory("light_preferences", "light_types", LightType, "any"),
+    _FactorCategory("humidity_preferences", "humidity_types", HumidityType, "any"),
+    _FactorCategory("soil_type_preferences", "soil_types", SoilType, "any"),
+    _FactorCategory("soil_acidity_preferences", "soil_acidity_types", AcidityType, "any"),
+    _FactorCategory("soil_fertility_preferences", "soil_fertility_types", FertilityType, "any"),
+    _FactorCategory("limitation_factors_resistances", "limitation_factors", LimitationFactor, "all"),
+    _FactorCategory("usda_zone_preferences", "usda_zone", UsdaZone, "all"),
+)
+
+_TOLERANCE_VALUES: dict[ToleranceType | None, int] = {
+    ToleranceType.NEGATIVE: -1,
+    ToleranceType.NEUTRAL: 0,
+    ToleranceType.POSITIVE: 1,
+    None: 0,
+}
+
+
+@dataclass(frozen=True)
+class ToleranceMatrix:
+    """
+    Precompiled plants tolerances to the territory factors.
+
+    Matrix contains one int8 column per each enumeration member of `LightType`, `HumidityType`, `SoilType`,
+    `AcidityType`, `FertilityType`, `LimitationFactor` and `UsdaZone`, and one row per each plant.
+    Values are -1 for negative tolerance, 0 for neutral (or unknown) and 1 for positive.
+
+    It is meant to be built once for a list of plants with `ToleranceMatrix.from_plants` and then be used to
+    filter plants suitable for a given territory without touching Python objects. Matrix keeps a content hash
+    of the plants, so it can be checked to match a given plants list with `is_built_for`.
+    """
+
+    plants: list[Plant]
+    values: np.ndarray
+    columns: dict[Enum, int] = field(repr=False)
+    key: str = field(repr=False)
+
+    @staticmethod
+    def get_key(plants: Iterable[Plant]) -> str:
+        """
+        Return content hash of plants names and tolerances used to build a matrix.
+        """
+        hasher = hashlib.sha256()
+        for plant in plants:
+            tolerances = [
+                sorted(
+                    (str(member), str(tolerance)) for member, tolerance in getattr(plant, category.plant_field).items()
+                )
+                for category in _CATEGORIES
+            ]
+            hasher.update(repr((plant.name_ru, tolerances)).encode())
+        return hasher.hexdigest()
+
+    @classmethod
+    def from_plants(cls, plants: Iterable[Plant]) -> "ToleranceMatrix":
+        """
+        Build tolerance matrix from the given plants list.
+        """
+        if not isinstance(plants, list):
+            plants = list(plants)
+        columns = {
+            member: idx
+            for idx, member in enumerate(member for category in _CATEGORIES for member in category.concrete_enum)
+        }
+        values = np.zeros((len(plants), len(columns)), dtype=np.int8)
+        for row, plant in enumerate(plants):
+            for category in _CATEGORIES:
+                for member, tolerance in getattr(plant, category.plant_field).items():
+                    if member in columns:
+                        values[row, columns[member]] = _TOLERANCE_VALUES.get(tolerance, 0)
+        return cls(plants, values, columns, cls.get_key(plants))
+
+    def __len__(self) -> int:
+        return len(self.plants)
+
+    def is_built_for(self, plants: list[Plant]) -> bool:
+        """
+        Check if matrix was built for the given plants list (in the same order).
+        """
+        if plants is self.plants:
+            return True
+        return len(plants) == len(self.plants) and self.key == self.get_key(plants)
+
+    def get_suitable_indexes(self, territory: Territory) -> np.ndarray:
+        """
+        Return indexes of plants which do not have negative tolerance to the territory factors.
+
+        For light, humidity and soil factors a plant must tolerate at least one of the territory values,
+        for limitation factors and USDA zone - all of them. Unknown (None or empty) territory parameters
+        are not taken into account.
+        """
+        mask = np.ones(len(self.plants), dtype=bool)
+        for category in _CATEGORIES:
+            territory_values = getattr(territory, category.territory_field)
+            if not territory_values:
+                continue
+            if not isinstance(territory_values, (list, tuple, set)):
+                territory_values = [territory_values]
+            columns = [self.columns[value] for value in territory_values if value in self.columns]
+            if category.mode == "any":
+                if len(columns) != len(territory_values):
+                    continue  # value missing in enumeration is neutral for every plant
+                mask &= (self.values[:, columns] != -1).any(axis=1)
+            elif len(columns) != 0:
+                mask &= (self.values[:, columns] != -1).all(axis=1)
+        return np.flatnonzero(mask)
+
+    def get_suitable_plants(self, territory: Territory) -> list[Plant]:
+        """
+        Return plants which do not have negative tolerance to the territory factors.
+        """
+        return [self.plants[idx] for idx in self.get_suitable_indexes(territory)]
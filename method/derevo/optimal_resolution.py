@@ -1,19 +1,181 @@
-# pylint: disable=too-many-locals,too-many-statements,too-many-nested-blocks
+# pylint: disable=too-many-locals,too-many-arguments
 """
 Get optimal resolution method is defined here.
 """
 from __future__ import annotations
 
 import itertools as it
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.util import Finalize
 
-import networkx as nx
 import numpy as np
 import pandas as pd
 from loguru import logger
 from matplotlib.axes import Axes
-from networkx.algorithms.community import greedy_modularity_communities
 
-from derevo.compatability import get_compatability_graph
+from derevo.communities import CommunitiesBackend, get_communities_by_resolutions
+from derevo.compatability import get_compatability_edges
+
+
+# The original method counts edges with weight 1 as "negative" ones, while in the compatability matrix encoding
+# 1 is a positive cohabitation (and -1 is a negative one). This legacy metric is kept so the results (including
+# "negative_edges" and "total_edge_number" columns) stay the same as before.
+_LEGACY_NEGATIVE_EDGE_WEIGHT = 1
+
+
+def _count_legacy_negative_edges(matrix: np.ndarray, positions: np.ndarray) -> int:
+    """
+    Return number of edges of `_LEGACY_NEGATIVE_EDGE_WEIGHT` weight (positive cohabitation, counted as "negative"
+    by the original method) between plants at the given positions of compatability matrix.
+    """
+    return int(np.count_nonzero(matrix[np.ix_(positions, positions)] == _LEGACY_NEGATIVE_EDGE_WEIGHT) // 2)
+
+
+def _get_biggest_communities(communities_list: list[frozenset]) -> list[list]:
+    """
+    Return all of the communities of the biggest size.
+    """
+    size_of_biggest_community = max(len(com) for com in communities_list)
+    return [list(com) for com in communities_list if len(com) == size_of_biggest_community]
+
+
+def _get_limitations_species(plants_with_limitations_resistance: pd.DataFrame, lim_subset: tuple[int, ...]) -> set:
+    """
+    Return names of plants which are resistant to the largest number of limitation factors from the given subset.
+    """
+    filtered_plants = plants_with_limitations_resistance[
+        plants_with_limitations_resistance.limitation_factor_id.isin(list(lim_subset))
+    ]
+    counts = filtered_plants.groupby("name_ru")["limitation_factor_id"].count()
+    return set(counts.index[counts == counts.max()])
+
+
+def _sweep_subset(
+    names: np.ndarray,
+    matrix: np.ndarray,
+    positions: np.ndarray,
+    resolutions: list[float],
+    communities_backend: CommunitiesBackend,
+) -> list[list]:
+    """
+    Return result rows (without variant_id) for the plants at given positions for each of the resolutions.
+    """
+    species = names[positions].tolist()
+    default_size_of_community = len(positions)
+    default_number_of_negative_edges = _count_legacy_negative_edges(matrix, positions)
+    communities_by_resolution = get_communities_by_resolutions(
+        species, matrix[np.ix_(positions, positions)], resolutions, communities_backend
+    )
+    species_positions = dict(zip(species, positions))
+    rows = []
+    for res in resolutions:
+        communities_list = communities_by_resolution[res]
+        composition = _get_biggest_communities(communities_list)
+        if len(composition) == default_size_of_community:
+            tagged = [(list(it.chain.from_iterable(composition)), "One node community")]
+        elif len(composition) > 1:
+            tagged = [(comp, "Variable community") for comp in composition]
+        else:
+            tagged = [(list(it.chain.from_iterable(composition)), "Default community")]
+        for comp, tag in tagged:
+            comp_positions = np.array([species_positions[name] for name in comp], dtype=int)
+            rows.append(
+                [
+                    species,
+                    communities_list,
+                    len(comp_positions),
+                    _count_legacy_negative_edges(matrix, comp_positions),
+                    res,
+                    default_size_of_community,
+                    default_number_of_negative_edges,
+                    tag,
+                ]
+            )
+    return rows
+
+
+_worker_shared_memory: SharedMemory | None = None  # pylint: disable=invalid-name
+_worker_matrix: np.ndarray | None = None  # pylint: disable=invalid-name
+_worker_names: np.ndarray | None = None  # pylint: disable=invalid-name
+
+
+def _attach_shared_memory(name: str) -> SharedMemory:
+    """
+    Attach to the shared memory block owned (and unlinked) by the parent process.
+
+    Since Python 3.13 the block is not registered in the resource tracker. On earlier versions the registration
+    is left as is: pool workers share the resource tracker of the parent process, so it is a duplicate
+    of the parent registration, and unregistering it would remove the parent one before the block is unlinked.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)  # pylint: disable=unexpected-keyword-arg
+    return SharedMemory(name=name)
+
+
+def _close_sweep_worker() -> None:
+    """
+    Release compatability matrix and close shared memory attachment of a worker process.
+    """
+    global _worker_shared_memory, _worker_matrix  # pylint: disable=global-statement
+    _worker_matrix = None
+    if _worker_shared_memory is not None:
+        _worker_shared_memory.close()
+        _worker_shared_memory = None
+
+
+def _init_sweep_worker(shared_memory_name: str, shape: tuple[int, int], dtype: str, names: np.ndarray) -> None:
+    """
+    Attach compatability matrix from the shared memory in a worker process, the attachment is closed on the
+    worker exit.
+    """
+    global _worker_shared_memory, _worker_matrix, _worker_names  # pylint: disable=global-statement
+    _worker_shared_memory = _attach_shared_memory(shared_memory_name)
+    _worker_matrix = np.ndarray(shape, dtype=dtype, buffer=_worker_shared_memory.buf)
+    _worker_names = names
+    Finalize(None, _close_sweep_worker, exitpriority=0)
+
+
+def _sweep_subset_in_worker(
+    positions: np.ndarray, resolutions: list[float], communities_backend: CommunitiesBackend
+) -> list[list]:
+    """
+    Return result rows for the plants at given positions using the compatability matrix attached in a worker.
+    """
+    return _sweep_subset(_worker_names, _worker_matrix, positions, resolutions, communities_backend)
+
+
+def _sweep_subsets_parallel(
+    names: np.ndarray,
+    matrix: np.ndarray,
+    subsets: dict[bytes, np.ndarray],
+    resolutions: list[float],
+    communities_backend: CommunitiesBackend,
+    n_jobs: int,
+) -> dict[bytes, list[list]]:
+    """
+    Return result rows for each of the species sets computed in a pool of `n_jobs` processes.
+    """
+    shared_memory = SharedMemory(create=True, size=max(matrix.nbytes, 1))
+    try:
+        np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=shared_memory.buf)[:] = matrix
+        with ProcessPoolExecutor(
+            min(n_jobs, len(subsets)),
+            initializer=_init_sweep_worker,
+            initargs=(shared_memory.name, matrix.shape, matrix.dtype.str, names),
+        ) as executor:
+            rows = executor.map(
+                _sweep_subset_in_worker,
+                subsets.values(),
+                it.repeat(resolutions),
+                it.repeat(communities_backend),
+            )
+            return dict(zip(subsets.keys(), rows))
+    finally:
+        shared_memory.close()
+        shared_memory.unlink()
 
 
 def get_best_resolution(
@@ -22,115 +184,72 @@ def get_best_resolution(
     plants_suitable_for_light: pd.DataFrame,
     cohabitation_attributes: pd.DataFrame,
     graph_axes: Axes | None = None,
+    communities_backend: CommunitiesBackend = "networkx",
+    n_jobs: int | None = None,
 ) -> pd.DataFrame:
     """
     Return dataframe with calculated best resolutions for current collection of species
     and limitation factors / light variants.
 
-    If `graph_axes` is given, scatter plot will be drawn on it.
+    Compatability matrix is computed once, and every distinct set of species obtained from light and limitation
+    factors variants is processed once for all of the resolutions. Variants with no suitable species are skipped.
+    Note that "negative_edges" and "total_edge_number" count edges of positive cohabitation, as the original
+    method did.
+
+    If `graph_axes` is given, scatter plot will be drawn on it. `communities_backend` sets the community
+    detection algorithm (see `derevo.communities`).
+
+    If `n_jobs` is greater than 1 (or negative to use all of the processors), species sets are processed
+    in a pool of `n_jobs` processes which get the compatability matrix once through shared memory.
+    The result does not depend on `n_jobs` value.
     """
-    plants = plants.copy()
-    plants_with_lim_resist = plants_with_limitations_resistance.copy()
-    plants_with_lig_resist = plants_suitable_for_light.copy()
-    compatability_graph = get_compatability_graph(plants, cohabitation_attributes)
+    plants = plants.drop_duplicates("name_ru")
+    names = plants["name_ru"].to_numpy()
+    sources, targets, weights = get_compatability_edges(plants, cohabitation_attributes)
+    matrix = np.zeros((len(names), len(names)), dtype=np.int8)
+    matrix[sources, targets] = weights
+    matrix[targets, sources] = weights
     lig_list = [1, 2, 3]
     lim_list = [1, 2, 3, 4, 5, 6]
 
     res_list = [x / 10 for x in range(0, 21, 1)]
-    result: list[list] = []
-    for lig in range(len(lig_list) + 1):
+    lim_subsets = [lim_subset for lim in range(len(lim_list) + 1) for lim_subset in it.combinations(lim_list, lim)]
+    limitations_masks = [
+        plants["name_ru"].isin(_get_limitations_species(plants_with_limitations_resistance, lim_subset)).to_numpy()
+        if len(lim_subset) > 0
+        else np.ones(len(names), dtype=bool)
+        for lim_subset in lim_subsets
+    ]
+    variants: list[tuple[str, bytes]] = []
+    subsets: dict[bytes, np.ndarray] = {}
+    for lig in range(1, len(lig_list) + 1):
         for lig_subset in it.combinations(lig_list, lig):
-            if len(list(lig_subset)) == 0:
-                continue
-            filtered_plants = plants_with_lig_resist[plants_with_lig_resist.light_type_id.isin(list(lig_subset))]
-            light_comp = list(pd.unique(filtered_plants["name_ru"]))
-            for lim in range(len(lim_list) + 1):
-                for lim_subset in it.combinations(lim_list, lim):
-                    filtered_plants = plants_with_lim_resist[
-                        plants_with_lim_resist.limitation_factor_id.isin(list(lim_subset))
-                    ]
-                    limitations_comp = filtered_plants.groupby("name_ru").count().reset_index()
-                    limitations_comp = limitations_comp[
-                        limitations_comp.limitation_factor_id == limitations_comp.limitation_factor_id.max()
-                    ]
-                    limitations_comp = list(pd.unique(limitations_comp["name_ru"]))
-
-                    # filtering species by environmental factors
-                    df_comp = plants[plants["name_ru"].isin(light_comp)]
-                    if len(lim_subset) > 0:
-                        df_comp = df_comp[df_comp["name_ru"].isin(limitations_comp)]
-
-                    comp_graph = compatability_graph.copy()
-                    comp_graph = comp_graph.subgraph(df_comp["name_ru"])
-                    default_size_of_community = comp_graph.number_of_nodes()
-                    default_number_of_negative_edges = len(nx.to_pandas_edgelist(comp_graph).query("weight == 1"))
-                    for res in res_list:
-                        communities_list = greedy_modularity_communities(comp_graph, weight="weight", resolution=res)
-                        size_of_biggest_community = max(len(com) for com in communities_list)
-                        composition = [list(com) for com in communities_list if len(com) == size_of_biggest_community]
-                        if len(composition) == default_size_of_community:
-                            c_graph = comp_graph.subgraph(list(it.chain.from_iterable(composition)))
-                            number_of_remaining_nodes = c_graph.number_of_nodes()
-                            number_of_negative_edges = len(nx.to_pandas_edgelist(c_graph).query("weight == 1"))
-                            tag = "One node community"
-                            result.append(
-                                [
-                                    ", ".join(map(str, list(lig_subset)))
-                                    + "; "
-                                    + ", ".join(map(str, list(lim_subset))),
-                                    list(pd.unique(df_comp["name_ru"])),
-                                    communities_list,
-                                    number_of_remaining_nodes,
-                                    number_of_negative_edges,
-                                    res,
-                                    default_size_of_community,
-                                    default_number_of_negative_edges,
-                                    tag,
-                                ]
-                            )
-                        elif len(composition) > 1:
-                            for comp in composition:
-                                c_graph = comp_graph.subgraph(comp)
-                                number_of_remaining_nodes = c_graph.number_of_nodes()
-                                number_of_negative_edges = len(nx.to_pandas_edgelist(c_graph).query("weight == 1"))
-                                tag = "Variable community"
-                                result.append(
-                                    [
-                                        ", ".join(map(str, list(lig_subset)))
-                                        + "; "
-                                        + ", ".join(map(str, list(lim_subset))),
-                                        list(pd.unique(df_comp["name_ru"])),
-                                        communities_list,
-                                        number_of_remaining_nodes,
-                                        number_of_negative_edges,
-                                        res,
-                                        default_size_of_community,
-                                        default_number_of_negative_edges,
-                                        tag,
-                                    ]
-                                )
-                        else:
-                            c_graph = comp_graph.subgraph(list(it.chain.from_iterable(composition)))
-                            number_of_remaining_nodes = c_graph.number_of_nodes()
-                            number_of_negative_edges = len(nx.to_pandas_edgelist(c_graph).query("weight == 1"))
-                            tag = "Default community"
-                            result.append(
-                                [
-                                    ", ".join(map(str, list(lig_subset)))
-                                    + "; "
-                                    + ", ".join(map(str, list(lim_subset))),
-                                    list(pd.unique(df_comp["name_ru"])),
-                                    communities_list,
-                                    number_of_remaining_nodes,
-                                    number_of_negative_edges,
-                                    res,
-                                    default_size_of_community,
-                                    default_number_of_negative_edges,
-                                    tag,
-                                ]
-                            )
-                    logger.debug("lim_subset done: {}", list(lim_subset))
-            logger.debug("lig_subset done: {}", list(lig_subset))
+            light_mask = (
+                plants["name_ru"]
+                .isin(
+                    plants_suitable_for_light.loc[plants_suitable_for_light.light_type_id.isin(lig_subset), "name_ru"]
+                )
+                .to_numpy()
+            )
+            for lim_subset, limitations_mask in zip(lim_subsets, limitations_masks):
+                positions = np.flatnonzero(light_mask & limitations_mask)
+                if len(positions) == 0:
+                    continue
+                key = positions.tobytes()
+                subsets.setdefault(key, positions)
+                variants.append((", ".join(map(str, lig_subset)) + "; " + ", ".join(map(str, lim_subset)), key))
+    logger.debug("Variants: {}, distinct species sets: {}", len(variants), len(subsets))
+
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs is None or n_jobs <= 1 or len(subsets) <= 1:
+        subsets_rows = {
+            key: _sweep_subset(names, matrix, positions, res_list, communities_backend)
+            for key, positions in subsets.items()
+        }
+    else:
+        subsets_rows = _sweep_subsets_parallel(names, matrix, subsets, res_list, communities_backend, n_jobs)
+    result = [[variant_id, *row] for variant_id, key in variants for row in subsets_rows[key]]
     df_result = pd.DataFrame(
         result,
         columns=[
@@ -149,9 +268,8 @@ def get_best_resolution(
     df_result["share_of_negative_edges"] = df_result["negative_edges"] / df_result["total_edge_number"]
     df_result["composition_improvement"] = df_result["share_of_nodes"] - df_result["share_of_negative_edges"]
     df_result["communities"] = df_result.communities_list.map(
-        lambda x: [list(com) for com in x if len(com) == max(len(com) for com in x)]
+        lambda x: list(it.chain.from_iterable(_get_biggest_communities(x)))
     )
-    df_result["communities"] = df_result.communities.map(lambda x: list(it.chain.from_iterable(x)))
     df_result["size"] = df_result.communities.map(len)
 
     if graph_axes is not None:
@@ -3,17 +3,13 @@ Territory-related methods are defined here.
 """
 from __future__ import annotations
 
+from typing import Sequence
+
 import geopandas as gpd
 from shapely.geometry.base import BaseGeometry
 
-from derevo.models import GlobalTerritory, Territory
-
-
-def _geom_func(gdf: gpd.GeoDataFrame, geom: BaseGeometry) -> gpd.GeoDataFrame:
-    """
-    Return rows of GeoDataFrame which geometry is covered by, covers or intersect the given geometry.
-    """
-    return gdf[gdf.covered_by(geom) | gdf.covers(geom) | gdf.intersects(geom)]
+from derevo.models import GlobalTerritory, RasterTerritory, Territory
+from derevo.timing import span
 
 
 def get_territory(
@@ -27,17 +23,44 @@ def get_territory(
     if territory_data is None:
         territory_data = Territory()
 
-    local_territory = GlobalTerritory(
-        global_territory.usda_zone,
-        _geom_func(global_territory.limitation_factors, greenery_polygon),
-        _geom_func(global_territory.light_types, greenery_polygon),
-        _geom_func(global_territory.humidity_types, greenery_polygon),
-        _geom_func(global_territory.soil_types, greenery_polygon),
-        _geom_func(global_territory.soil_acidity_types, greenery_polygon),
-        _geom_func(global_territory.soil_fertility_types, greenery_polygon),
-    )
-
-    territory = local_territory.as_territory()
+    with span("territory_lookup"):
+        territory = global_territory.as_territory(greenery_polygon)
     territory.update(territory_data)
 
     return territory
+
+
+def get_territories(
+    polygons: gpd.GeoSeries,
+    global_territory: GlobalTerritory,
+    territories_data: Sequence[Territory | None] | None = None,
+) -> list[Territory]:
+    """
+    Get territories information for each of the polygons (in the same order) as `get_territory` would do,
+    but with one spatial index query per factor layer for all of the polygons.
+    """
+    if territories_data is not None and len(territories_data) != len(polygons):
+        raise ValueError(f"Territories data is given for {len(territories_data)} of {len(polygons)} polygons")
+    with span("territory_lookup"):
+        territories = global_territory.as_territories(polygons.values)
+    for idx, territory in enumerate(territories):
+        territory_data = territories_data[idx] if territories_data is not None else None
+        territory.update(territory_data if territory_data is not None else Territory())
+    return territories
+
+
+def get_territory_raster(
+    greenery_polygon: BaseGeometry,
+    raster_territory: RasterTerritory,
+    territory_data: Territory | None = None,
+) -> Territory:
+    """
+    Get territory information based on its geometry, used-defined known data and rasterized factors grids.
+
+    Unlike `get_territory`, the result can contain values of factors polygons located closer than raster cell size
+    to the given polygon.
+    """
+    with span("territory_lookup"):
+        territory = raster_territory.get_territory(greenery_polygon)
+    territory.update(territory_data if territory_data is not None else Territory())
+    return territory
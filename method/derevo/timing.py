@@ -0,0 +1,84 @@
+"""
+Lightweight stage timing is defined here.
+
+Durations of the named stages are recorded with `span` context manager into the timer activated with
+`collect_timings` in the current context (thread or asyncio task). When no timer is active, spans only cost
+a context variable lookup, so the library functions are instrumented unconditionally.
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+
+class StageTimer:
+    """
+    Durations of the named stages in seconds in order of their first appearance. Durations of the stages with
+    the same name are summed up.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, float] = {}
+
+    def add(self, stage: str, duration: float) -> None:
+        """
+        Add duration (in seconds) to the given stage.
+        """
+        self.stages[stage] = self.stages.get(stage, 0.0) + duration
+
+    def update(self, stages: dict[str, float]) -> None:
+        """
+        Add durations of the given stages, i.e. collected in another thread or process.
+        """
+        for stage, duration in stages.items():
+            self.add(stage, duration)
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """
+        Measure duration of the code block as the given stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+
+_current_timer: ContextVar[StageTimer | None] = ContextVar("derevo_stage_timer", default=None)
+
+
+def get_current_timer() -> StageTimer | None:
+    """
+    Return timer active in the current context, if any.
+    """
+    return _current_timer.get()
+
+
+@contextmanager
+def collect_timings(timer: StageTimer | None = None) -> Iterator[StageTimer]:
+    """
+    Activate the given (or a new) timer in the current context for the duration of the block.
+    """
+    timer = timer if timer is not None else StageTimer()
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    Measure duration of the code block as the given stage of the current timer. Does nothing if there is no
+    active timer.
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.span(stage):
+        yield
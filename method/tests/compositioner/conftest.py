@@ -0,0 +1,53 @@
+"""Fixtures shared by the compositioner tests"""
+
+import random
+from enum import Enum
+from typing import Callable
+
+import geopandas as gpd
+import pytest
+from shapely.geometry import box
+
+from derevo import Plant
+from derevo import enumerations as d_enum
+from derevo.models.cohabitation import CohabitationType, GeneraCohabitation
+
+
+@pytest.fixture
+def plants() -> list[Plant]:
+    """List of plants of three genera."""
+    return [
+        Plant(
+            name_ru=f"{genus} {i}",
+            name_latin=f"{genus} {i}",
+            genus=genus,
+            light_preferences={d_enum.LightType.LIGHT: d_enum.ToleranceType.POSITIVE},
+            usda_zone_preferences={d_enum.UsdaZone.USDA5: d_enum.ToleranceType.POSITIVE},
+        )
+        for genus in ("Дуб", "Калина", "Яблоня")
+        for i in range(4)
+    ]
+
+
+@pytest.fixture
+def cohabitation_attributes() -> list[GeneraCohabitation]:
+    """Cohabitation attributes for oak, apple tree and kalina"""
+    return [
+        GeneraCohabitation("Дуб", "Калина", CohabitationType.NEGATIVE),
+        GeneraCohabitation("Яблоня", "Дуб", CohabitationType.POSITIVE),
+        GeneraCohabitation("Яблоня", "Калина", CohabitationType.NEGATIVE),
+    ]
+
+
+@pytest.fixture
+def random_layer() -> Callable[[type[Enum], int, random.Random], gpd.GeoDataFrame]:
+    """Function to generate a layer of random boxes with random names of the given enumeration."""
+
+    def generate(concrete_enum: type[Enum], count: int, rnd: random.Random) -> gpd.GeoDataFrame:
+        boxes = []
+        for _ in range(count):
+            x, y = rnd.uniform(0, 100), rnd.uniform(0, 100)
+            boxes.append(box(x, y, x + rnd.uniform(0.1, 10), y + rnd.uniform(0.1, 10)))
+        return gpd.GeoDataFrame({"name": [rnd.choice(list(concrete_enum)) for _ in range(count)]}, geometry=boxes)
+
+    return generate
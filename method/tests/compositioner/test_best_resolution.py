@@ -0,0 +1,129 @@
+"""Resolution sweep should give the same results for variants with the same species"""
+
+import networkx as nx
+import pandas as pd
+import pytest
+
+from derevo.communities import COMMUNITIES_BACKENDS
+from derevo.compatability import get_compatability_graph
+from derevo.optimal_resolution import get_best_resolution
+
+
+@pytest.fixture(name="plants_df")
+def fixture_plants_df() -> pd.DataFrame:
+    """Plants of three genera."""
+    return pd.DataFrame(
+        [
+            (f"{genus} {i}", f"{genus} {i}", genus, False, "Дерево")
+            for genus in ("Дуб", "Калина", "Яблоня")
+            for i in range(3)
+        ],
+        columns=["name_ru", "name_latin", "genus", "is_invasive", "life_form"],
+    )
+
+
+@pytest.fixture(name="cohabitation_df")
+def fixture_cohabitation_df() -> pd.DataFrame:
+    """Cohabitation attributes for oak, apple tree and kalina"""
+    return pd.DataFrame(
+        [("Дуб", "Калина", "negative"), ("Дуб", "Яблоня", "positive"), ("Калина", "Яблоня", "neutral")],
+        columns=["genus_name_1", "genus_name_2", "cohabitation_type"],
+    )
+
+
+@pytest.fixture(name="limitations_df")
+def fixture_limitations_df(plants_df: pd.DataFrame) -> pd.DataFrame:
+    """Limitation factors resistances differing between plants."""
+    return pd.DataFrame(
+        [
+            (name, factor)
+            for i, name in enumerate(plants_df["name_ru"])
+            for factor in range(1, 7)
+            if (i + factor) % 3 != 0
+        ],
+        columns=["name_ru", "limitation_factor_id"],
+    )
+
+
+@pytest.fixture(name="light_df")
+def fixture_light_df(plants_df: pd.DataFrame) -> pd.DataFrame:
+    """Light types preferences differing between plants."""
+    return pd.DataFrame(
+        [
+            (name, light_type)
+            for i, name in enumerate(plants_df["name_ru"])
+            for light_type in range(1, 4)
+            if i % 4 != light_type
+        ],
+        columns=["name_ru", "light_type_id"],
+    )
+
+
+def test_best_resolution(plants_df: pd.DataFrame, cohabitation_df: pd.DataFrame):
+    """Test that sweep results depend only on species sets and negative edges are counted as in a graph."""
+    limitations = pd.DataFrame(
+        [(name, factor) for name in plants_df["name_ru"] for factor in range(1, 7)],
+        columns=["name_ru", "limitation_factor_id"],
+    )
+    light = pd.DataFrame(
+        [(name, light_type) for name in plants_df["name_ru"] for light_type in range(1, 4)],
+        columns=["name_ru", "light_type_id"],
+    )
+    graph = get_compatability_graph(plants_df, cohabitation_df)
+    negative_edges = len(nx.to_pandas_edgelist(graph).query("weight == 1"))
+
+    for backend in COMMUNITIES_BACKENDS:
+        df_result = get_best_resolution(plants_df, limitations, light, cohabitation_df, communities_backend=backend)
+
+        assert set(df_result["total_size"]) == {plants_df.shape[0]}
+        assert set(df_result["total_edge_number"]) == {negative_edges}
+        variants = [group.drop(columns="variant_id") for _, group in df_result.groupby("variant_id", sort=False)]
+        assert len(variants) == 7 * 64
+        assert all(
+            variant.astype(str).values.tolist() == variants[0].astype(str).values.tolist() for variant in variants
+        )
+
+
+def test_best_resolution_variants(
+    plants_df: pd.DataFrame, cohabitation_df: pd.DataFrame, limitations_df: pd.DataFrame, light_df: pd.DataFrame
+):
+    """Test that each variant gets its own species set and edges counted in the subgraph of its species."""
+    graph = get_compatability_graph(plants_df, cohabitation_df)
+
+    df_result = get_best_resolution(plants_df, limitations_df, light_df, cohabitation_df, communities_backend="louvain")
+
+    species_by_variant = df_result.groupby("variant_id", sort=False)["precomposition"].first()
+    assert len({tuple(species) for species in species_by_variant}) > 1
+    for variant_id, species in species_by_variant.items():
+        light_types, limitation_factors = (
+            [int(value) for value in part.split(", ") if value != ""] for part in variant_id.split("; ")
+        )
+        expected = set(light_df.loc[light_df["light_type_id"].isin(light_types), "name_ru"])
+        if len(limitation_factors) > 0:
+            counts = (
+                limitations_df[limitations_df["limitation_factor_id"].isin(limitation_factors)]
+                .groupby("name_ru")
+                .size()
+            )
+            expected &= set(counts.index[counts == counts.max()])
+        assert set(species) == expected
+        variant = df_result[df_result["variant_id"] == variant_id]
+        assert set(variant["total_size"]) == {len(expected)}
+        assert set(variant["total_edge_number"]) == {
+            len(nx.to_pandas_edgelist(graph.subgraph(expected)).query("weight == 1"))
+        }
+
+
+def test_best_resolution_parallel(
+    plants_df: pd.DataFrame, cohabitation_df: pd.DataFrame, limitations_df: pd.DataFrame, light_df: pd.DataFrame
+):
+    """Test that sweep in a process pool gives the same result as a sequential one."""
+    expected = get_best_resolution(plants_df, limitations_df, light_df, cohabitation_df, communities_backend="louvain")
+    df_result = get_best_resolution(
+        plants_df, limitations_df, light_df, cohabitation_df, communities_backend="louvain", n_jobs=2
+    )
+
+    columns = [column for column in expected.columns if column not in ("communities_list", "communities")]
+    assert df_result[columns].astype(str).values.tolist() == expected[columns].astype(str).values.tolist()
+    assert df_result["communities_list"].tolist() == expected["communities_list"].tolist()
+    assert df_result["communities"].map(set).tolist() == expected["communities"].map(set).tolist()
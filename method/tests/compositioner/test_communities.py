@@ -0,0 +1,41 @@
+"""Communities backends should split negatively cohabiting plants to different compositions"""
+
+import numpy as np
+import pytest
+
+from derevo import Plant, Territory
+from derevo import enumerations as d_enum
+from derevo import get_compositions
+from derevo.communities import COMMUNITIES_BACKENDS, get_communities_by_matrix, louvain_labels
+from derevo.models.cohabitation import GeneraCohabitation
+
+
+def test_backends_compositions(plants: list[Plant], cohabitation_attributes: list[GeneraCohabitation]):
+    """Test that both backends separate negatively cohabiting genera."""
+    territory = Territory(usda_zone=d_enum.UsdaZone.USDA5, light_types=[d_enum.LightType.LIGHT])
+
+    for backend in COMMUNITIES_BACKENDS:
+        compositions = get_compositions(plants, territory, cohabitation_attributes, communities_backend=backend)
+
+        assert len(compositions) > 1, "There must be at least 2 compositions"
+        assert sum(map(len, compositions)) == len(plants)
+        assert not any({"Дуб", "Калина"} <= {plant.genus for plant in composition} for composition in compositions)
+
+
+def test_louvain_blocks():
+    """Test that Louvain method finds dense blocks of a graph and is deterministic."""
+    blocks = np.repeat(np.arange(4), 5)
+    matrix = np.where(blocks[:, None] == blocks[None, :], 2.0, 0.1)
+    np.fill_diagonal(matrix, 0)
+
+    labels = louvain_labels(matrix)
+
+    assert all(len(set(labels[blocks == block])) == 1 for block in range(4))
+    assert len(set(labels)) == 4
+    assert list(louvain_labels(matrix)) == list(labels)
+
+
+def test_unknown_backend():
+    """Test that unknown backend name is not accepted."""
+    with pytest.raises(ValueError):
+        get_communities_by_matrix(["a", "b"], np.ones((2, 2)), backend="unknown")
@@ -0,0 +1,45 @@
+"""Prebuilt compatibility index should give the same compositions as a graph built on each call"""
+
+import pytest
+
+from derevo import CompatibilityIndex, Plant, Territory
+from derevo import enumerations as d_enum
+from derevo import get_compositions
+from derevo.models.cohabitation import GeneraCohabitation
+
+
+def test_index_reuse(plants: list[Plant], cohabitation_attributes: list[GeneraCohabitation]):
+    """Test that compositions are the same with and without prebuilt index."""
+    index = CompatibilityIndex.build(plants, cohabitation_attributes)
+    territory = Territory(usda_zone=d_enum.UsdaZone.USDA5, light_types=[d_enum.LightType.LIGHT])
+
+    expected = get_compositions(plants, territory, cohabitation_attributes)
+    for _ in range(2):
+        assert get_compositions(plants, territory, cohabitation_attributes, compatibility_index=index) == expected
+
+
+def test_index_key(plants: list[Plant], cohabitation_attributes: list[GeneraCohabitation]):
+    """Test that index key depends on plants and cohabitations content."""
+    index = CompatibilityIndex.build(plants, cohabitation_attributes)
+
+    assert index.is_built_for(list(plants), list(cohabitation_attributes))
+    assert not index.is_built_for(plants[1:], cohabitation_attributes)
+    assert not index.is_built_for(plants, cohabitation_attributes[1:])
+    with pytest.raises(ValueError):
+        get_compositions(plants[1:], Territory(), cohabitation_attributes, compatibility_index=index)
+
+
+def test_index_matrix(plants: list[Plant], cohabitation_attributes: list[GeneraCohabitation]):
+    """Test that compatibility matrix and subgraph weights are set by genera cohabitation."""
+    index = CompatibilityIndex.build(plants, cohabitation_attributes)
+    names = [plant.name_ru for plant in plants]
+    genera = {plant.name_ru: plant.genus for plant in plants}
+    graph = index.get_subgraph(names)
+    matrix = index.get_matrix(index.get_positions(names))
+
+    cohabitations = {(c.genus_1, c.genus_2): c.cohabitation.to_value() for c in cohabitation_attributes}
+    for i, name_1 in enumerate(names):
+        for j, name_2 in enumerate(names[i + 1 :], i + 1):
+            expected = cohabitations.get((genera[name_1], genera[name_2]), 2)
+            assert graph[name_1][name_2][1]["weight"] == expected
+            assert matrix[i, j] == matrix[j, i] == expected
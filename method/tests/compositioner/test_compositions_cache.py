@@ -0,0 +1,63 @@
+"""Compositions cache should return the same compositions for territories with the same factors values"""
+
+import pytest
+
+from derevo import CompositionsCache, Plant, Territory
+from derevo import enumerations as d_enum
+from derevo import get_compositions
+from derevo.models.cohabitation import GeneraCohabitation
+
+
+def test_cache_hits(plants: list[Plant], cohabitation_attributes: list[GeneraCohabitation]):
+    """Test that territories with the same factors values in different order share the cached value."""
+    cache = CompositionsCache()
+    territory = Territory(
+        usda_zone=d_enum.UsdaZone.USDA5, light_types=[d_enum.LightType.LIGHT, d_enum.LightType.DARKENED]
+    )
+    same_territory = Territory(
+        usda_zone=d_enum.UsdaZone.USDA5,
+        light_types=[d_enum.LightType.DARKENED, d_enum.LightType.LIGHT, d_enum.LightType.LIGHT],
+    )
+
+    expected = get_compositions(plants, territory, cohabitation_attributes)
+
+    assert cache.get_compositions(plants, territory, cohabitation_attributes) == expected
+    assert cache.get_compositions(plants, same_territory, cohabitation_attributes) == expected
+    cache.get_compositions(plants, Territory(usda_zone=d_enum.UsdaZone.USDA5), cohabitation_attributes)
+    info = cache.info()
+    assert (info.hits, info.misses, info.size) == (1, 2, 2)
+
+
+def test_cache_keys(plants: list[Plant], cohabitation_attributes: list[GeneraCohabitation]):
+    """Test that present plants, data changes and unknown values are taken into account in cache key."""
+    cache = CompositionsCache()
+    territory = Territory(light_types=[d_enum.LightType.LIGHT])
+    key = cache.get_key(plants, territory, cohabitation_attributes)
+
+    assert key != cache.get_key(
+        plants, Territory(light_types=[d_enum.LightType.LIGHT], soil_types=[]), cohabitation_attributes
+    )
+    assert key != cache.get_key(plants, territory, cohabitation_attributes, plants[:1])
+    assert key != cache.get_key(plants[1:], territory, cohabitation_attributes)
+    assert key != cache.get_key(plants, territory, cohabitation_attributes[1:])
+    assert key == cache.get_key(list(plants), territory, list(cohabitation_attributes))
+
+
+def test_cache_eviction(plants: list[Plant], cohabitation_attributes: list[GeneraCohabitation]):
+    """Test that least recently used value is evicted and cache is emptied on clear."""
+    cache = CompositionsCache(max_size=2)
+    territories = [Territory(light_types=[light_type]) for light_type in d_enum.LightType]
+
+    cache.get_compositions(plants, territories[0], cohabitation_attributes)
+    cache.get_compositions(plants, territories[1], cohabitation_attributes)
+    cache.get_compositions(plants, territories[0], cohabitation_attributes)
+    cache.get_compositions(plants, territories[2], cohabitation_attributes)
+    cache.get_compositions(plants, territories[0], cohabitation_attributes)
+    assert cache.info().hits == 2
+    cache.get_compositions(plants, territories[1], cohabitation_attributes)
+    assert cache.info().hits == 2
+
+    cache.clear()
+    assert cache.info().size == 0
+    with pytest.raises(ValueError):
+        CompositionsCache(max_size=0)
@@ -0,0 +1,64 @@
+"""Rasterized territory should contain all of the factors of intersecting polygons"""
+
+import random
+from typing import Callable
+
+import geopandas as gpd
+from shapely.geometry import box
+
+from derevo import GlobalTerritory, RasterTerritory
+from derevo import enumerations as d_enum
+from derevo import get_territory, get_territory_raster
+
+
+def test_raster_superset(random_layer: Callable[..., gpd.GeoDataFrame]):
+    """Test that raster territory contains every value of the vector one."""
+    rnd = random.Random(0)
+    global_territory = GlobalTerritory(
+        limitation_factors=random_layer(d_enum.LimitationFactor, 200, rnd),
+        light_types=random_layer(d_enum.LightType, 50, rnd),
+        soil_types=random_layer(d_enum.SoilType, 50, rnd),
+    )
+    raster = RasterTerritory.from_global_territory(global_territory, cell_size=1)
+
+    for _ in range(50):
+        x, y = rnd.uniform(0, 100), rnd.uniform(0, 100)
+        polygon = box(x, y, x + rnd.uniform(0.1, 10), y + rnd.uniform(0.1, 10))
+        expected = get_territory(polygon, global_territory)
+        territory = get_territory_raster(polygon, raster)
+        for attribute in ("limitation_factors", "light_types", "humidity_types", "soil_types"):
+            assert set(getattr(expected, attribute)) <= set(getattr(territory, attribute))
+
+
+def test_raster_aligned():
+    """Test that raster territory is exact for polygons aligned to the grid and is preserved on save and load."""
+    light_types = gpd.GeoDataFrame(
+        {"name": [d_enum.LightType.LIGHT, d_enum.LightType.DARK]},
+        geometry=[box(0, 0, 10, 10), box(20, 20, 30, 30)],
+    )
+    global_territory = GlobalTerritory(light_types=light_types)
+    raster = RasterTerritory.from_global_territory(global_territory, cell_size=2)
+
+    assert raster.shape == (15, 15)
+    assert raster.get_territory(box(1, 1, 3, 3)).light_types == [d_enum.LightType.LIGHT]
+    assert raster.get_territory(box(12.5, 12.5, 17.5, 17.5)).light_types == []
+    assert set(raster.get_territory(box(5, 5, 25, 25)).light_types) == {d_enum.LightType.LIGHT, d_enum.LightType.DARK}
+    assert raster.get_territory(box(100, 100, 101, 101)).light_types == []
+
+
+def test_raster_save_load(tmp_path, random_layer: Callable[..., gpd.GeoDataFrame]):
+    """Test that raster territory is loaded as it was saved."""
+    rnd = random.Random(1)
+    global_territory = GlobalTerritory(
+        usda_zone=d_enum.UsdaZone.USDA5, limitation_factors=random_layer(d_enum.LimitationFactor, 100, rnd)
+    )
+    raster = RasterTerritory.from_global_territory(global_territory, cell_size=2.5)
+    raster.save(tmp_path)
+
+    loaded = RasterTerritory.load(tmp_path)
+
+    assert loaded.usda_zone == raster.usda_zone
+    assert loaded.bounds == raster.bounds
+    assert loaded.shape == raster.shape
+    polygon = box(20, 20, 40, 40)
+    assert loaded.get_territory(polygon) == raster.get_territory(polygon)
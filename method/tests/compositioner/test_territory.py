@@ -0,0 +1,95 @@
+"""Territory parameters should be taken from the polygons intersecting the given geometry"""
+
+import random
+from typing import Callable
+
+import geopandas as gpd
+from shapely.geometry import box
+
+from derevo import GlobalTerritory
+from derevo import enumerations as d_enum
+from derevo import get_territories, get_territory
+
+
+def test_intersecting(random_layer: Callable[..., gpd.GeoDataFrame]):
+    """Test that spatial index query gives the same rows as the plain predicates check."""
+    rnd = random.Random(0)
+    layer = random_layer(d_enum.LimitationFactor, 500, rnd)
+    global_territory = GlobalTerritory(limitation_factors=layer)
+
+    for _ in range(50):
+        x, y = rnd.uniform(0, 100), rnd.uniform(0, 100)
+        polygon = box(x, y, x + rnd.uniform(0.1, 20), y + rnd.uniform(0.1, 20))
+        expected = layer[layer.covered_by(polygon) | layer.covers(polygon) | layer.intersects(polygon)]
+        assert list(global_territory.get_intersecting("limitation_factors", polygon).index) == list(expected.index)
+
+
+def test_get_territory():
+    """Test that territory contains only the parameters of intersecting polygons and unknown layers are empty."""
+    light_types = gpd.GeoDataFrame(
+        {"name": [d_enum.LightType.LIGHT, d_enum.LightType.DARK]},
+        geometry=[box(0, 0, 10, 10), box(20, 20, 30, 30)],
+    )
+    global_territory = GlobalTerritory(light_types=light_types)
+
+    territory = get_territory(box(5, 5, 6, 6), global_territory)
+
+    assert territory.light_types == [d_enum.LightType.LIGHT]
+    assert not territory.limitation_factors
+
+
+def test_get_territories(random_layer: Callable[..., gpd.GeoDataFrame]):
+    """Test that batch lookup gives the same territories as separate ones in the input order."""
+    rnd = random.Random(1)
+    global_territory = GlobalTerritory(
+        limitation_factors=random_layer(d_enum.LimitationFactor, 300, rnd),
+        light_types=random_layer(d_enum.LightType, 100, rnd),
+        soil_types=random_layer(d_enum.SoilType, 100, rnd),
+    )
+    polygons = []
+    for _ in range(40):
+        x, y = rnd.uniform(0, 100), rnd.uniform(0, 100)
+        polygons.append(box(x, y, x + rnd.uniform(0.1, 20), y + rnd.uniform(0.1, 20)))
+
+    territories = get_territories(gpd.GeoSeries(polygons), global_territory)
+
+    assert len(territories) == len(polygons)
+    for polygon, territory in zip(polygons, territories):
+        expected = get_territory(polygon, global_territory)
+        for attribute in ("limitation_factors", "light_types", "humidity_types", "soil_types"):
+            assert sorted(getattr(territory, attribute), key=str) == sorted(getattr(expected, attribute), key=str)
+        assert territory.usda_zone == expected.usda_zone
+
+
+def test_names_preparation():
+    """Test that names are validated once and stored as categorical of enumeration members."""
+    light_types = gpd.GeoDataFrame(
+        {"name": ["light", d_enum.LightType.DARK, "unknown", "DARKENED"]},
+        geometry=[box(0, 0, 10, 10), box(20, 20, 30, 30), box(0, 0, 30, 30), box(5, 5, 25, 25)],
+    )
+    global_territory = GlobalTerritory(light_types=light_types)
+
+    assert global_territory.light_types.shape[0] == 3
+    assert list(global_territory.light_types["name"]) == [
+        d_enum.LightType.LIGHT,
+        d_enum.LightType.DARK,
+        d_enum.LightType.DARKENED,
+    ]
+    assert global_territory.as_territory().light_types == list(d_enum.LightType)
+    assert global_territory.as_territory(box(0, 0, 1, 1)).light_types == [d_enum.LightType.LIGHT]
+
+
+def test_names_preparation_copy():
+    """Test that given GeoDataFrame is not modified and rows with non-unique index are filtered by position."""
+    light_types = gpd.GeoDataFrame(
+        {"name": ["light", "unknown", "dark"]},
+        geometry=[box(0, 0, 10, 10), box(20, 20, 30, 30), box(0, 0, 30, 30)],
+        index=[0, 0, 1],
+    )
+    original = light_types.copy()
+
+    global_territory = GlobalTerritory(light_types=light_types)
+
+    assert light_types.equals(original)
+    assert list(global_territory.light_types["name"]) == [d_enum.LightType.LIGHT, d_enum.LightType.DARK]
+    assert list(global_territory.light_types.index) == [0, 1]
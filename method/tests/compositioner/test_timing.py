@@ -0,0 +1,47 @@
+"""Compositions computation stages durations should be collected only when a timer is active"""
+
+import pytest
+
+from derevo import Plant, Territory
+from derevo import enumerations as d_enum
+from derevo import get_compositions
+from derevo.models.cohabitation import GeneraCohabitation
+from derevo.timing import StageTimer, collect_timings, get_current_timer, span
+
+
+@pytest.mark.parametrize("communities_backend", ["networkx", "louvain"])
+def test_compositions_stages(
+    plants: list[Plant], cohabitation_attributes: list[GeneraCohabitation], communities_backend: str
+):
+    """Test that all of the compositions computation stages are recorded."""
+    territory = Territory(light_types=[d_enum.LightType.LIGHT])
+    with collect_timings() as timer:
+        compositions = get_compositions(
+            plants, territory, cohabitation_attributes, communities_backend=communities_backend
+        )
+    assert len(compositions) != 0
+    assert list(timer.stages) == [
+        "tolerance_matrix",
+        "suitability_filtering",
+        "compatibility_index",
+        "graph_building",
+        "community_detection",
+        "hydration",
+    ]
+    assert all(duration >= 0 for duration in timer.stages.values())
+
+
+def test_spans_without_timer():
+    """Test that spans are ignored without an active timer and the same stage durations are summed up."""
+    with span("stage"):
+        assert get_current_timer() is None
+    timer = StageTimer()
+    with collect_timings(timer):
+        with span("stage"):
+            pass
+        with span("stage"):
+            pass
+    timer.update({"stage": 1.0, "other": 2.0})
+    assert get_current_timer() is None
+    assert list(timer.stages) == ["stage", "other"]
+    assert timer.stages["stage"] >= 1.0
@@ -0,0 +1,107 @@
+"""Tolerance matrix filtering should be equal to the plain plants preferences check"""
+
+import random
+
+import pytest
+
+from derevo import Plant, Territory, ToleranceMatrix, get_compositions
+from derevo import enumerations as d_enum
+
+
+def _random_preferences(concrete_enum, rnd: random.Random) -> dict:
+    return {
+        member: rnd.choice(list(d_enum.ToleranceType))
+        for member in rnd.sample(list(concrete_enum), rnd.randint(0, len(concrete_enum)))
+    }
+
+
+def _random_plants(count: int, rnd: random.Random) -> list[Plant]:
+    return [
+        Plant(
+            name_ru=f"plant_{i}",
+            name_latin=f"plant_{i}",
+            genus=f"genus_{i % 5}",
+            limitation_factors_resistances=_random_preferences(d_enum.LimitationFactor, rnd),
+            usda_zone_preferences=_random_preferences(d_enum.UsdaZone, rnd),
+            light_preferences=_random_preferences(d_enum.LightType, rnd),
+            humidity_preferences=_random_preferences(d_enum.HumidityType, rnd),
+            soil_acidity_preferences=_random_preferences(d_enum.AcidityType, rnd),
+            soil_fertility_preferences=_random_preferences(d_enum.FertilityType, rnd),
+            soil_type_preferences=_random_preferences(d_enum.SoilType, rnd),
+        )
+        for i in range(count)
+    ]
+
+
+def _is_suitable(plant: Plant, territory: Territory) -> bool:
+    """Straightforward check of a plant suitability."""
+
+    def tolerates(preferences: dict, value) -> bool:
+        return preferences.get(value, d_enum.ToleranceType.NEUTRAL) != d_enum.ToleranceType.NEGATIVE
+
+    for preferences, values in (
+        (plant.light_preferences, territory.light_types),
+        (plant.humidity_preferences, territory.humidity_types),
+        (plant.soil_type_preferences, territory.soil_types),
+        (plant.soil_acidity_preferences, territory.soil_acidity_types),
+        (plant.soil_fertility_preferences, territory.soil_fertility_types),
+    ):
+        if values and not any(tolerates(preferences, value) for value in values):
+            return False
+    if territory.limitation_factors and not all(
+        tolerates(plant.limitation_factors_resistances, lf) for lf in territory.limitation_factors
+    ):
+        return False
+    if territory.usda_zone and not tolerates(plant.usda_zone_preferences, territory.usda_zone):
+        return False
+    return True
+
+
+def test_matrix_shape():
+    """Test that matrix contains a row for every plant and a column for every enumeration member."""
+    plants = _random_plants(10, random.Random(0))
+    matrix = ToleranceMatrix.from_plants(plants)
+
+    assert len(matrix) == len(plants)
+    assert matrix.values.shape == (len(plants), len(matrix.columns))
+    assert set(matrix.values.flatten()) <= {-1, 0, 1}
+
+
+def test_matrix_key():
+    """Test that matrix can not be used for another plants list of the same length."""
+    plants = _random_plants(10, random.Random(3))
+    other_plants = _random_plants(10, random.Random(4))
+    matrix = ToleranceMatrix.from_plants(plants)
+
+    assert matrix.is_built_for(list(plants))
+    assert not matrix.is_built_for(other_plants)
+    with pytest.raises(ValueError):
+        get_compositions(other_plants, Territory(), [], tolerance_matrix=matrix)
+
+
+def test_unknown_territory():
+    """Test that all of the plants are suitable for a territory with unknown parameters."""
+    plants = _random_plants(20, random.Random(1))
+    matrix = ToleranceMatrix.from_plants(plants)
+
+    assert list(matrix.get_suitable_indexes(Territory())) == list(range(len(plants)))
+
+
+def test_random_territories():
+    """Test that the matrix filter gives the same results as a straightforward check."""
+    rnd = random.Random(2)
+    plants = _random_plants(200, rnd)
+    matrix = ToleranceMatrix.from_plants(plants)
+
+    for _ in range(100):
+        territory = Territory(
+            usda_zone=rnd.choice([None, *d_enum.UsdaZone]),
+            limitation_factors=rnd.sample(list(d_enum.LimitationFactor), rnd.randint(0, 3)),
+            light_types=rnd.sample(list(d_enum.LightType), rnd.randint(0, 2)),
+            humidity_types=rnd.sample(list(d_enum.HumidityType), rnd.randint(0, 2)),
+            soil_types=rnd.sample(list(d_enum.SoilType), rnd.randint(0, 2)),
+            soil_acidity_types=rnd.sample(list(d_enum.AcidityType), rnd.randint(0, 2)),
+            soil_fertility_types=rnd.sample(list(d_enum.FertilityType), rnd.randint(0, 2)),
+        )
+        expected = [plant for plant in plants if _is_suitable(plant, territory)]
+        assert matrix.get_suitable_plants(territory) == expected